@@ -0,0 +1,95 @@
+"""
+Hot-path eth_call layer for the view functions probed on every event.
+
+Selectors and calldata templates are computed once from abis/constants.py.
+Calls go to the provider as raw eth_call requests, so rate limiting, pooling
+and the RPC result cache still apply, and results are decoded with eth_abi
+directly. This skips web3's ContractFunction build / encode / decode layers.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+from abis.constants import (
+    GET_ASSET_PRICE_ABI,
+    GET_ASSETS_PRICES_ABI,
+    GET_PRICE_ORACLE_ABI,
+    GET_USER_ACCOUNT_DATA_ABI,
+)
+from eth_abi import decode, encode
+from eth_utils import keccak
+
+
+class CallError(Exception):
+    pass
+
+
+class PrecompiledFunction:
+    """
+    One ABI view function with its selector and argument / result types
+    resolved up front
+    """
+
+    def __init__(self, abi: Dict):
+        self.name = abi["name"]
+        self.input_types = [param["type"] for param in abi["inputs"]]
+        self.output_types = [param["type"] for param in abi["outputs"]]
+        signature = f"{self.name}({','.join(self.input_types)})"
+        self.selector = "0x" + keccak(text=signature)[:4].hex()
+
+    def calldata(self, *args) -> str:
+        if not args:
+            return self.selector
+        if self.input_types == ["address"]:
+            # The common case is a template: selector + left-padded address
+            return self.selector + "0" * 24 + args[0][2:].lower()
+        return self.selector + encode(self.input_types, args).hex()
+
+    def request(self, to: str, block_number: int, *args) -> Tuple[str, List]:
+        """
+        (method, params) of the eth_call at block_number
+        """
+        return "eth_call", [{"to": to, "data": self.calldata(*args)}, hex(block_number)]
+
+    def decode_response(self, response: Dict) -> Any:
+        """
+        Decode a JSON-RPC response; single-value results are unwrapped
+        """
+        if "error" in response:
+            raise CallError(f"{self.name} reverted: {response['error']}")
+        result = response.get("result")
+        if not result or result == "0x":
+            raise CallError(f"{self.name} returned no data")
+        values = decode(self.output_types, bytes.fromhex(result[2:]))
+        return values[0] if len(values) == 1 else values
+
+    def call(self, provider, to: str, block_number: int, *args) -> Any:
+        return self.decode_response(provider.make_request(*self.request(to, block_number, *args)))
+
+    async def call_async(self, provider, to: str, block_number: int, *args) -> Any:
+        return self.decode_response(
+            await provider.make_request(*self.request(to, block_number, *args))
+        )
+
+    def call_batch(self, provider, to: str, calls: Sequence[Tuple[int, tuple]]) -> List[Any]:
+        """
+        One JSON-RPC batch of (block_number, args) calls; a failed entry
+        comes back as its CallError instead of raising
+        """
+        responses = provider.make_batch_request(
+            [self.request(to, block_number, *args) for block_number, args in calls]
+        )
+        if not isinstance(responses, list):
+            raise CallError(f"{self.name} batch rejected: {responses.get('error')}")
+
+        results = []
+        for response in responses:
+            try:
+                results.append(self.decode_response(response))
+            except CallError as e:
+                results.append(e)
+        return results
+
+
+GET_USER_ACCOUNT_DATA = PrecompiledFunction(GET_USER_ACCOUNT_DATA_ABI)
+GET_PRICE_ORACLE = PrecompiledFunction(GET_PRICE_ORACLE_ABI)
+GET_ASSET_PRICE = PrecompiledFunction(GET_ASSET_PRICE_ABI)
+GET_ASSETS_PRICES = PrecompiledFunction(GET_ASSETS_PRICES_ABI)
@@ -303,3 +303,11 @@ GET_ASSET_PRICE_ABI = {
     "stateMutability": "view",
     "type": "function",
 }
+
+GET_ASSETS_PRICES_ABI = {
+    "inputs": [{"internalType": "address[]", "name": "assets", "type": "address[]"}],
+    "name": "getAssetsPrices",
+    "outputs": [{"internalType": "uint256[]", "name": "", "type": "uint256[]"}],
+    "stateMutability": "view",
+    "type": "function",
+}
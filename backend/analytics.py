@@ -0,0 +1,368 @@
+"""
+Vectorized USD valuation and latency statistics over liquidation rows, shared
+by the exporter and the API.
+
+Rows as returned by the listing and export queries are valued a chunk at a
+time as DataFrames and grouped into rollup frames: one row per (day, latency
+bucket) with the columns of the rollup table. Summaries and rolling windows
+are whole-column operations over those frames, whether they come from
+StatsAccumulator during a full export or from the rollup table behind
+/analytics/rolling. Valuation matches the frontend: amount / 10^decimals *
+price, and 0 while the analysis is missing.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Columns the statistics need from a listing row
+FRAME_COLUMNS = [
+    "id",
+    "liquidator",
+    "block_timestamp",
+    "latency_seconds",
+    "debt_to_cover",
+    "liquidated_collateral_amount",
+    "collateral_symbol",
+    "collateral_decimals",
+    "collateral_price_usd",
+    "debt_symbol",
+    "debt_decimals",
+    "debt_price_usd",
+]
+
+# Columns kept once rows are valued; raw amounts are dropped
+VALUED_COLUMNS = [
+    "time",
+    "liquidator",
+    "collateral_symbol",
+    "debt_symbol",
+    "latency_seconds",
+    "collateral_usd",
+    "debt_usd",
+    "bonus_usd",
+]
+
+
+def token_amounts(raw: Sequence, decimals: Sequence) -> np.ndarray:
+    """
+    Scale raw uint256 amounts (decimal strings) by their token decimals.
+    The strings are parsed straight to float64, so amounts beyond 2**64
+    neither overflow nor wrap; missing amounts or decimals give NaN.
+    """
+    amounts = np.asarray(pd.Series(raw, dtype=object).fillna("nan"), dtype=str).astype(np.float64)
+    scale = np.power(10.0, pd.to_numeric(pd.Series(decimals), errors="coerce").to_numpy(np.float64))
+    return amounts / scale
+
+
+def usd_values(raw: Sequence, decimals: Sequence, prices: Sequence) -> np.ndarray:
+    prices = pd.to_numeric(pd.Series(prices), errors="coerce").to_numpy(np.float64)
+    return np.nan_to_num(token_amounts(raw, decimals) * prices, nan=0.0)
+
+
+def frame_from_rows(rows: Iterable[Dict]) -> pd.DataFrame:
+    """
+    Build the raw frame from listing rows (dicts, or a columnar-v1 decode)
+    """
+    return pd.DataFrame.from_records(list(rows), columns=FRAME_COLUMNS)
+
+
+def value_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add USD notional and bonus to a raw frame, keeping VALUED_COLUMNS
+    """
+    collateral_usd = usd_values(
+        raw["liquidated_collateral_amount"], raw["collateral_decimals"], raw["collateral_price_usd"]
+    )
+    debt_usd = usd_values(raw["debt_to_cover"], raw["debt_decimals"], raw["debt_price_usd"])
+    latency = pd.to_numeric(raw["latency_seconds"], errors="coerce")
+
+    return pd.DataFrame({
+        "time": pd.to_datetime(pd.to_numeric(raw["block_timestamp"]), unit="s", utc=True),
+        "liquidator": raw["liquidator"].astype("category"),
+        "collateral_symbol": raw["collateral_symbol"].astype("category"),
+        "debt_symbol": raw["debt_symbol"].astype("category"),
+        # Negative latencies are unusable, as in the dashboard
+        "latency_seconds": latency.where(latency >= 0),
+        "collateral_usd": collateral_usd,
+        "debt_usd": debt_usd,
+        "bonus_usd": collateral_usd - debt_usd,
+    })[VALUED_COLUMNS]
+
+
+# Columns of a rollup frame: latency_bucket indexes the latency bucket edges,
+# -1 without a usable latency
+ROLLUP_COLUMNS = [
+    "day",
+    "latency_bucket",
+    "count",
+    "latency_count",
+    "latency_sum",
+    "collateral_usd",
+    "debt_usd",
+    "bonus_usd",
+]
+SUMMED_COLUMNS = ROLLUP_COLUMNS[2:]
+
+
+def rollup_frame(valued: pd.DataFrame, bucket_edges: Sequence[float]) -> pd.DataFrame:
+    """
+    Group a valued frame into a rollup frame
+    """
+    latency = valued["latency_seconds"]
+    return pd.DataFrame({
+        "day": valued["time"].dt.date,
+        "latency_bucket": np.where(
+            latency.notna(),
+            np.searchsorted(bucket_edges, latency.fillna(0), side="right") - 1,
+            -1,
+        ),
+        "count": 1,
+        "latency_count": latency.notna().astype(np.int64),
+        "latency_sum": latency.fillna(0.0),
+        "collateral_usd": valued["collateral_usd"],
+        "debt_usd": valued["debt_usd"],
+        "bonus_usd": valued["bonus_usd"],
+    }).groupby(["day", "latency_bucket"], as_index=False)[SUMMED_COLUMNS].sum()
+
+
+def frame_from_rollups(rows: Iterable[Dict]) -> pd.DataFrame:
+    """
+    Build a rollup frame from rollup-table rows (sums may be Decimals)
+    """
+    frame = pd.DataFrame.from_records(list(rows), columns=ROLLUP_COLUMNS)
+    return frame.astype({
+        "latency_bucket": np.int64,
+        "count": np.int64,
+        "latency_count": np.int64,
+        "latency_sum": np.float64,
+        "collateral_usd": np.float64,
+        "debt_usd": np.float64,
+        "bonus_usd": np.float64,
+    })
+
+
+def merge_rollups(*frames: pd.DataFrame) -> pd.DataFrame:
+    return (
+        pd.concat(frames, ignore_index=True)
+        .groupby(["day", "latency_bucket"], as_index=False)[SUMMED_COLUMNS]
+        .sum()
+    )
+
+
+def latency_histograms(rollup: pd.DataFrame, bucket_edges: Sequence[float], by_day: bool = False):
+    """
+    Latency bucket counts of a rollup frame: one array, or one row per day
+    (a DataFrame indexed by day) with by_day
+    """
+    latencies = rollup[rollup["latency_bucket"] >= 0]
+    if not by_day:
+        return np.bincount(
+            latencies["latency_bucket"], weights=latencies["latency_count"], minlength=len(bucket_edges)
+        )
+    return (
+        latencies.groupby(["day", "latency_bucket"])["latency_count"]
+        .sum()
+        .unstack(fill_value=0)
+        .reindex(columns=range(len(bucket_edges)), fill_value=0)
+    )
+
+
+def histogram_percentiles(counts, bucket_edges: Sequence[float], percentile: float) -> np.ndarray:
+    """
+    Estimate a latency percentile for each row of bucket counts, interpolating
+    linearly inside the bucket it falls in (as rollups.histogram_percentile);
+    the open last bucket reports its edge, and empty rows give NaN
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype=np.float64))
+    edges = np.asarray(bucket_edges, dtype=np.float64)
+    totals = counts.sum(axis=1)
+    targets = percentile / 100 * totals
+    cumulative = counts.cumsum(axis=1)
+
+    index = np.argmax((cumulative >= targets[:, None]) & (counts > 0), axis=1)
+    rows = np.arange(len(counts))
+    seen = cumulative[rows, index] - counts[rows, index]
+    low = edges[index]
+    high = np.append(edges[1:], edges[-1])[index]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = low + (high - low) * (targets - seen) / counts[rows, index]
+    return np.where(totals > 0, values, np.nan)
+
+
+def summarize_rollups(
+    rollup: pd.DataFrame,
+    bucket_edges: Sequence[float],
+    unique_liquidators: int,
+    latency_percentiles: Optional[Dict[str, Optional[float]]] = None,
+    percentiles: Sequence[int] = (50, 90, 99),
+) -> Dict:
+    """
+    Dashboard summary (the /analytics/summary shape) plus latency percentiles,
+    estimated from the latency histogram unless given
+    """
+    totals = rollup[SUMMED_COLUMNS].sum()
+    if latency_percentiles is None:
+        histogram = latency_histograms(rollup, bucket_edges)
+        latency_percentiles = {
+            f"p{pct}": _float_or_none(histogram_percentiles(histogram, bucket_edges, pct)[0])
+            for pct in percentiles
+        }
+    return {
+        "avgLatencySeconds": float(totals["latency_sum"] / totals["latency_count"]) if totals["latency_count"] else 0,
+        "totalLiquidatorProfit": float(totals["bonus_usd"]),
+        "totalLiquidations": int(totals["count"]),
+        "totalCollateralUsd": float(totals["collateral_usd"]),
+        "totalDebtUsd": float(totals["debt_usd"]),
+        "uniqueLiquidators": int(unique_liquidators),
+        "latencyPercentiles": latency_percentiles,
+    }
+
+
+def rolling_rollups(rollup: pd.DataFrame, bucket_edges: Sequence[float], window_days: int = 7) -> List[Dict]:
+    """
+    Per-day totals with trailing `window_days` sums and median latency; days
+    without liquidations between the first and last one are included, and
+    the median is estimated from the window's latency histogram
+    """
+    if rollup.empty:
+        return []
+
+    rollup = rollup.assign(day=pd.to_datetime(rollup["day"]))
+    daily = rollup.groupby("day")[SUMMED_COLUMNS].sum().asfreq("D", fill_value=0)
+    rolled = daily[["count", "bonus_usd", "collateral_usd", "debt_usd"]].rolling(window_days, min_periods=1).sum()
+    histograms = latency_histograms(rollup, bucket_edges, by_day=True).reindex(daily.index, fill_value=0)
+    median_latency = histogram_percentiles(
+        histograms.rolling(window_days, min_periods=1).sum().to_numpy(), bucket_edges, 50
+    )
+    avg_latency = daily["latency_sum"] / daily["latency_count"].where(daily["latency_count"] > 0)
+
+    return [
+        {
+            "date": day.date().isoformat(),
+            "count": int(daily.at[day, "count"]),
+            "totalBonus": float(daily.at[day, "bonus_usd"]),
+            "totalCollateral": float(daily.at[day, "collateral_usd"]),
+            "totalDebt": float(daily.at[day, "debt_usd"]),
+            "avgLatency": _float_or_none(avg_latency.iat[i]),
+            "rollingCount": int(rolled.at[day, "count"]),
+            "rollingBonus": float(rolled.at[day, "bonus_usd"]),
+            "rollingCollateral": float(rolled.at[day, "collateral_usd"]),
+            "rollingDebt": float(rolled.at[day, "debt_usd"]),
+            "rollingMedianLatency": _float_or_none(median_latency[i]),
+        }
+        for i, day in enumerate(daily.index)
+    ]
+
+
+def _float_or_none(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else float(value)
+
+
+class LatencySketch:
+    """
+    Latency quantile sketch with bounded relative error (DDSketch-style):
+    latencies are counted in logarithmic buckets, so memory depends on the
+    latency range, not on the number of rows. Past `max_buckets` the lowest
+    buckets are merged, which only coarsens the smallest latencies.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1.0, max_buckets: int = 2048):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.max_buckets = max_buckets
+        self.zero_count = 0
+        self.counts: Dict[int, int] = {}
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.counts.values())
+
+    def add_many(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        small = values < self.min_value
+        self.zero_count += int(small.sum())
+        indexes, counts = np.unique(
+            np.ceil(np.log(values[~small]) / self._log_gamma).astype(np.int64), return_counts=True
+        )
+        for index, count in zip(indexes.tolist(), counts.tolist()):
+            self.counts[index] = self.counts.get(index, 0) + count
+        if len(self.counts) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        ordered = sorted(self.counts)
+        keep = ordered[-self.max_buckets:]
+        merged = sum(self.counts.pop(index) for index in ordered[:-self.max_buckets])
+        self.counts[keep[0]] += merged
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        total = self.count
+        if total == 0:
+            return None
+        rank = percentile / 100 * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.counts))
+
+
+class StatsAccumulator:
+    """
+    Folds valued rows into running aggregates chunk by chunk: a rollup frame
+    (merged with each chunk's per-day groupby), the set of liquidators and a
+    latency sketch. Only the pending chunk is held as rows.
+    """
+
+    def __init__(self, bucket_edges: Sequence[float], chunk_size: int = 2000):
+        self.bucket_edges = bucket_edges
+        self.chunk_size = chunk_size
+        self._pending: List[Dict] = []
+        self.rollup = frame_from_rollups([])
+        self.liquidators = set()
+        self.latencies = LatencySketch()
+
+    def add(self, row: Dict):
+        self._pending.append(row)
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        valued = value_frame(frame_from_rows(self._pending))
+        self._pending = []
+
+        self.rollup = merge_rollups(self.rollup, rollup_frame(valued, self.bucket_edges))
+        self.liquidators.update(valued["liquidator"].dropna().unique())
+        self.latencies.add_many(valued["latency_seconds"].to_numpy(np.float64))
+
+    def summary(self, percentiles: Sequence[int] = (50, 90, 99)) -> Dict:
+        """
+        Dashboard summary plus latency percentiles, within the sketch's 1%
+        relative error
+        """
+        self._flush()
+        return summarize_rollups(
+            self.rollup,
+            self.bucket_edges,
+            len(self.liquidators),
+            {f"p{pct}": self.latencies.percentile(pct) for pct in percentiles},
+        )
+
+    def rolling(self, window_days: int = 7) -> List[Dict]:
+        """
+        Per-day totals with trailing `window_days` sums, as served by
+        /analytics/rolling
+        """
+        self._flush()
+        return rolling_rollups(self.rollup, self.bucket_edges, window_days)
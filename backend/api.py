@@ -1,84 +1,653 @@
 import os
 import json
-from flask import Flask, jsonify, request
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import psycopg2
+import psycopg2.errors
 from psycopg2 import sql
+from psycopg2.extensions import connection as PgConnection
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
-from backend import config
+from backend import columnar, config, rollups
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
 
+class PreparedStatementConnection(PgConnection):
+    """
+    Pooled connection that remembers which named statements it has prepared,
+    so the listing queries are parsed and planned once per connection. With
+    API_PREPARED_STATEMENTS off it runs the plain parameterized query instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.autocommit = True
+        self.prepared = set()
+        self.last_used = time.monotonic()
+
+    def execute_prepared(self, cur, name, statement, plain_statement, params):
+        if not config.API_PREPARED_STATEMENTS:
+            cur.execute(plain_statement, params)
+            return
+        if name not in self.prepared:
+            cur.execute(sql.SQL('PREPARE {} AS {}').format(sql.Identifier(name), statement))
+            self.prepared.add(name)
+        cur.execute(
+            sql.SQL('EXECUTE {} ({})').format(
+                sql.Identifier(name),
+                sql.SQL(', ').join(sql.Placeholder() * len(params))
+            ),
+            params
+        )
+
+# One pool per process; module state survives across warm serverless
+# invocations, so only cold starts pay for connecting
+_db_pool = None
+_db_pool_lock = threading.Lock()
+_db_pool_slots = threading.BoundedSemaphore(max(config.API_DB_POOL_MAX, 1))
+
+# Connections idle longer than this are pinged before use, since a frozen
+# serverless instance may come back to sockets the server already closed
+POOL_IDLE_CHECK_SECONDS = 60
+
+def get_db_pool():
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ThreadedConnectionPool(
+                    min(config.API_DB_POOL_MIN, config.API_DB_POOL_MAX),
+                    config.API_DB_POOL_MAX,
+                    config.DATABASE_URL,
+                    connection_factory=PreparedStatementConnection,
+                    keepalives=1,
+                    keepalives_idle=30
+                )
+    return _db_pool
+
+def _is_live(conn):
+    if conn.closed:
+        return False
+    if time.monotonic() - conn.last_used < POOL_IDLE_CHECK_SECONDS:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SELECT 1')
+        return True
+    except psycopg2.Error:
+        return False
+
+def _checkout(pool):
+    """
+    Take a live connection from the pool. Dead idle connections are discarded
+    until a live one comes up; each discard shrinks the idle set, and new
+    connections count as fresh, so this ends.
+    """
+    while True:
+        conn = pool.getconn()
+        if _is_live(conn):
+            return conn
+        pool.putconn(conn, close=True)
+
+@contextmanager
 def get_db_connection():
-    return psycopg2.connect(config.DATABASE_URL)
+    """
+    Borrow a connection from the process-wide pool, waiting while all are in
+    use; API_DB_POOL_MAX=0 connects per request instead
+    """
+    if config.API_DB_POOL_MAX <= 0:
+        conn = psycopg2.connect(config.DATABASE_URL, connection_factory=PreparedStatementConnection)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    with _db_pool_slots:
+        pool = get_db_pool()
+        conn = _checkout(pool)
+        broken = False
+        try:
+            yield conn
+        except psycopg2.Error:
+            broken = True
+            raise
+        finally:
+            conn.last_used = time.monotonic()
+            pool.putconn(conn, close=broken or bool(conn.closed))
+
+def encode_cursor(block_timestamp, liquidation_id):
+    raw = json.dumps([block_timestamp, liquidation_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque page cursor back into the (block_timestamp, id) of the
+    last row the client saw; raises ValueError if it was tampered with
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        block_timestamp, liquidation_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(block_timestamp), str(liquidation_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+class ResponseCache:
+    """
+    LRU of serialized responses keyed by query parameters. Each entry keeps
+    the data version it was rendered at and is only served while the
+    database still reports that version.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2], entry[3]
+
+    def set(self, key, version, body, etag, mimetype='application/json'):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, body, etag, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+response_cache = ResponseCache(config.API_CACHE_ENTRIES)
+
+def get_data_version(conn, cur):
+    """
+    Return (version, total_count) from the LiquidationStats row kept by the
+    triggers installed in setup_db.py. Without them the version is None and
+    the count falls back to the planner's estimate.
+    """
+    try:
+        cur.execute(
+            sql.SQL("""
+                SELECT total_count, max_block_number, call_version, analysis_version, rollup_version
+                FROM {}.{} WHERE id = 1
+            """).format(
+                sql.Identifier(config.DATABASE_SCHEMA),
+                sql.Identifier('LiquidationStats')
+            )
+        )
+        row = cur.fetchone()
+        if row:
+            version = (
+                str(row['max_block_number']),
+                row['call_version'],
+                row['analysis_version'],
+                row['rollup_version'],
+            )
+            return version, row['total_count']
+    except (psycopg2.errors.UndefinedTable, psycopg2.errors.UndefinedColumn):
+        pass
+
+    cur.execute(
+        'SELECT GREATEST(reltuples, 0)::bigint AS estimate FROM pg_class WHERE oid = to_regclass(%s)',
+        (sql.Identifier(config.DATABASE_SCHEMA, 'LiquidationCall').as_string(conn),)
+    )
+    row = cur.fetchone()
+    return None, row['estimate'] if row else 0
+
+def cached_response(body, etag, mimetype='application/json'):
+    """
+    Serve a body with a strong ETag, or 304 if the client already has it
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    # Let browsers keep the body but revalidate on every poll
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept')
+    return response
+
+def render_body(cache_key, version, body, mimetype='application/json'):
+    """
+    Cache a serialized body under the data version it was read at and serve
+    it with its ETag
+    """
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    if version:
+        response_cache.set(cache_key, version, body, etag, mimetype)
+    return cached_response(body, etag, mimetype)
+
+def render_json(cache_key, version, payload):
+    return render_body(cache_key, version, jsonify(payload).get_data())
+
+def negotiate_format():
+    """
+    Pick the listing encoding from ?format= or, failing that, the Accept header
+    """
+    requested = request.args.get('format')
+    if requested:
+        return requested
+    accepted = request.accept_mimetypes
+    if accepted.quality(columnar.ARROW_MIMETYPE) > accepted.quality('application/json'):
+        return 'arrow'
+    if accepted.quality(columnar.COLUMNAR_MIMETYPE) > accepted.quality('application/json'):
+        return 'columnar'
+    return 'json'
+
+def listing_statement(page_filter, limit_param, offset_param):
+    return sql.SQL("""
+        SELECT
+            lc.id,
+            lc.user_address as "user",
+            lc.liquidator,
+            lc.collateral_asset,
+            lc.debt_asset,
+            lc.debt_to_cover,
+            lc.liquidated_collateral_amount,
+            lc.block_timestamp,
+            la.latency_seconds,
+            la.collateral_symbol,
+            la.collateral_decimals,
+            la.collateral_price_usd,
+            la.debt_symbol,
+            la.debt_decimals,
+            la.debt_price_usd
+        FROM (
+            SELECT
+                lc.id,
+                lc.user_address,
+                lc.liquidator,
+                lc.collateral_asset,
+                lc.debt_asset,
+                lc.debt_to_cover,
+                lc.liquidated_collateral_amount,
+                lc.block_timestamp
+            FROM {}.{} lc
+            {}
+            ORDER BY lc.block_timestamp DESC, lc.id DESC
+            LIMIT {} OFFSET {}
+        ) lc
+        LEFT JOIN {}.{} la ON lc.id = la.id
+        ORDER BY lc.block_timestamp DESC, lc.id DESC
+    """).format(
+        sql.Identifier(config.DATABASE_SCHEMA),
+        sql.Identifier('LiquidationCall'),
+        sql.SQL(page_filter),
+        sql.SQL(limit_param),
+        sql.SQL(offset_param),
+        sql.Identifier(config.DATABASE_SCHEMA),
+        sql.Identifier('LiquidationAnalysis')
+    )
+
+# Keyset pagination seeks straight to the row after the cursor on the
+# (block_timestamp, id) index; offset is kept for page jumps
+LISTING_BY_OFFSET = listing_statement('', '$1', '$2')
+LISTING_AFTER_CURSOR = listing_statement(
+    'WHERE (lc.block_timestamp, lc.id) < ($1, $2)', '$3', '0'
+)
+# The same queries with client-side parameters, for pooled connections
+PLAIN_LISTING_BY_OFFSET = listing_statement('', '%s', '%s')
+PLAIN_LISTING_AFTER_CURSOR = listing_statement(
+    'WHERE (lc.block_timestamp, lc.id) < (%s, %s)', '%s', '0'
+)
+
+# Columns of a listing row, in order; fixes the layout of empty columnar pages
+LISTING_FIELDS = [
+    'id', 'user', 'liquidator', 'collateral_asset', 'debt_asset', 'debt_to_cover',
+    'liquidated_collateral_amount', 'block_timestamp', 'latency_seconds',
+    'collateral_symbol', 'collateral_decimals', 'collateral_price_usd',
+    'debt_symbol', 'debt_decimals', 'debt_price_usd'
+]
+LISTING_FORMATS = ('json', 'columnar', 'arrow')
 
 @app.route('/liquidations', methods=['GET'])
 def get_liquidations():
     limit = request.args.get('limit', 10, type=int)
     offset = request.args.get('offset', 0, type=int)
+    cursor = request.args.get('cursor')
+
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-    conn = None
+    output_format = negotiate_format()
+    if output_format not in LISTING_FORMATS:
+        return jsonify({'error': f'Unknown format {output_format}'}), 400
+    if output_format == 'arrow' and not columnar.arrow_available():
+        return jsonify({'error': 'Arrow output needs pyarrow installed on the server'}), 406
+
+    cache_key = ('liquidations', limit, offset, cursor, output_format)
     try:
-        conn = get_db_connection()
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                sql.SQL('SELECT COUNT(*) as count FROM {}.{}').format(
-                    sql.Identifier(config.DATABASE_SCHEMA),
-                    sql.Identifier('LiquidationCall')
+        with get_db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # One single-row read decides whether the cached page is current
+            version, total_count = get_data_version(conn, cur)
+            cached = response_cache.get(cache_key, version) if version else None
+            if cached:
+                return cached_response(*cached)
+
+            if after:
+                conn.execute_prepared(
+                    cur,
+                    'liquidations_after_cursor',
+                    LISTING_AFTER_CURSOR,
+                    PLAIN_LISTING_AFTER_CURSOR,
+                    (*after, limit)
                 )
-            )
-            total_count = cur.fetchone()['count']
+            else:
+                conn.execute_prepared(
+                    cur,
+                    'liquidations_by_offset',
+                    LISTING_BY_OFFSET,
+                    PLAIN_LISTING_BY_OFFSET,
+                    (limit, offset)
+                )
+
+            records = cur.fetchall()
+            liquidations = [dict(record) for record in records]
+
+            next_cursor = None
+            if len(liquidations) == limit:
+                last = liquidations[-1]
+                next_cursor = encode_cursor(last['block_timestamp'], last['id'])
+
+            page = {
+                'totalCount': total_count,
+                'limit': limit,
+                'offset': offset,
+                'nextCursor': next_cursor
+            }
+            if output_format == 'columnar':
+                return render_json(cache_key, version, {
+                    **columnar.to_columns(liquidations, LISTING_FIELDS), **page
+                })
+            if output_format == 'arrow':
+                metadata = {key: json.dumps(value) for key, value in page.items()}
+                body = columnar.to_arrow_ipc(liquidations, metadata)
+                return render_body(cache_key, version, body, columnar.ARROW_MIMETYPE)
+            return render_json(cache_key, version, {'data': liquidations, **page})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Days of history each frontend time filter covers
+ANALYTICS_RANGES = {'1w': 7, '1m': 30, '1y': 365, 'max': None}
+TIME_BUCKETS = ('day', 'week', 'month')
+
+def range_cutoff(range_name):
+    """
+    First UTC day included in a time filter
+    """
+    days = ANALYTICS_RANGES[range_name]
+    return date.min if days is None else datetime.now(timezone.utc).date() - timedelta(days=days)
+
+def analytics_source(range_name, min_bonus):
+    """
+    Rollup-shaped rows for the requested window. The default bonus filter
+    (>= 0) reads the rollup table; any other threshold aggregates the matching
+    liquidations on the fly, still returning only aggregates.
+    """
+    cutoff = range_cutoff(range_name)
+    if min_bonus == 0:
+        source = sql.SQL('SELECT * FROM {}.{} WHERE profitable AND day >= %s').format(
+            sql.Identifier(config.DATABASE_SCHEMA),
+            sql.Identifier(rollups.ROLLUP_TABLE)
+        )
+        return source, (cutoff,)
+
+    where = sql.SQL('collateral_usd - debt_usd >= %s AND day >= %s')
+    return rollups.aggregated_rows(config.DATABASE_SCHEMA, where), (min_bonus, cutoff)
+
+def average(total, count):
+    return total / count if count else 0
+
+def serve_analytics(name, build, **extra):
+    """
+    Parse the shared range/minBonus parameters and serve build(cur, source,
+    params) through the response cache
+    """
+    range_name = request.args.get('range', 'max')
+    min_bonus = request.args.get('minBonus', 0, type=float)
+    if range_name not in ANALYTICS_RANGES:
+        return jsonify({'error': f'Unknown range {range_name}'}), 400
+
+    cache_key = ('analytics', name, range_name, min_bonus, *sorted(extra.items()))
+    try:
+        with get_db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            version, _ = get_data_version(conn, cur)
+            cached = response_cache.get(cache_key, version) if version else None
+            if cached:
+                return cached_response(*cached)
+
+            source, params = analytics_source(range_name, min_bonus)
+            return render_json(cache_key, version, build(cur, source, params))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/analytics/summary', methods=['GET'])
+def get_analytics_summary():
+    def build(cur, source, params):
+        cur.execute(
+            sql.SQL("""
+                SELECT
+                    COALESCE(SUM(count), 0)::bigint AS count,
+                    COALESCE(SUM(latency_count), 0)::bigint AS latency_count,
+                    COALESCE(SUM(latency_sum), 0) AS latency_sum,
+                    COALESCE(SUM(bonus_usd), 0) AS bonus_usd,
+                    COALESCE(SUM(collateral_usd), 0) AS collateral_usd,
+                    COALESCE(SUM(debt_usd), 0) AS debt_usd,
+                    COUNT(DISTINCT liquidator) AS liquidators
+                FROM ({}) s
+            """).format(source),
+            params
+        )
+        row = cur.fetchone()
+        return {
+            'avgLatencySeconds': average(row['latency_sum'], row['latency_count']),
+            'totalLiquidatorProfit': row['bonus_usd'],
+            'totalLiquidations': row['count'],
+            'totalCollateralUsd': row['collateral_usd'],
+            'totalDebtUsd': row['debt_usd'],
+            'uniqueLiquidators': row['liquidators']
+        }
 
+    return serve_analytics('summary', build)
+
+@app.route('/analytics/timeseries', methods=['GET'])
+def get_analytics_timeseries():
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in TIME_BUCKETS:
+        return jsonify({'error': f'Unknown bucket {bucket}'}), 400
+
+    def build(cur, source, params):
+        cur.execute(
+            sql.SQL("""
+                SELECT
+                    date_trunc({}, day)::date AS bucket,
+                    SUM(count)::bigint AS count,
+                    SUM(latency_count)::bigint AS latency_count,
+                    SUM(latency_sum) AS latency_sum,
+                    SUM(bonus_usd) AS bonus_usd,
+                    SUM(debt_usd) AS debt_usd,
+                    SUM(collateral_usd) AS collateral_usd
+                FROM ({}) s
+                GROUP BY 1
+                ORDER BY 1
+            """).format(sql.Literal(bucket), source),
+            params
+        )
+        return [
+            {
+                'date': row['bucket'].isoformat(),
+                'avgLatency': average(row['latency_sum'], row['latency_count']),
+                'count': row['count'],
+                'totalBonus': row['bonus_usd'],
+                'totalDebt': row['debt_usd'],
+                'totalCollateral': row['collateral_usd']
+            }
+            for row in cur.fetchall()
+        ]
+
+    return serve_analytics('timeseries', build, bucket=bucket)
+
+@app.route('/analytics/liquidators', methods=['GET'])
+def get_analytics_liquidators():
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+
+    def build(cur, source, params):
+        cur.execute(
+            sql.SQL("""
+                SELECT
+                    liquidator,
+                    SUM(bonus_usd) AS bonus_usd,
+                    SUM(latency_count)::bigint AS latency_count,
+                    SUM(latency_sum) AS latency_sum,
+                    SUM(count)::bigint AS count
+                FROM ({}) s
+                GROUP BY liquidator
+                ORDER BY bonus_usd DESC
+                LIMIT %s
+            """).format(source),
+            (*params, limit)
+        )
+        return [
+            {
+                'liquidator': row['liquidator'],
+                'totalProfit': row['bonus_usd'],
+                'avgLatency': average(row['latency_sum'], row['latency_count']),
+                'count': row['count']
+            }
+            for row in cur.fetchall()
+        ]
+
+    return serve_analytics('liquidators', build, limit=limit)
+
+@app.route('/analytics/assets', methods=['GET'])
+def get_analytics_assets():
+    def build(cur, source, params):
+        volumes = {}
+        for side in ('collateral', 'debt'):
             cur.execute(
                 sql.SQL("""
                     SELECT
-                        lc.id,
-                        lc."user_address" as "user",
-                        lc.liquidator,
-                        lc.collateral_asset,
-                        lc.debt_asset,
-                        lc.debt_to_cover,
-                        lc.liquidated_collateral_amount,
-                        lc.block_timestamp,
-                        la.latency_seconds,
-                        la.collateral_symbol,
-                        la.collateral_decimals,
-                        la.collateral_price_usd,
-                        la.debt_symbol,
-                        la.debt_decimals,
-                        la.debt_price_usd
-                    FROM {}.{} lc
-                    LEFT JOIN {}.{} la ON lc.id = la.id
-                    ORDER BY lc.block_timestamp DESC
-                    LIMIT %s OFFSET %s
+                        NULLIF({symbol}, '') AS symbol,
+                        SUM({usd}) AS volume_usd,
+                        SUM(count)::bigint AS count
+                    FROM ({source}) s
+                    GROUP BY 1
+                    ORDER BY volume_usd DESC
                 """).format(
-                    sql.Identifier(config.DATABASE_SCHEMA),
-                    sql.Identifier('LiquidationCall'),
-                    sql.Identifier(config.DATABASE_SCHEMA),
-                    sql.Identifier('LiquidationAnalysis')
+                    symbol=sql.Identifier(f'{side}_symbol'),
+                    usd=sql.Identifier(f'{side}_usd'),
+                    source=source
                 ),
-                (limit, offset)
+                params
             )
+            volumes[side] = [
+                {'symbol': row['symbol'], 'volumeUsd': row['volume_usd'], 'count': row['count']}
+                for row in cur.fetchall()
+            ]
+        return volumes
 
-            records = cur.fetchall()
-            liquidations = [dict(record) for record in records]
+    return serve_analytics('assets', build)
 
-            return jsonify({
-                'data': liquidations,
-                'totalCount': total_count,
-                'limit': limit,
-                'offset': offset
-            })
+@app.route('/analytics/latency', methods=['GET'])
+def get_analytics_latency():
+    def build(cur, source, params):
+        cur.execute(
+            sql.SQL("""
+                SELECT latency_bucket, SUM(count)::bigint AS count, SUM(latency_sum) AS latency_sum
+                FROM ({}) s
+                WHERE latency_bucket >= 0
+                GROUP BY latency_bucket
+            """).format(source),
+            params
+        )
+        edges = rollups.LATENCY_BUCKET_EDGES
+        counts = [0] * len(edges)
+        latency_sum = 0
+        for row in cur.fetchall():
+            counts[row['latency_bucket']] = row['count']
+            latency_sum += row['latency_sum']
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
+        return {
+            'buckets': [
+                {
+                    'fromSeconds': edges[i],
+                    'toSeconds': edges[i + 1] if i + 1 < len(edges) else None,
+                    'count': counts[i]
+                }
+                for i in range(len(edges))
+            ],
+            'percentiles': {
+                f'p{pct}': rollups.histogram_percentile(counts, pct) for pct in (50, 90, 99)
+            },
+            'avgLatencySeconds': average(latency_sum, sum(counts))
+        }
+
+    return serve_analytics('latency', build)
+
+@app.route('/analytics/rolling', methods=['GET'])
+def get_analytics_rolling():
+    window = min(max(request.args.get('window', 7, type=int), 1), 365)
+
+    def build(cur, source, params):
+        # Imported here so the listing endpoints don't pay for pandas on a
+        # cold start
+        from backend import analytics
+
+        cur.execute(
+            sql.SQL("""
+                SELECT
+                    day,
+                    latency_bucket,
+                    SUM(count)::bigint AS count,
+                    SUM(latency_count)::bigint AS latency_count,
+                    SUM(latency_sum) AS latency_sum,
+                    SUM(collateral_usd) AS collateral_usd,
+                    SUM(debt_usd) AS debt_usd,
+                    SUM(bonus_usd) AS bonus_usd
+                FROM ({}) s
+                GROUP BY day, latency_bucket
+            """).format(source),
+            params
+        )
+        rollup = analytics.frame_from_rollups(cur.fetchall())
+
+        cur.execute(
+            sql.SQL('SELECT COUNT(DISTINCT liquidator) AS liquidators FROM ({}) s').format(source),
+            params
+        )
+        edges = rollups.LATENCY_BUCKET_EDGES
+        return {
+            'summary': analytics.summarize_rollups(rollup, edges, cur.fetchone()['liquidators']),
+            'series': analytics.rolling_rollups(rollup, edges, window)
+        }
+
+    return serve_analytics('rolling', build, window=window)
 
 
 if __name__ == '__main__':
@@ -1,32 +1,108 @@
 from check import AaveLiquidationAnalyzer
+from listener import LiquidationListener
+import asyncio
 import config
-import time
+import metrics
+import rollups
 import traceback
 from datetime import datetime
 
+
+def print_iteration_header(iteration):
+    print(f"\n{'=' * 60}")
+    print(f"=== ITERATION {iteration} - {datetime.now()} ===")
+    print(f"{'=' * 60}\n")
+
+
+def print_batch_summary(results):
+    if not results:
+        print("No liquidations were successfully analyzed.")
+    else:
+        print(f"✅ Batch finished. Processed {len(results)} liquidations.")
+
+
+def refresh_analytics(analyzer):
+    """
+    Fold the days touched by this batch into the /analytics rollups
+    """
+    try:
+        with analyzer.get_db_cursor() as cur:
+            days = rollups.refresh_rollups(cur, config.DATABASE_SCHEMA)
+        if days:
+            print(f"✓ Refreshed analytics rollups for {days} days")
+    except Exception as e:
+        print(f"Error refreshing analytics rollups: {e}")
+        traceback.print_exc()
+
+
+def report_backlog(analyzer):
+    """
+    Publish the number of events still waiting to be claimed
+    """
+    try:
+        metrics.BACKLOG.set(analyzer.count_backlog())
+    except Exception as e:
+        print(f"Error counting backlog: {e}")
+
+
+def wait_for_next_iteration(listener):
+    """
+    Wake on indexer notifications, or after LOOP_INTERVAL seconds at most
+    """
+    print(f"\nWaiting up to {config.LOOP_INTERVAL} seconds for new liquidations...")
+    if listener.wait(config.LOOP_INTERVAL):
+        print("🔔 New liquidations indexed")
+
+
+async def run_async(analyzer, listener):
+    from async_engine import AsyncLiquidationAnalyzer
+
+    engine = AsyncLiquidationAnalyzer(analyzer, concurrency=config.ASYNC_CONCURRENCY)
+    await engine.start()
+    try:
+        iteration = 0
+        while True:
+            iteration += 1
+            print_iteration_header(iteration)
+
+            results = await engine.analyze_latest_liquidations(
+                num_liquidations=config.BATCH_SIZE,
+            )
+
+            print_batch_summary(results)
+            await asyncio.to_thread(refresh_analytics, analyzer)
+            await asyncio.to_thread(report_backlog, analyzer)
+            await asyncio.to_thread(wait_for_next_iteration, listener)
+    finally:
+        await engine.close()
+
+
 def main():
+    if config.METRICS_PORT:
+        metrics.start_server(config.METRICS_PORT, config.METRICS_ADDR)
+
     try:
         analyzer = AaveLiquidationAnalyzer(config.CHAIN_ID)
+        listener = LiquidationListener(config.DATABASE_URL, config.NOTIFY_CHANNEL)
+
+        if config.ANALYSIS_ENGINE == "async":
+            asyncio.run(run_async(analyzer, listener))
+            return
 
         iteration = 0
         while True:
             iteration += 1
-            print(f"\n{'=' * 60}")
-            print(f"=== ITERATION {iteration} - {datetime.now()} ===")
-            print(f"{'=' * 60}\n")
+            print_iteration_header(iteration)
 
             results = analyzer.analyze_latest_liquidations(
                 num_liquidations=config.BATCH_SIZE,
                 max_workers=config.MAX_WORKERS,
             )
 
-            if not results:
-                print("No liquidations were successfully analyzed.")
-            else:
-                print(f"✅ Batch finished. Processed {len(results)} liquidations.")
-
-            print(f"\nSleeping for {config.LOOP_INTERVAL} seconds before next iteration...")
-            time.sleep(config.LOOP_INTERVAL)
+            print_batch_summary(results)
+            refresh_analytics(analyzer)
+            report_backlog(analyzer)
+            wait_for_next_iteration(listener)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -34,4 +110,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,567 @@
+import asyncio
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import aiohttp
+import asyncpg
+import config
+import metrics
+from abi_calls import (
+    GET_ASSET_PRICE,
+    GET_ASSETS_PRICES,
+    GET_PRICE_ORACLE,
+    GET_USER_ACCOUNT_DATA,
+)
+from abis.constants import POOL_DATA_PROVIDER
+from check import AaveLiquidationAnalyzer
+from providers import (
+    AsyncCachingProvider,
+    AsyncPooledHTTPProvider,
+    AsyncRateLimitedProvider,
+)
+from search import galloping_search, kary_search
+from web3 import AsyncWeb3
+from web3.middleware import ExtraDataToPOAMiddleware
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class AsyncLiquidationAnalyzer:
+    """
+    asyncio engine for AaveLiquidationAnalyzer.
+
+    Runs up to `concurrency` events in flight over one shared aiohttp
+    connection pool and an asyncpg pool. Reserve metadata, price snapshots and
+    the row formatting are shared with the threaded analyzer, so both engines
+    write identical LiquidationAnalysis rows.
+    """
+
+    def __init__(self, analyzer: AaveLiquidationAnalyzer, concurrency: int = 300):
+        self.analyzer = analyzer
+        self.concurrency = concurrency
+        self.w3: Optional[AsyncWeb3] = None
+        self.rpc_pool: Optional[AsyncPooledHTTPProvider] = None
+        self.db_pool: Optional[asyncpg.Pool] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._price_fetches: Dict[int, asyncio.Future] = {}
+        self._pending_writes: Dict[str, tuple] = {}
+        self._last_flush = time.monotonic()
+
+        schema = _quote_identifier(analyzer.database_schema)
+        self._liquidation_table = f"{schema}.{_quote_identifier('LiquidationCall')}"
+        self._analysis_table = f"{schema}.{_quote_identifier('LiquidationAnalysis')}"
+
+    async def start(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency)
+        )
+
+        # Several endpoints get the same routing and hedging as the threaded pool
+        urls = self.analyzer.rpc_urls[self.analyzer.chain_id]
+        if len(urls) > 1:
+            self.rpc_pool = AsyncPooledHTTPProvider(urls, limiter=self.analyzer.rate_limiter)
+            http_provider = self.rpc_pool
+        else:
+            http_provider = AsyncWeb3.AsyncHTTPProvider(urls[0])
+        await http_provider.cache_async_session(self._session)
+        provider = AsyncRateLimitedProvider(http_provider, self.analyzer.rate_limiter)
+        if self.analyzer.rpc_cache is not None:
+            provider = AsyncCachingProvider(
+                provider,
+                self.analyzer.rpc_cache,
+                min_confirmations=config.RPC_CACHE_MIN_CONFIRMATIONS,
+            )
+        self.w3 = AsyncWeb3(provider)
+        self.w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+
+        self.db_pool = await asyncpg.create_pool(
+            dsn=self.analyzer.database_url, min_size=1, max_size=10
+        )
+
+    async def close(self):
+        if self.db_pool is not None:
+            await self.db_pool.close()
+        if self._session is not None:
+            await self._session.close()
+
+    async def fetch_liquidations_from_db(self, limit: int = 5) -> List[Dict]:
+        """
+        Claim work through the threaded analyzer's claim protocol. It runs
+        whenever enough slots free up, and sharing it keeps both engines on
+        the same cursor, sweep schedule and leases.
+        """
+        return await asyncio.to_thread(self.analyzer.fetch_liquidations_from_db, limit)
+
+    async def update_liquidation_analysis(
+        self, liquidation_id: str, tx_hash: str, analysis_result: Dict
+    ) -> bool:
+        """
+        Queue analysis results for the LiquidationAnalysis table
+        """
+        values = list(self.analyzer._analysis_values(liquidation_id, analysis_result))
+        # asyncpg binds TIMESTAMP columns from naive datetimes
+        if values[3] is not None:
+            values[3] = values[3].astimezone(timezone.utc).replace(tzinfo=None)
+        await metrics.timed(
+            "db_write", self._enqueue_write(liquidation_id, "ANALYZED", tuple(values))
+        )
+        return True
+
+    async def mark_liquidation_failed(
+        self, liquidation_id: str, tx_hash: str, error_message: str
+    ) -> bool:
+        """
+        Queue a failed status for a liquidation analysis
+        """
+        await metrics.timed(
+            "db_write",
+            self._enqueue_write(
+                liquidation_id, "FAILED", (liquidation_id, "FAILED", error_message)
+            ),
+        )
+        return True
+
+    async def _enqueue_write(self, liquidation_id: str, status: str, values: tuple):
+        self._pending_writes.pop(liquidation_id, None)
+        self._pending_writes[liquidation_id] = (status, values)
+        writer = self.analyzer.result_writer
+        if (
+            len(self._pending_writes) >= writer.batch_size
+            or time.monotonic() - self._last_flush >= writer.flush_interval
+        ):
+            await self.flush_writes()
+
+    async def _write_rows(self, conn, rows: List[tuple]):
+        analyzed = [values for status, values in rows if status == "ANALYZED"]
+        failed = [values for status, values in rows if status == "FAILED"]
+        if analyzed:
+            await conn.executemany(
+                f"""
+                    INSERT INTO {self._analysis_table} (
+                        id,
+                        analysis_status,
+                        first_liquidatable_block,
+                        first_liquidatable_time,
+                        latency_seconds,
+                        blocks_liquidatable,
+                        collateral_symbol,
+                        collateral_decimals,
+                        collateral_price_usd,
+                        debt_symbol,
+                        debt_decimals,
+                        debt_price_usd
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                    ON CONFLICT (id) DO UPDATE SET
+                        analysis_status = EXCLUDED.analysis_status,
+                        first_liquidatable_block = EXCLUDED.first_liquidatable_block,
+                        first_liquidatable_time = EXCLUDED.first_liquidatable_time,
+                        latency_seconds = EXCLUDED.latency_seconds,
+                        blocks_liquidatable = EXCLUDED.blocks_liquidatable,
+                        collateral_symbol = EXCLUDED.collateral_symbol,
+                        collateral_decimals = EXCLUDED.collateral_decimals,
+                        collateral_price_usd = EXCLUDED.collateral_price_usd,
+                        debt_symbol = EXCLUDED.debt_symbol,
+                        debt_decimals = EXCLUDED.debt_decimals,
+                        debt_price_usd = EXCLUDED.debt_price_usd,
+                        lease_expires_at = NULL
+                """,
+                analyzed,
+            )
+        if failed:
+            await conn.executemany(
+                f"""
+                    INSERT INTO {self._analysis_table} (id, analysis_status, error_message)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (id) DO UPDATE SET
+                        analysis_status = EXCLUDED.analysis_status,
+                        error_message = EXCLUDED.error_message,
+                        lease_expires_at = NULL
+                """,
+                failed,
+            )
+
+    async def flush_writes(self) -> int:
+        """
+        Write all queued rows with the same upserts as AnalysisResultWriter,
+        in one transaction; if that fails, each row gets its own
+        """
+        rows = list(self._pending_writes.values())
+        self._pending_writes.clear()
+        self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+
+        started = time.monotonic()
+        try:
+            async with self.db_pool.acquire() as conn:
+                metrics.DB_POOL_WAIT_SECONDS.observe(time.monotonic() - started)
+                async with conn.transaction():
+                    await self._write_rows(conn, rows)
+            metrics.DB_FLUSH_SECONDS.observe(time.monotonic() - started)
+            metrics.DB_ROWS_WRITTEN.inc(len(rows))
+            print(f"✓ Flushed {len(rows)} analysis rows in one commit")
+            return len(rows)
+
+        except Exception as e:
+            print(f"Error flushing {len(rows)} analysis rows, writing one by one: {e}")
+            traceback.print_exc()
+
+        written = 0
+        for row in rows:
+            try:
+                async with self.db_pool.acquire() as conn:
+                    async with conn.transaction():
+                        await self._write_rows(conn, [row])
+                written += 1
+                metrics.DB_ROWS_WRITTEN.inc()
+            except Exception as e:
+                print(f"Error writing analysis row {row[1][0]}: {e}")
+        return written
+
+    async def get_health_factor_at_block(
+        self, user_address: str, block_number: int
+    ) -> Optional[float]:
+        try:
+            result = await GET_USER_ACCOUNT_DATA.call_async(
+                self.w3.provider, self.analyzer.pool_address, block_number, user_address
+            )
+            health_factor = self.analyzer._format_account_data(result, block_number)[
+                "health_factor"
+            ]
+            self.analyzer.health_index.record(user_address, block_number, health_factor)
+            return health_factor
+        except Exception as e:
+            print(f"Error getting account data at block {block_number}: {e}")
+            return None
+
+    async def find_first_liquidatable_block(
+        self, user_address: str, liquidation_block: int, search_blocks_back: int = 10000
+    ) -> Optional[int]:
+        """
+        Same search as the threaded engine; a round's probes run concurrently.
+        Binary mode is the one-probe-per-round case of the k-ary search.
+        """
+        window_start, start_block = self.analyzer.search_start_block(
+            user_address, liquidation_block, search_blocks_back
+        )
+        if self.analyzer.search_mode == "galloping":
+            search = galloping_search(start_block, liquidation_block)
+        else:
+            probes = (
+                self.analyzer.search_probes_per_round
+                if self.analyzer.search_mode == "kary"
+                else 1
+            )
+            # The liquidation block already shows the liquidated position
+            search = kary_search(start_block, liquidation_block - 1, probes)
+        health_index = self.analyzer.health_index
+        probe_count = 0
+        try:
+            probe_blocks = next(search)
+            while True:
+                probe_count += len(probe_blocks)
+                health_factors = health_index.lookup(user_address, probe_blocks)
+                missing = [block for block in probe_blocks if block not in health_factors]
+                fetched = await asyncio.gather(
+                    *(
+                        self.get_health_factor_at_block(user_address, block)
+                        for block in missing
+                    )
+                )
+                health_factors.update(zip(missing, fetched))
+                probe_blocks = search.send(health_factors)
+        except StopIteration as stop:
+            first_liquidatable_block = stop.value
+
+        self.analyzer.search_stats.record(
+            probe_count,
+            window_start,
+            liquidation_block,
+            first_liquidatable_block,
+            start_block > window_start,
+        )
+        metrics.record_search(self.analyzer.search_mode, probe_count)
+        return (
+            first_liquidatable_block if first_liquidatable_block else liquidation_block
+        )
+
+    async def get_block_timestamp(self, block_number: int) -> datetime:
+        indexed = self.analyzer.indexed_block_timestamp(block_number)
+        if indexed is not None:
+            return indexed
+
+        block = await self.w3.eth.get_block(block_number)
+        if self.analyzer.block_timestamps is not None:
+            self.analyzer.block_timestamps.store(block_number, block.timestamp)
+        return datetime.fromtimestamp(block.timestamp, timezone.utc)
+
+    async def get_price_oracle_at_block(self, block_number: int) -> str:
+        snapshots = self.analyzer.price_snapshots
+        oracle_address = snapshots.oracle_for_block(block_number)
+        if oracle_address is None:
+            oracle_address = await GET_PRICE_ORACLE.call_async(
+                self.w3.provider, POOL_DATA_PROVIDER, block_number
+            )
+            snapshots.record_oracle(block_number, oracle_address)
+        return oracle_address
+
+    async def _fetch_price_snapshot(self, block_number: int, assets: List[str]):
+        oracle_address = await self.get_price_oracle_at_block(block_number)
+        reserve_assets = list(self.analyzer.reserves_data_cache or {})
+        missing = [asset for asset in assets if asset.lower() not in reserve_assets]
+
+        try:
+            snapshot_assets = reserve_assets + missing
+            raw_prices = await GET_ASSETS_PRICES.call_async(
+                self.w3.provider,
+                oracle_address,
+                block_number,
+                [asset.lower() for asset in snapshot_assets],
+            )
+        except Exception:
+            snapshot_assets = list(assets)
+            raw_prices = await asyncio.gather(
+                *(
+                    GET_ASSET_PRICE.call_async(
+                        self.w3.provider, oracle_address, block_number, asset
+                    )
+                    for asset in snapshot_assets
+                )
+            )
+
+        self.analyzer.price_snapshots.store_prices(
+            block_number, dict(zip(snapshot_assets, raw_prices))
+        )
+
+    async def get_asset_prices_at_block(self, block_number: int, assets: List[str]) -> Dict:
+        """
+        Concurrent events in the same block await a single snapshot fetch
+        """
+        snapshots = self.analyzer.price_snapshots
+        prices = snapshots.get_prices(block_number, assets)
+        if prices is not None:
+            return prices
+
+        pending = self._price_fetches.get(block_number)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self._fetch_price_snapshot(block_number, assets)
+            )
+            self._price_fetches[block_number] = pending
+            pending.add_done_callback(
+                lambda _: self._price_fetches.pop(block_number, None)
+            )
+        await pending
+
+        prices = snapshots.get_prices(block_number, assets)
+        if prices is None:
+            # Another event started the fetch without these (non-reserve) assets
+            await self._fetch_price_snapshot(block_number, assets)
+            prices = snapshots.get_prices(block_number, assets)
+        return prices
+
+    async def get_asset_info(self, block_number: int, asset: str) -> Dict:
+        raw_asset_price = (await self.get_asset_prices_at_block(block_number, [asset]))[
+            asset.lower()
+        ]
+
+        info = self.analyzer.reserves_data_cache.get(asset.lower())
+        if info is None:
+            # Unknown reserve: wait for the snapshot refresh off the event loop
+            info = await asyncio.to_thread(self.analyzer.reserves.get, asset)
+        return {
+            "decimals": info.get("decimals"),
+            "symbol": info.get("symbol"),
+            "asset_price_usd": raw_asset_price / (10**8),
+        }
+
+    async def analyze_liquidation_timeline(
+        self, liquidation_event: Dict, search_blocks_back: int = 10000
+    ) -> Dict:
+        (collateral_info, debt_info), first_liquidatable_block = await asyncio.gather(
+            metrics.timed(
+                "prices",
+                asyncio.gather(
+                    self.get_asset_info(
+                        liquidation_event["block_number"],
+                        liquidation_event["collateral_asset"],
+                    ),
+                    self.get_asset_info(
+                        liquidation_event["block_number"], liquidation_event["debt_asset"]
+                    ),
+                ),
+            ),
+            metrics.timed(
+                "search",
+                self.find_first_liquidatable_block(
+                    liquidation_event["user_address"],
+                    liquidation_event["block_number"],
+                    search_blocks_back,
+                ),
+            ),
+        )
+
+        if not first_liquidatable_block:
+            return {"error": "Could not find when position became liquidatable"}
+
+        first_liquidatable_time = await metrics.timed(
+            "timestamp", self.get_block_timestamp(first_liquidatable_block)
+        )
+        return {
+            "first_liquidatable_block": first_liquidatable_block,
+            "first_liquidatable_time": first_liquidatable_time,
+            "time_liquidatable": liquidation_event["liquidation_time"]
+            - first_liquidatable_time,
+            "blocks_liquidatable": liquidation_event["block_number"]
+            - first_liquidatable_block,
+            "collateral_symbol": collateral_info["symbol"],
+            "collateral_decimals": collateral_info["decimals"],
+            "collateral_price_usd": collateral_info["asset_price_usd"],
+            "debt_symbol": debt_info["symbol"],
+            "debt_decimals": debt_info["decimals"],
+            "debt_price_usd": debt_info["asset_price_usd"],
+        }
+
+    async def _process_single_liquidation(self, event: Dict) -> Dict:
+        async with self._semaphore:
+            try:
+                result = await self.analyze_liquidation_timeline(event)
+                if "error" not in result:
+                    await self.update_liquidation_analysis(
+                        event["id"], event["tx_hash"], result
+                    )
+                    return {"success": True, "result": result, "event": event}
+                else:
+                    await self.mark_liquidation_failed(
+                        event["id"], event["tx_hash"], result["error"]
+                    )
+                    return {"success": False, "event": event, "error": result["error"]}
+            except Exception as e:
+                error_msg = str(e)
+                await self.mark_liquidation_failed(
+                    event["id"], event["tx_hash"], error_msg
+                )
+                return {
+                    "success": False,
+                    "event": event,
+                    "error": error_msg,
+                    "traceback": traceback.format_exc(),
+                }
+
+    async def _process_user_liquidations(
+        self, events: List[Dict], after: Optional[asyncio.Future] = None
+    ) -> List[Dict]:
+        """
+        One borrower's events in block order, so later searches reuse the
+        health factors recorded by earlier ones. `after` is the borrower's
+        previous group, from an earlier claim, which runs first.
+        """
+        if after is not None:
+            await asyncio.wait([after])
+        results = []
+        for event in sorted(events, key=lambda event: event["block_number"]):
+            started = time.monotonic()
+            process_result = await self._process_single_liquidation(event)
+            metrics.record_event(process_result["success"], time.monotonic() - started)
+            results.append(process_result)
+        return results
+
+    async def analyze_latest_liquidations(self, num_liquidations: int = 5) -> List[Dict]:
+        """
+        Analyze claimable liquidations with up to `concurrency` in flight,
+        until a claim comes back empty. Events are claimed up to
+        `num_liquidations` at a time whenever a quarter of a claim's worth of
+        slots is free, so no batch waits on its slowest event.
+        """
+        print("=== ANALYZING LIQUIDATION TIMELINES ===")
+        print(f"(async, up to {self.concurrency} in flight, claims of up to {num_liquidations})")
+
+        started = time.monotonic()
+        results = []
+        failed_count = 0
+        claimed = 0
+        completed = 0
+        in_flight = 0
+        refill_at = max(1, min(num_liquidations, self.concurrency) // 4)
+        exhausted = False
+        tasks = set()
+        group_sizes: Dict[asyncio.Future, int] = {}
+        user_tasks: Dict[str, asyncio.Future] = {}
+
+        while True:
+            free = self.concurrency - in_flight
+            if not exhausted and (free >= refill_at or in_flight == 0):
+                events = await self.fetch_liquidations_from_db(
+                    limit=min(free, num_liquidations)
+                )
+                if not events:
+                    exhausted = True
+                claimed += len(events)
+                in_flight += len(events)
+
+                # Borrowers run concurrently; each one's events run in block
+                # order, after any of theirs still in flight
+                for group in self.analyzer.group_by_user(events):
+                    user = group[0]["user_address"].lower()
+                    task = asyncio.ensure_future(
+                        self._process_user_liquidations(group, after=user_tasks.get(user))
+                    )
+                    user_tasks[user] = task
+                    group_sizes[task] = len(group)
+                    tasks.add(task)
+
+            if not tasks:
+                break
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                in_flight -= group_sizes.pop(task)
+                for user, user_task in list(user_tasks.items()):
+                    if user_task is task:
+                        del user_tasks[user]
+
+                for process_result in task.result():
+                    completed += 1
+                    event = process_result["event"]
+
+                    if process_result["success"]:
+                        results.append(process_result["result"])
+                        print(
+                            f"[{completed}/{claimed}] ✓ Analysis complete for tx: {event['tx_hash'][:16]}..."
+                        )
+                    else:
+                        failed_count += 1
+                        print(
+                            f"[{completed}/{claimed}] ✗ Failed tx {event['tx_hash'][:16]}...: {process_result.get('error', 'Unknown error')}"
+                        )
+                        if "traceback" in process_result:
+                            print(f"Traceback: {process_result['traceback'][:200]}...")
+
+        if not claimed:
+            print("No liquidation events found!")
+            return []
+
+        await self.flush_writes()
+        if self.analyzer.block_timestamps is not None:
+            self.analyzer.block_timestamps.flush()
+
+        print("\n=== ASYNC PROCESSING COMPLETE ===")
+        print(
+            f"Successfully analyzed: {len(results)} in {time.monotonic() - started:.1f}s"
+        )
+        if failed_count > 0:
+            print(f"Failed: {failed_count}")
+        if self.rpc_pool is not None:
+            print(
+                f"RPC pool: {self.rpc_pool.endpoint_stats()} "
+                f"({self.rpc_pool.hedged} hedged requests so far, "
+                f"{self.rpc_pool.hedges_skipped} hedges skipped for rate)"
+            )
+        print(f"Search: {self.analyzer.search_stats}")
+
+        return results
@@ -0,0 +1,91 @@
+"""
+Seeded Postgres fixture for benchmarks: recreates a schema holding the
+LiquidationCall rows of a SyntheticMarket (same columns as the Ponder table)
+and runs setup_db on it, so the analyzer claims them like indexed events.
+
+    python bench_fixture.py --schema bench --events 500 --seed 1
+"""
+import argparse
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+import config
+import setup_db
+from rpc_standin import SyntheticMarket
+
+LIQUIDATION_CALL_COLUMNS = [
+    "id",
+    "user_address",
+    "liquidator",
+    "collateral_asset",
+    "debt_asset",
+    "debt_to_cover",
+    "liquidated_collateral_amount",
+    "block_timestamp",
+    "block_number",
+    "tx_hash",
+]
+
+
+def seed_database(market: SyntheticMarket, schema: str, database_url: str = None):
+    """
+    Drop and recreate `schema` with the market's LiquidationCall rows and
+    the analyzer's tables
+    """
+    conn = psycopg2.connect(database_url or config.DATABASE_URL)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(schema)))
+            cur.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(schema)))
+            cur.execute(
+                sql.SQL("""
+                    CREATE TABLE {}.{} (
+                        id TEXT PRIMARY KEY,
+                        user_address TEXT,
+                        liquidator TEXT,
+                        collateral_asset TEXT,
+                        debt_asset TEXT,
+                        debt_to_cover TEXT,
+                        liquidated_collateral_amount TEXT,
+                        block_timestamp INTEGER,
+                        block_number NUMERIC(78, 0),
+                        tx_hash TEXT
+                    )
+                """).format(sql.Identifier(schema), sql.Identifier("LiquidationCall"))
+            )
+            execute_values(
+                cur,
+                sql.SQL("INSERT INTO {}.{} ({}) VALUES %s").format(
+                    sql.Identifier(schema),
+                    sql.Identifier("LiquidationCall"),
+                    sql.SQL(", ").join(map(sql.Identifier, LIQUIDATION_CALL_COLUMNS)),
+                ).as_string(conn),
+                [
+                    tuple(event[column] for column in LIQUIDATION_CALL_COLUMNS)
+                    for event in market.events
+                ],
+                page_size=1000,
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+    schema_before = config.DATABASE_SCHEMA
+    config.DATABASE_SCHEMA = schema
+    try:
+        setup_db.init_db()
+    finally:
+        config.DATABASE_SCHEMA = schema_before
+    print(f"✓ Seeded {len(market.events)} liquidations into schema '{schema}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Seed a benchmark schema with synthetic liquidations.')
+    parser.add_argument('--schema', default='bench', help='Schema to (re)create.')
+    parser.add_argument('--events', type=int, default=500, help='Number of liquidations.')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic market.')
+    args = parser.parse_args()
+
+    seed_database(SyntheticMarket(seed=args.seed, num_events=args.events), args.schema)
@@ -0,0 +1,274 @@
+"""
+End-to-end benchmark of the analysis engines against local stand-ins.
+
+Seeds a Postgres schema with a SyntheticMarket (bench_fixture.py), serves
+the market from an in-process JSON-RPC stand-in (rpc_standin.py) and runs
+each engine over every event. Reports throughput, p50/p99 per-event latency,
+RPC calls and HTTP requests per event, DB commits, and how many first
+liquidatable blocks match the market's ground truth. Only DATABASE_URL is
+needed; the schema (default "bench") is dropped and recreated per run.
+
+    python benchmark.py --events 500 --latency-ms 20 --engine all
+    python benchmark.py --search-mode galloping --error-rate 0.02 --json bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from psycopg2 import sql
+
+import config
+from abis.constants import POOL_ADDRESS
+from bench_fixture import seed_database
+from check import AaveLiquidationAnalyzer
+from reserves_snapshot import ReservesSnapshot
+from rpc_standin import ORACLE_ADDRESS, StandInServer, SyntheticMarket
+
+ENGINES = ["threaded", "async"]
+
+
+class BenchAnalyzer(AaveLiquidationAnalyzer):
+    """
+    Threaded analyzer that times every event and counts committed transactions
+    """
+
+    def __init__(self, chain_id: int = 1):
+        self.commits = 0
+        self.event_seconds: List[float] = []
+        self._bench_lock = threading.Lock()
+        super().__init__(chain_id)
+
+    @contextmanager
+    def get_db_cursor(self):
+        with super().get_db_cursor() as cur:
+            yield cur
+        with self._bench_lock:
+            self.commits += 1
+
+    def _process_single_liquidation(self, event: Dict) -> Dict:
+        started = time.perf_counter()
+        try:
+            return super()._process_single_liquidation(event)
+        finally:
+            with self._bench_lock:
+                self.event_seconds.append(time.perf_counter() - started)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def configure(args, server: StandInServer, market: SyntheticMarket, workdir: str):
+    """
+    Point the analyzer's settings at the stand-ins; local caches start empty
+    """
+    config.RPC_URLS_ETHEREUM = [server.url]
+    config.DATABASE_SCHEMA = args.schema
+    config.RPC_CACHE_PATH = ""
+    config.BLOCK_TIMESTAMP_PATH = os.path.join(workdir, "block_timestamps.bin")
+    config.BLOCK_TIMESTAMP_BASE = min(event["block_number"] for event in market.events) - 20_000
+    config.RESERVES_SNAPSHOT_PATH = os.path.join(workdir, "reserves_snapshot.json")
+    config.RPC_RATE_INITIAL = config.RPC_RATE_MAX = args.rpc_rate
+    config.SEARCH_MODE = args.search_mode
+    config.SEARCH_PROBES_PER_ROUND = args.probes
+    config.WORKER_ID = "benchmark"
+
+    # Reserve metadata comes from a snapshot, as on any warm restart
+    ReservesSnapshot(
+        config.RESERVES_SNAPSHOT_PATH,
+        lambda: (market.head_block, market.reserves_snapshot(), ORACLE_ADDRESS),
+        chain_id=1,
+        pool_address=POOL_ADDRESS,
+    ).refresh()
+
+
+def run_threaded(args, total: int) -> Dict:
+    analyzer = BenchAnalyzer(config.CHAIN_ID)
+    started = time.perf_counter()
+    while len(analyzer.event_seconds) < total:
+        before = len(analyzer.event_seconds)
+        analyzer.analyze_latest_liquidations(
+            num_liquidations=args.batch_size, max_workers=args.workers
+        )
+        if len(analyzer.event_seconds) == before:
+            break
+    elapsed = time.perf_counter() - started
+    return {
+        "analyzer": analyzer,
+        "elapsed": elapsed,
+        "event_seconds": analyzer.event_seconds,
+        "commits": analyzer.commits,
+    }
+
+
+def run_async(args, total: int) -> Dict:
+    from async_engine import AsyncLiquidationAnalyzer
+
+    class BenchAsyncEngine(AsyncLiquidationAnalyzer):
+        commits = 0
+        event_seconds: List[float] = []
+
+        async def _process_single_liquidation(self, event: Dict) -> Dict:
+            started = time.perf_counter()
+            try:
+                return await super()._process_single_liquidation(event)
+            finally:
+                self.event_seconds.append(time.perf_counter() - started)
+
+        async def flush_writes(self) -> int:
+            flushed = await super().flush_writes()
+            if flushed:
+                self.commits += 1
+            return flushed
+
+    analyzer = BenchAnalyzer(config.CHAIN_ID)
+    engine = BenchAsyncEngine(analyzer, concurrency=args.concurrency)
+    engine.event_seconds = []
+
+    async def drive():
+        await engine.start()
+        try:
+            while len(engine.event_seconds) < total:
+                before = len(engine.event_seconds)
+                await engine.analyze_latest_liquidations(num_liquidations=args.batch_size)
+                if len(engine.event_seconds) == before:
+                    break
+        finally:
+            await engine.close()
+
+    started = time.perf_counter()
+    asyncio.run(drive())
+    elapsed = time.perf_counter() - started
+    return {
+        "analyzer": analyzer,
+        "elapsed": elapsed,
+        "event_seconds": engine.event_seconds,
+        # Claims go through the threaded analyzer's cursor
+        "commits": analyzer.commits + engine.commits,
+    }
+
+
+def count_correct(analyzer: AaveLiquidationAnalyzer, market: SyntheticMarket) -> int:
+    truth = {event["id"]: event["first_liquidatable_block"] for event in market.events}
+    with analyzer.get_db_cursor() as cur:
+        cur.execute(
+            sql.SQL(
+                "SELECT id, first_liquidatable_block FROM {}.{} WHERE analysis_status = 'ANALYZED'"
+            ).format(sql.Identifier(config.DATABASE_SCHEMA), sql.Identifier("LiquidationAnalysis"))
+        )
+        rows = cur.fetchall()
+    return sum(1 for row in rows if truth.get(row["id"]) == row["first_liquidatable_block"])
+
+
+def run_engine(engine: str, args, market: SyntheticMarket) -> Dict:
+    server = StandInServer(
+        market=market,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_kind=args.error_kind,
+        seed=args.seed,
+    ).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            configure(args, server, market, workdir)
+            seed_database(market, args.schema)
+            server.reset_counters()
+
+            output = io.StringIO()
+            redirect = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(output)
+            with redirect:
+                run = run_threaded if engine == "threaded" else run_async
+                outcome = run(args, len(market.events))
+            correct = count_correct(outcome["analyzer"], market)
+            outcome["analyzer"].db_pool.closeall()
+    finally:
+        server.stop()
+
+    samples = outcome["event_seconds"]
+    events = len(samples)
+    rpc_calls = sum(server.calls.values())
+    return {
+        "engine": engine,
+        "events": events,
+        "seconds": round(outcome["elapsed"], 3),
+        "events_per_second": round(events / outcome["elapsed"], 2) if outcome["elapsed"] else None,
+        "p50_ms": round(percentile(samples, 50) * 1000, 1) if samples else None,
+        "p99_ms": round(percentile(samples, 99) * 1000, 1) if samples else None,
+        "mean_ms": round(statistics.mean(samples) * 1000, 1) if samples else None,
+        "rpc_calls_per_event": round(rpc_calls / events, 2) if events else None,
+        "http_requests_per_event": round(server.http_requests / events, 2) if events else None,
+        "rpc_calls_by_method": dict(server.calls),
+        "injected_errors": server.injected_errors,
+        "db_commits": outcome["commits"],
+        "correct_first_block": correct,
+    }
+
+
+def print_report(result: Dict):
+    print(f"\n=== {result['engine']} ===")
+    if not result["events"]:
+        print("✗ No events were analyzed")
+        return
+    print(f"Events:      {result['events']} in {result['seconds']:.2f}s "
+          f"({result['events_per_second']:.1f} events/s)")
+    print(f"Latency:     p50 {result['p50_ms']:.1f} ms | p99 {result['p99_ms']:.1f} ms | "
+          f"mean {result['mean_ms']:.1f} ms")
+    print(f"RPC:         {result['rpc_calls_per_event']:.2f} calls/event, "
+          f"{result['http_requests_per_event']:.2f} HTTP requests/event, "
+          f"{result['injected_errors']} injected errors")
+    print(f"             {result['rpc_calls_by_method']}")
+    print(f"DB commits:  {result['db_commits']}")
+    print(f"Accuracy:    {result['correct_first_block']}/{result['events']} first liquidatable blocks match")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis engines against local stand-ins.')
+    parser.add_argument('--engine', choices=ENGINES + ['all'], default='threaded', help='Engine(s) to run.')
+    parser.add_argument('--events', type=int, default=300, help='Liquidations in the synthetic market.')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic market.')
+    parser.add_argument('--schema', default='bench', help='Schema recreated for the fixture.')
+    parser.add_argument('--batch-size', type=int, default=config.BATCH_SIZE, help='Events claimed per batch.')
+    parser.add_argument('--workers', type=int, default=config.MAX_WORKERS, help='Threaded engine workers.')
+    parser.add_argument('--concurrency', type=int, default=config.ASYNC_CONCURRENCY, help='Async engine events in flight.')
+    parser.add_argument('--search-mode', default=config.SEARCH_MODE, help='binary, kary or galloping.')
+    parser.add_argument('--probes', type=int, default=config.SEARCH_PROBES_PER_ROUND, help='Probes per k-ary round.')
+    parser.add_argument('--rpc-rate', type=float, default=10_000, help='RPC rate limit (req/s) during the run.')
+    parser.add_argument('--latency-ms', type=float, default=10, help='Stand-in latency per HTTP request.')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- jitter on the latency.')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of HTTP requests that fail.')
+    parser.add_argument('--error-kind', choices=['429', '500', 'rpc'], default='429', help='How injected failures look.')
+    parser.add_argument('--json', help='Also write the results to this file.')
+    parser.add_argument('--verbose', action='store_true', help='Show the engines\' own output.')
+    args = parser.parse_args()
+
+    market = SyntheticMarket(seed=args.seed, num_events=args.events)
+    print(f"🚀 Benchmarking {args.events} synthetic liquidations "
+          f"(seed {args.seed}, {args.latency_ms:g} ms RPC latency, search {args.search_mode})")
+
+    engines = ENGINES if args.engine == "all" else [args.engine]
+    results = []
+    for engine in engines:
+        result = run_engine(engine, args, market)
+        print_report(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"arguments": vars(args), "results": results}, f, indent=2)
+        print(f"\n✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Local block number -> timestamp index.
+
+Timestamps live in a flat file of little-endian uint32 slots, one per block
+from a base block on (0 = unknown), behind a small header. The file is
+memory-mapped, so a lookup is an array read, and it grows in chunks as later
+blocks are stored. It is filled from liquidation rows (which carry their
+block timestamps), from RPC misses, and in bulk with batched header fetches:
+
+    python block_timestamps.py --from 16291127 --to 21000000
+"""
+import argparse
+import os
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"BLKTS001"
+HEADER = struct.Struct("<8sQ")
+# Slots the file grows by when a block past its end is stored
+GROW_BLOCKS = 1 << 16
+
+# After the merge, mainnet blocks are produced on 12 second slots, so a gap
+# whose timestamps differ by exactly 12s per block has no missed slots
+MERGE_BLOCK = 15537394
+SLOT_SECONDS = 12
+
+
+class BlockTimestampIndex:
+    """
+    Memory-mapped block -> timestamp table shared by all workers of a process
+    """
+
+    def __init__(self, path: str, base_block: int, max_gap: int = 256):
+        self.path = path
+        self.max_gap = max_gap
+        self.hits = 0
+        self.estimated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, base_block))
+                f.truncate(HEADER.size + GROW_BLOCKS * 4)
+
+        with open(path, "rb") as f:
+            magic, stored_base = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a block timestamp index")
+        # The file keeps the base it was created with
+        self.base_block = stored_base
+        self._map = self._open()
+
+    def _open(self) -> np.memmap:
+        return np.memmap(self.path, dtype="<u4", mode="r+", offset=HEADER.size)
+
+    def _grow(self, slots: int):
+        self._map.flush()
+        del self._map
+        size = HEADER.size + (slots + GROW_BLOCKS - slots % GROW_BLOCKS) * 4
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
+        self._map = self._open()
+
+    def get(self, block_number: int) -> Optional[int]:
+        slot = block_number - self.base_block
+        with self._lock:
+            if 0 <= slot < len(self._map):
+                timestamp = int(self._map[slot])
+                if timestamp:
+                    self.hits += 1
+                    return timestamp
+            self.misses += 1
+            return None
+
+    def store(self, block_number: int, timestamp: int):
+        self.store_many({block_number: timestamp})
+
+    def store_many(self, timestamps: Dict[int, int]):
+        """
+        Store {block_number: timestamp}; blocks before the base are ignored
+        """
+        with self._lock:
+            for block_number, timestamp in timestamps.items():
+                slot = block_number - self.base_block
+                if slot < 0 or not timestamp:
+                    continue
+                if slot >= len(self._map):
+                    self._grow(slot + 1)
+                self._map[slot] = int(timestamp)
+
+    def missing(self, block_numbers: Iterable[int]) -> List[int]:
+        """
+        Blocks (at or after the base) whose timestamp is not stored yet
+        """
+        with self._lock:
+            return [
+                block_number
+                for block_number in block_numbers
+                if block_number >= self.base_block
+                and (
+                    block_number - self.base_block >= len(self._map)
+                    or not self._map[block_number - self.base_block]
+                )
+            ]
+
+    def estimate(self, block_number: int) -> Optional[Tuple[int, bool]]:
+        """
+        Interpolate between the nearest stored blocks within max_gap on each
+        side. Returns (timestamp, exact), where exact means the anchors prove
+        there is no missed slot between them; None without two anchors.
+        """
+        slot = block_number - self.base_block
+        with self._lock:
+            if slot <= 0 or slot >= len(self._map) - 1:
+                return None
+            below = self._map[max(0, slot - self.max_gap):slot]
+            above = self._map[slot + 1:slot + 1 + self.max_gap]
+            below_known = np.flatnonzero(below)
+            above_known = np.flatnonzero(above)
+            if below_known.size == 0 or above_known.size == 0:
+                return None
+            low_block = block_number - int(below.size - below_known[-1])
+            high_block = block_number + 1 + int(above_known[0])
+            low_time = int(below[below_known[-1]])
+            high_time = int(above[above_known[0]])
+            self.estimated += 1
+
+        span = high_block - low_block
+        exact = low_block >= MERGE_BLOCK and high_time - low_time == SLOT_SECONDS * span
+        timestamp = low_time + round((high_time - low_time) * (block_number - low_block) / span)
+        return timestamp, exact
+
+    def flush(self):
+        with self._lock:
+            self._map.flush()
+
+
+def fetch_block_timestamps(w3, block_numbers: List[int], batch_size: int = 100) -> Dict[int, int]:
+    """
+    Fetch header timestamps in JSON-RPC batches of batch_size, falling back
+    to one request per block if a batch is rejected
+    """
+    timestamps = {}
+    for i in range(0, len(block_numbers), batch_size):
+        chunk = block_numbers[i:i + batch_size]
+        try:
+            with w3.batch_requests() as batch:
+                for block_number in chunk:
+                    batch.add(w3.eth.get_block(block_number))
+                blocks = batch.execute()
+        except Exception as e:
+            print(f"WARN: batched header request failed, fetching per block: {e}")
+            blocks = [w3.eth.get_block(block_number) for block_number in chunk]
+        for block_number, block in zip(chunk, blocks):
+            timestamps[block_number] = block["timestamp"]
+    return timestamps
+
+
+if __name__ == "__main__":
+    import config
+    from web3 import Web3
+
+    parser = argparse.ArgumentParser(description='Backfill the local block timestamp index.')
+    parser.add_argument('--from', dest='start', type=int, default=config.BLOCK_TIMESTAMP_BASE, help='First block to fill.')
+    parser.add_argument('--to', dest='end', type=int, help='Last block to fill (default: latest).')
+    parser.add_argument('--batch-size', type=int, default=100, help='Headers per JSON-RPC batch.')
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(config.RPC_URLS_ETHEREUM[0]))
+    index = BlockTimestampIndex(config.BLOCK_TIMESTAMP_PATH, config.BLOCK_TIMESTAMP_BASE)
+    end = args.end if args.end is not None else w3.eth.block_number
+    step = args.batch_size * 10
+
+    print(f"📥 Filling block timestamps {args.start} → {end}")
+    filled = 0
+    for chunk_start in range(args.start, end + 1, step):
+        chunk_end = min(chunk_start + step, end + 1)
+        todo = index.missing(range(chunk_start, chunk_end))
+        if todo:
+            index.store_many(fetch_block_timestamps(w3, todo, args.batch_size))
+            filled += len(todo)
+            print(f"  ✓ up to block {chunk_end - 1} ({filled} fetched)")
+    index.flush()
+    print(f"✅ Done, {filled} headers fetched")
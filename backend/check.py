@@ -1,26 +1,43 @@
 import time
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import config
+import metrics
+from abi_calls import (
+    GET_ASSET_PRICE,
+    GET_ASSETS_PRICES,
+    GET_PRICE_ORACLE,
+    GET_USER_ACCOUNT_DATA,
+    CallError,
+)
 from abis.constants import (
-    GET_ASSET_PRICE_ABI,
-    GET_PRICE_ORACLE_ABI,
-    GET_USER_ACCOUNT_DATA_ABI,
-    LIQUIDATION_CALL_EVENT_ABI,
     POOL_ADDRESS,
     POOL_DATA_PROVIDER,
     UI_POOL_DATA_PROVIDER,
     GET_RESERVES_DATA_ABI,
 )
+from block_timestamps import BlockTimestampIndex
+from health_index import HealthFactorIndex
+from price_cache import PriceSnapshotCache
+from providers import CachingProvider, PooledHTTPProvider, RateLimitedProvider
 from psycopg2 import pool, sql
 from psycopg2.extras import RealDictCursor
+from rate_limiter import AdaptiveRateLimiter
+from reserves_snapshot import ReservesSnapshot
+from result_writer import AnalysisResultWriter
+from rpc_cache import RpcResultCache
+from search import SearchStats, galloping_search, kary_search
 from web3 import Web3
 from web3.middleware import ExtraDataToPOAMiddleware
 
 
+# Row in AnalyzerCursor holding the shared high-water mark of claimed events
+CURSOR_NAME = "liquidation_analysis"
+
 
 class AaveLiquidationAnalyzer:
     def __init__(self, chain_id: int = 1):
@@ -33,76 +50,149 @@ class AaveLiquidationAnalyzer:
         self.pool_address = self.pool_addresses[self.chain_id]
 
         self._init_web3()
-        self._init_contracts()
-        self.reserves_data_cache = self.fetch_all_reserves_data()
+        self._init_reserves()
 
     def _load_config(self):
         self.rpc_urls = {
-            1: config.RPC_URL_ETHEREUM,
+            1: config.RPC_URLS_ETHEREUM,
         }
         self.pool_addresses = {
             1: POOL_ADDRESS,
         }
         self.database_url = config.DATABASE_URL
         self.database_schema = config.DATABASE_SCHEMA
+        self.worker_id = config.WORKER_ID
+        self.lease_seconds = config.LEASE_SECONDS
+        self.max_attempts = config.ANALYSIS_MAX_ATTEMPTS
+        self.sweep_interval = config.SWEEP_INTERVAL
+        self._last_sweep = float("-inf")
+        self._sweeping = False
+        self.search_mode = config.SEARCH_MODE
+        self.search_probes_per_round = max(1, config.SEARCH_PROBES_PER_ROUND)
+        self.search_stats = SearchStats()
+        self.block_timestamp_mode = config.BLOCK_TIMESTAMP_MODE
+        self.block_timestamps = (
+            BlockTimestampIndex(
+                config.BLOCK_TIMESTAMP_PATH,
+                config.BLOCK_TIMESTAMP_BASE,
+                max_gap=config.BLOCK_TIMESTAMP_MAX_GAP,
+            )
+            if config.BLOCK_TIMESTAMP_PATH
+            else None
+        )
+        self.rate_limiter = AdaptiveRateLimiter(
+            initial_rate=config.RPC_RATE_INITIAL,
+            min_rate=config.RPC_RATE_MIN,
+            max_rate=config.RPC_RATE_MAX,
+            increase=config.RPC_RATE_INCREASE,
+        )
+        self.price_snapshots = PriceSnapshotCache(max_blocks=config.PRICE_CACHE_BLOCKS)
+        self.health_index = HealthFactorIndex(
+            max_users=config.HEALTH_INDEX_USERS,
+            max_samples_per_user=config.HEALTH_INDEX_SAMPLES_PER_USER,
+        )
+        self.rpc_cache = (
+            RpcResultCache(
+                config.RPC_CACHE_PATH, max_bytes=config.RPC_CACHE_MAX_MB * 1024 * 1024
+            )
+            if config.RPC_CACHE_PATH
+            else None
+        )
         self.db_pool = pool.ThreadedConnectionPool(
             minconn=1, maxconn=10, dsn=self.database_url
         )
+        self.result_writer = AnalysisResultWriter(
+            self.get_db_cursor,
+            self.database_schema,
+            batch_size=config.WRITE_BATCH_SIZE,
+            flush_interval=config.WRITE_FLUSH_SECONDS,
+        )
 
     def _init_web3(self):
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_urls[self.chain_id]))
-        self.w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
-
-    def _init_contracts(self):
-        self.pool_contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(self.pool_address),
-            abi=[LIQUIDATION_CALL_EVENT_ABI, GET_USER_ACCOUNT_DATA_ABI],
+        urls = self.rpc_urls[self.chain_id]
+        self.rpc_pool = (
+            PooledHTTPProvider(urls, limiter=self.rate_limiter) if len(urls) > 1 else None
         )
-
-        self.provider_contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(POOL_DATA_PROVIDER),
-            abi=[GET_PRICE_ORACLE_ABI],
+        provider = RateLimitedProvider(
+            self.rpc_pool or Web3.HTTPProvider(urls[0]), self.rate_limiter
         )
+        if self.rpc_cache is not None:
+            provider = CachingProvider(
+                provider,
+                self.rpc_cache,
+                min_confirmations=config.RPC_CACHE_MIN_CONFIRMATIONS,
+            )
+        self.w3 = Web3(provider)
+        self.w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
 
-        self.price_oracle_address = (
-            self.provider_contract.functions.getPriceOracle().call()
+    def _init_reserves(self):
+        """
+        Start from the local reserves snapshot; only a first run (or a
+        snapshot of another version) waits for getReservesData
+        """
+        self.reserves = ReservesSnapshot(
+            config.RESERVES_SNAPSHOT_PATH,
+            self.fetch_all_reserves_data,
+            chain_id=self.chain_id,
+            pool_address=self.pool_address,
+            refresh_blocks=config.RESERVES_REFRESH_BLOCKS,
         )
+        if self.reserves.load():
+            self.price_snapshots.record_oracle(self.reserves.block, self.reserves.price_oracle)
+            print(
+                f"✓ Loaded {len(self.reserves.reserves)} reserves from snapshot "
+                f"at block {self.reserves.block}"
+            )
+        else:
+            self.reserves.refresh()
 
-        self.price_oracle_contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(self.price_oracle_address),
-            abi=[GET_ASSET_PRICE_ABI],
+    @property
+    def reserves_data_cache(self) -> Dict[str, Dict]:
+        return self.reserves.reserves
+
+    def fetch_all_reserves_data(self) -> tuple:
+        """
+        Reserve metadata at the head block, as (block_number, {asset: info},
+        price oracle). The oracle is the PoolAddressesProvider's AaveOracle at
+        that block, which also anchors the known oracle ranges.
+        """
+        ui_pool_data_provider_contract = self.w3.eth.contract(
+            address=self.w3.to_checksum_address(UI_POOL_DATA_PROVIDER),
+            abi=[GET_RESERVES_DATA_ABI],
         )
+        head_block = self.w3.eth.block_number
+        reserves_data = ui_pool_data_provider_contract.functions.getReservesData(
+            self.w3.to_checksum_address(POOL_DATA_PROVIDER)
+        ).call(block_identifier=head_block)
+
+        reserves_list = reserves_data[0]
+        all_reserves_data = {}
+        for reserve in reserves_list:
+            asset_address = reserve[0]
+
+            all_reserves_data[asset_address.lower()] = {
+                "symbol": reserve[2],
+                "decimals": reserve[3],
+                "ltv": reserve[4],
+                "liquidation_threshold": reserve[5],
+                "liquidation_bonus": reserve[6],
+                "usage_as_collateral_enabled": reserve[8],
+                "is_active": reserve[10],
+                "is_frozen": reserve[11],
+                "a_token": reserve[17].lower(),
+                "variable_debt_token": reserve[18].lower(),
+                # The asset's own price feed, not the AaveOracle
+                "price_source": reserve[23].lower(),
+            }
 
-
-    def fetch_all_reserves_data(self):
-        try:
-            ui_pool_data_provider_contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(UI_POOL_DATA_PROVIDER),
-                abi=[GET_RESERVES_DATA_ABI],
-            )
-            reserves_data = ui_pool_data_provider_contract.functions.getReservesData(
-                self.w3.to_checksum_address(POOL_DATA_PROVIDER)
-            ).call()
-
-            reserves_list = reserves_data[0]
-            all_reserves_data = {}
-            for reserve in reserves_list:
-                asset_address = reserve[0]
-                asset_symbol = reserve[2]
-                asset_decimals = reserve[3]
-
-                all_reserves_data[asset_address.lower()] = {
-                    "symbol": asset_symbol,
-                    "decimals": asset_decimals,
-                }
-            return all_reserves_data
-        except Exception as e:
-            print(f"✗ Error fetching reserves data: {e}")
-            traceback.print_exc()
+        price_oracle = self.get_price_oracle_at_block(head_block)
+        return head_block, all_reserves_data, price_oracle
 
     @contextmanager
     def get_db_cursor(self):
+        started = time.monotonic()
         conn = self.db_pool.getconn()
+        metrics.DB_POOL_WAIT_SECONDS.observe(time.monotonic() - started)
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         try:
             yield cursor
@@ -118,44 +208,50 @@ class AaveLiquidationAnalyzer:
 
     def fetch_liquidations_from_db(self, limit: int = 5) -> List[Dict]:
         """
-        Fetch liquidations from the Ponder Postgres database
+        Claim unanalyzed liquidations from the Ponder Postgres database.
+
+        Claimed rows get a PENDING LiquidationAnalysis row carrying this
+        worker's id and a lease expiry. FOR UPDATE SKIP LOCKED keeps
+        concurrent analyzers from claiming the same events.
+
+        Normal polls only look past the persisted (block_number, id) cursor,
+        so their cost does not grow with history. Every sweep_interval
+        seconds a full sweep also picks up gaps behind the cursor, expired
+        leases of crashed workers and FAILED rows with attempts left; it runs
+        on every following call until it claims fewer than `limit` rows.
         """
         formatted_events = []
         try:
             with self.get_db_cursor() as cur:
-                cur.execute(
-                    sql.SQL("""
-                        SELECT lc.* FROM {}.{} lc
-                        LEFT JOIN {}.{} la ON lc.id = la.id
-                        WHERE la.id IS NULL
-                        ORDER BY lc.block_number ASC
-                        LIMIT %s
-                    """).format(
-                        sql.Identifier(self.database_schema),
-                        sql.Identifier("LiquidationCall"),
-                        sql.Identifier(self.database_schema),
-                        sql.Identifier("LiquidationAnalysis"),
-                    ),
-                    (limit,),
-                )
-
-                records = cur.fetchall()
+                records = []
+                if self._sweeping or time.monotonic() - self._last_sweep >= self.sweep_interval:
+                    records = self._claim_liquidations(cur, limit, after=None)
+                    # A full claim may have left more behind; drain it first
+                    self._sweeping = len(records) >= limit
+                    if not self._sweeping:
+                        self._last_sweep = time.monotonic()
+
+                if not records:
+                    after = self._read_cursor(cur)
+                    records = self._claim_liquidations(cur, limit, after=after)
+                    if records:
+                        last = records[-1]
+                        self._advance_cursor(cur, int(last["block_number"]), last["id"])
 
             if not records:
                 return []
 
             for record in records:
-                formatted_events.append(
+                formatted_events.append(self._format_event(record))
+            self.reserves.note_block(
+                max(event["block_number"] for event in formatted_events)
+            )
+            if self.block_timestamps is not None:
+                # Every event row is a free anchor for the timestamp index
+                self.block_timestamps.store_many(
                     {
-                        **record,
-                        "block_number": int(record["block_number"]),
-                        "debt_to_cover": int(record["debt_to_cover"]),
-                        "liquidated_collateral_amount": int(
-                            record["liquidated_collateral_amount"]
-                        ),
-                        "liquidation_time": datetime.fromtimestamp(
-                            record["block_timestamp"], timezone.utc
-                        ),
+                        event["block_number"]: event["block_timestamp"]
+                        for event in formatted_events
                     }
                 )
             return formatted_events
@@ -165,66 +261,192 @@ class AaveLiquidationAnalyzer:
             traceback.print_exc()
             return []
 
+    def _claim_liquidations(self, cur, limit: int, after: Optional[tuple]) -> List[Dict]:
+        """
+        Claim up to limit events. With `after` set, only events past that
+        (block_number, id) are considered; otherwise run the full sweep.
+        """
+        if after is not None:
+            candidate_filter = sql.SQL(
+                "(lc.block_number, lc.id) > (%s, %s) AND la.id IS NULL"
+            )
+            params = [after[0], after[1]]
+        else:
+            candidate_filter = sql.SQL("""
+                la.id IS NULL
+                OR (
+                    la.analysis_status = 'PENDING'
+                    AND (la.lease_expires_at IS NULL OR la.lease_expires_at < NOW())
+                )
+                OR (la.analysis_status = 'FAILED' AND la.attempts < %s)
+            """)
+            params = [self.max_attempts]
+
+        cur.execute(
+            sql.SQL("""
+                WITH candidates AS (
+                    SELECT lc.id
+                    FROM {schema}.{calls} lc
+                    LEFT JOIN {schema}.{analysis} la ON lc.id = la.id
+                    WHERE {candidate_filter}
+                    ORDER BY lc.block_number ASC, lc.id ASC
+                    LIMIT %s
+                    FOR UPDATE OF lc SKIP LOCKED
+                ),
+                claimed AS (
+                    INSERT INTO {schema}.{analysis} AS existing
+                        (id, analysis_status, worker_id, lease_expires_at, attempts)
+                    SELECT id, 'PENDING', %s, NOW() + make_interval(secs => %s), 1
+                    FROM candidates
+                    ON CONFLICT (id) DO UPDATE SET
+                        analysis_status = 'PENDING',
+                        worker_id = EXCLUDED.worker_id,
+                        lease_expires_at = EXCLUDED.lease_expires_at,
+                        attempts = existing.attempts + 1
+                    WHERE (
+                        existing.analysis_status = 'PENDING'
+                        AND (existing.lease_expires_at IS NULL OR existing.lease_expires_at < NOW())
+                    ) OR (
+                        existing.analysis_status = 'FAILED' AND existing.attempts < %s
+                    )
+                    RETURNING id
+                )
+                SELECT lc.* FROM {schema}.{calls} lc
+                JOIN claimed ON lc.id = claimed.id
+                ORDER BY lc.block_number ASC, lc.id ASC
+            """).format(
+                schema=sql.Identifier(self.database_schema),
+                calls=sql.Identifier("LiquidationCall"),
+                analysis=sql.Identifier("LiquidationAnalysis"),
+                candidate_filter=candidate_filter,
+            ),
+            (*params, limit, self.worker_id, self.lease_seconds, self.max_attempts),
+        )
+        return cur.fetchall()
+
+    def _read_cursor(self, cur) -> tuple:
+        """
+        Return the persisted (block_number, id) high-water mark. On first use
+        it starts after the newest analyzed event; older gaps are left to the sweep.
+        """
+        cur.execute(
+            sql.SQL("SELECT block_number, last_id FROM {}.{} WHERE name = %s").format(
+                sql.Identifier(self.database_schema),
+                sql.Identifier("AnalyzerCursor"),
+            ),
+            (CURSOR_NAME,),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            return int(row["block_number"]), row["last_id"]
+
+        cur.execute(
+            sql.SQL("""
+                SELECT lc.block_number, lc.id FROM {}.{} lc
+                JOIN {}.{} la ON lc.id = la.id
+                WHERE la.analysis_status <> 'PENDING'
+                ORDER BY lc.block_number DESC, lc.id DESC
+                LIMIT 1
+            """).format(
+                sql.Identifier(self.database_schema),
+                sql.Identifier("LiquidationCall"),
+                sql.Identifier(self.database_schema),
+                sql.Identifier("LiquidationAnalysis"),
+            )
+        )
+        row = cur.fetchone()
+        if row is None:
+            return -1, ""
+        return int(row["block_number"]), row["id"]
+
+    def count_backlog(self) -> int:
+        """
+        Count events past the claim cursor that no worker has claimed yet
+        """
+        with self.get_db_cursor() as cur:
+            after = self._read_cursor(cur)
+            cur.execute(
+                sql.SQL("""
+                    SELECT COUNT(*) AS backlog
+                    FROM {schema}.{calls} lc
+                    LEFT JOIN {schema}.{analysis} la ON lc.id = la.id
+                    WHERE (lc.block_number, lc.id) > (%s, %s) AND la.id IS NULL
+                """).format(
+                    schema=sql.Identifier(self.database_schema),
+                    calls=sql.Identifier("LiquidationCall"),
+                    analysis=sql.Identifier("LiquidationAnalysis"),
+                ),
+                after,
+            )
+            return cur.fetchone()["backlog"]
+
+    def _advance_cursor(self, cur, block_number: int, last_id: str):
+        cur.execute(
+            sql.SQL("""
+                INSERT INTO {schema}.{cursor} AS existing (name, block_number, last_id, updated_at)
+                VALUES (%s, %s, %s, NOW())
+                ON CONFLICT (name) DO UPDATE SET
+                    block_number = EXCLUDED.block_number,
+                    last_id = EXCLUDED.last_id,
+                    updated_at = EXCLUDED.updated_at
+                WHERE (existing.block_number, existing.last_id)
+                    < (EXCLUDED.block_number, EXCLUDED.last_id)
+            """).format(
+                schema=sql.Identifier(self.database_schema),
+                cursor=sql.Identifier("AnalyzerCursor"),
+            ),
+            (CURSOR_NAME, block_number, last_id),
+        )
+
+    @staticmethod
+    def _format_event(record: Dict) -> Dict:
+        return {
+            **record,
+            "block_number": int(record["block_number"]),
+            "debt_to_cover": int(record["debt_to_cover"]),
+            "liquidated_collateral_amount": int(
+                record["liquidated_collateral_amount"]
+            ),
+            "liquidation_time": datetime.fromtimestamp(
+                record["block_timestamp"], timezone.utc
+            ),
+        }
+
+    @staticmethod
+    def _analysis_values(liquidation_id: str, analysis_result: Dict) -> tuple:
+        """
+        Row values for the LiquidationAnalysis upsert, shared by every engine
+        """
+        return (
+            liquidation_id,
+            "ANALYZED",
+            analysis_result.get("first_liquidatable_block"),
+            analysis_result.get("first_liquidatable_time"),
+            int(analysis_result.get("time_liquidatable").total_seconds())
+            if analysis_result.get("time_liquidatable")
+            else None,
+            analysis_result.get("blocks_liquidatable"),
+            analysis_result.get("collateral_symbol"),
+            analysis_result.get("collateral_decimals"),
+            analysis_result.get("collateral_price_usd"),
+            analysis_result.get("debt_symbol"),
+            analysis_result.get("debt_decimals"),
+            analysis_result.get("debt_price_usd"),
+        )
+
     def update_liquidation_analysis(
         self, liquidation_id: str, tx_hash: str, analysis_result: Dict
     ) -> bool:
         """
-        Insert analysis results into LiquidationAnalysis table and update status
+        Queue analysis results for the LiquidationAnalysis table; rows are
+        written in bulk by self.result_writer
         """
         try:
-            with self.get_db_cursor() as cur:
-                cur.execute(
-                    sql.SQL("""
-                        INSERT INTO {}.{} (
-                            id,
-                            analysis_status,
-                            first_liquidatable_block,
-                            first_liquidatable_time,
-                            latency_seconds,
-                            blocks_liquidatable,
-                            collateral_symbol,
-                            collateral_decimals,
-                            collateral_price_usd,
-                            debt_symbol,
-                            debt_decimals,
-                            debt_price_usd
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (id) DO UPDATE SET
-                            analysis_status = EXCLUDED.analysis_status,
-                            first_liquidatable_block = EXCLUDED.first_liquidatable_block,
-                            first_liquidatable_time = EXCLUDED.first_liquidatable_time,
-                            latency_seconds = EXCLUDED.latency_seconds,
-                            blocks_liquidatable = EXCLUDED.blocks_liquidatable,
-                            collateral_symbol = EXCLUDED.collateral_symbol,
-                            collateral_decimals = EXCLUDED.collateral_decimals,
-                            collateral_price_usd = EXCLUDED.collateral_price_usd,
-                            debt_symbol = EXCLUDED.debt_symbol,
-                            debt_decimals = EXCLUDED.debt_decimals,
-                            debt_price_usd = EXCLUDED.debt_price_usd
-                    """).format(
-                        sql.Identifier(self.database_schema),
-                        sql.Identifier("LiquidationAnalysis"),
-                    ),
-                    (
-                        liquidation_id,
-                        "ANALYZED",
-                        analysis_result.get("first_liquidatable_block"),
-                        analysis_result.get("first_liquidatable_time"),
-                        int(analysis_result.get("time_liquidatable").total_seconds())
-                        if analysis_result.get("time_liquidatable")
-                        else None,
-                        analysis_result.get("blocks_liquidatable"),
-                        analysis_result.get("collateral_symbol"),
-                        analysis_result.get("collateral_decimals"),
-                        analysis_result.get("collateral_price_usd"),
-                        analysis_result.get("debt_symbol"),
-                        analysis_result.get("debt_decimals"),
-                        analysis_result.get("debt_price_usd"),
-                    ),
+            with metrics.stage("db_write"):
+                self.result_writer.add_analyzed(
+                    liquidation_id, self._analysis_values(liquidation_id, analysis_result)
                 )
-
-                print(f"✓ Updated status for tx: {tx_hash}")
-                return True
+            return True
 
         except Exception as e:
             print(f"Error updating database for tx {tx_hash}: {e}")
@@ -235,25 +457,12 @@ class AaveLiquidationAnalyzer:
         self, liquidation_id: str, tx_hash: str, error_message: str
     ) -> bool:
         """
-        Mark a liquidation analysis status as failed
+        Queue a failed status for a liquidation analysis
         """
         try:
-            with self.get_db_cursor() as cur:
-                cur.execute(
-                    sql.SQL("""
-                        INSERT INTO {}.{} (id, analysis_status, error_message)
-                        VALUES (%s, %s, %s)
-                        ON CONFLICT (id) DO UPDATE SET
-                            analysis_status = EXCLUDED.analysis_status,
-                            error_message = EXCLUDED.error_message
-                    """).format(
-                        sql.Identifier(self.database_schema),
-                        sql.Identifier("LiquidationAnalysis"),
-                    ),
-                    (liquidation_id, "FAILED", error_message),
-                )
-                print(f"✓ Recorded failure for tx: {tx_hash}")
-                return True
+            with metrics.stage("db_write"):
+                self.result_writer.add_failed(liquidation_id, error_message)
+            return True
 
         except Exception as e:
             print(f"Error marking tx as failed {tx_hash}: {e}")
@@ -267,90 +476,340 @@ class AaveLiquidationAnalyzer:
         Get user account data at a specific block using the ABI
         """
         try:
-            result = self.pool_contract.functions.getUserAccountData(
-                self.w3.to_checksum_address(user_address)
-            ).call(block_identifier=block_number)
-
-            (
-                total_collateral,
-                total_debt,
-                available_borrows,
-                liquidation_threshold,
-                ltv,
-                health_factor,
-            ) = result
-
-            health_factor_float = health_factor / 1e18 if health_factor > 0 else 0
+            result = GET_USER_ACCOUNT_DATA.call(
+                self.w3.provider, self.pool_address, block_number, user_address
+            )
 
-            return {
-                "total_collateral": total_collateral / 1e8,
-                "total_debt": total_debt / 1e8,
-                "available_borrows": available_borrows / 1e8,
-                "liquidation_threshold": liquidation_threshold / 100,
-                "ltv": ltv / 100,
-                "health_factor": health_factor_float,
-                "block_number": block_number,
-            }
+            account_data = self._format_account_data(result, block_number)
+            self.health_index.record(
+                user_address, block_number, account_data["health_factor"]
+            )
+            return account_data
         except Exception as e:
             traceback.print_exc()
             print(f"Error getting account data at block {block_number}: {e}")
             return None
 
+    def get_user_account_data_at_blocks(
+        self, user_address: str, block_numbers: List[int]
+    ) -> Dict[int, Optional[Dict]]:
+        """
+        Get user account data at several blocks in a single JSON-RPC batch.
+        Falls back to one call per block if the batch is rejected.
+        """
+        try:
+            results = GET_USER_ACCOUNT_DATA.call_batch(
+                self.w3.provider,
+                self.pool_address,
+                [(block_number, (user_address,)) for block_number in block_numbers],
+            )
+        except Exception as e:
+            print(f"WARN: batched account data request failed, probing per block: {e}")
+            return {
+                block_number: self.get_user_account_data_at_block(
+                    user_address, block_number
+                )
+                for block_number in block_numbers
+            }
+
+        account_data = {}
+        for block_number, result in zip(block_numbers, results):
+            if isinstance(result, CallError):
+                print(f"Error getting account data at block {block_number}: {result}")
+                account_data[block_number] = None
+                continue
+            data = account_data[block_number] = self._format_account_data(
+                result, block_number
+            )
+            self.health_index.record(user_address, block_number, data["health_factor"])
+        return account_data
+
+    @staticmethod
+    def _format_account_data(result, block_number: int) -> Dict:
+        (
+            total_collateral,
+            total_debt,
+            available_borrows,
+            liquidation_threshold,
+            ltv,
+            health_factor,
+        ) = result
+
+        health_factor_float = health_factor / 1e18 if health_factor > 0 else 0
+
+        return {
+            "total_collateral": total_collateral / 1e8,
+            "total_debt": total_debt / 1e8,
+            "available_borrows": available_borrows / 1e8,
+            "liquidation_threshold": liquidation_threshold / 100,
+            "ltv": ltv / 100,
+            "health_factor": health_factor_float,
+            "block_number": block_number,
+        }
+
+    def probe_health_factors(
+        self, user_address: str, block_numbers: List[int]
+    ) -> Dict[int, Optional[float]]:
+        """
+        Health factors at block_numbers (None where unreadable). Blocks the
+        health factor index already covers skip the RPC; the rest are fetched
+        with one call, or one batch for several blocks.
+        """
+        health_factors = self.health_index.lookup(user_address, block_numbers)
+        missing = [block for block in block_numbers if block not in health_factors]
+        if len(missing) == 1:
+            account_data = {
+                missing[0]: self.get_user_account_data_at_block(user_address, missing[0])
+            }
+        elif missing:
+            account_data = self.get_user_account_data_at_blocks(user_address, missing)
+        else:
+            account_data = {}
+
+        for block_number in missing:
+            data = account_data.get(block_number)
+            if data is None:
+                print("WARN: couldnt fetch account data")
+                health_factors[block_number] = None
+            else:
+                health_factors[block_number] = data["health_factor"]
+        return health_factors
+
     def binary_search_liquidatable_block(
         self, user_address: str, liquidation_block: int, search_blocks_back: int = 10000
     ) -> Optional[int]:
         """
         Use binary search to find the first block where health factor < 1.0
         """
-        start_block = max(1, liquidation_block - search_blocks_back)
+        window_start, start_block = self.search_start_block(
+            user_address, liquidation_block, search_blocks_back
+        )
         end_block = liquidation_block
         first_liquidatable_block = None
 
+        window = (window_start, end_block)
+        probes = 0
+
         while start_block <= end_block:
             mid_block = (start_block + end_block) // 2
-            account_data = self.get_user_account_data_at_block(user_address, mid_block)
+            probes += 1
+            health_factor = self.probe_health_factors(user_address, [mid_block])[
+                mid_block
+            ]
 
-            if account_data is None:
-                print("WARN: couldnt fetch account data")
+            if health_factor is None:
                 start_block = mid_block + 1
                 continue
 
-            health_factor = account_data["health_factor"]
-
             if health_factor < 1.0:
                 first_liquidatable_block = mid_block
                 end_block = mid_block - 1
             else:
                 start_block = mid_block + 1
 
-            time.sleep(0.1)
+        self.search_stats.record(
+            probes, *window, first_liquidatable_block, start_block > window_start
+        )
+        metrics.record_search(self.search_mode, probes)
+        return (
+            first_liquidatable_block if first_liquidatable_block else liquidation_block
+        )
+
+    def search_start_block(
+        self, user_address: str, liquidation_block: int, search_blocks_back: int
+    ) -> Tuple[int, int]:
+        """
+        (window start, search start) for a search back from liquidation_block.
+        The search starts after the nearest healthy block the health factor
+        index can vouch for (see HealthFactorIndex.healthy_floor), else at
+        the window start.
+        """
+        window_start = max(1, liquidation_block - search_blocks_back)
+        floor = self.health_index.healthy_floor(user_address, window_start, liquidation_block)
+        return window_start, window_start if floor is None else floor + 1
+
+    def _run_search(
+        self, user_address: str, search, start_block: int, end_block: int, narrowed: bool = False
+    ):
+        """
+        Drive a search generator (see search.py) over [start_block, end_block]
+        with batched probes and return its result; narrowed searches started
+        past start_block
+        """
+        probes = 0
+        try:
+            probe_blocks = next(search)
+            while True:
+                probes += len(probe_blocks)
+                probe_blocks = search.send(
+                    self.probe_health_factors(user_address, probe_blocks)
+                )
+        except StopIteration as stop:
+            first_liquidatable_block = stop.value
+
+        self.search_stats.record(probes, start_block, end_block, first_liquidatable_block, narrowed)
+        metrics.record_search(self.search_mode, probes)
+        return first_liquidatable_block
+
+    def kary_search_liquidatable_block(
+        self, user_address: str, liquidation_block: int, search_blocks_back: int = 10000
+    ) -> Optional[int]:
+        """
+        K-ary variant of binary_search_liquidatable_block. Each round probes
+        search_probes_per_round evenly spaced blocks in one batch and keeps the
+        sub-window after the last healthy probe
+        """
+        window_start, start_block = self.search_start_block(
+            user_address, liquidation_block, search_blocks_back
+        )
+        # The liquidation block already shows the liquidated position
+        first_liquidatable_block = self._run_search(
+            user_address,
+            kary_search(start_block, liquidation_block - 1, self.search_probes_per_round),
+            window_start,
+            liquidation_block,
+            start_block > window_start,
+        )
+
         return (
             first_liquidatable_block if first_liquidatable_block else liquidation_block
         )
 
+    def galloping_search_liquidatable_block(
+        self, user_address: str, liquidation_block: int, search_blocks_back: int = 10000
+    ) -> Optional[int]:
+        """
+        Probe back from the liquidation block at offsets 1, 2, 4, ... until a
+        healthy block is found, then bisect that bracket. If the block before
+        the liquidation is already healthy, the liquidation block is the answer
+        """
+        window_start, start_block = self.search_start_block(
+            user_address, liquidation_block, search_blocks_back
+        )
+        first_liquidatable_block = self._run_search(
+            user_address,
+            galloping_search(start_block, liquidation_block),
+            window_start,
+            liquidation_block,
+            start_block > window_start,
+        )
+
+        return (
+            first_liquidatable_block if first_liquidatable_block else liquidation_block
+        )
+
+    def find_first_liquidatable_block(
+        self, user_address: str, liquidation_block: int, search_blocks_back: int = 10000
+    ) -> Optional[int]:
+        """
+        Dispatch to the search strategy selected by config.SEARCH_MODE
+        """
+        if self.search_mode == "kary":
+            return self.kary_search_liquidatable_block(
+                user_address, liquidation_block, search_blocks_back
+            )
+        if self.search_mode == "galloping":
+            return self.galloping_search_liquidatable_block(
+                user_address, liquidation_block, search_blocks_back
+            )
+        return self.binary_search_liquidatable_block(
+            user_address, liquidation_block, search_blocks_back
+        )
+
+    def indexed_block_timestamp(self, block_number: int) -> Optional[datetime]:
+        """
+        Timestamp of a block from the local index, or None if it needs an RPC.
+        Interpolated timestamps are used when the surrounding blocks prove
+        them, or always in the "estimate" BLOCK_TIMESTAMP_MODE.
+        """
+        if self.block_timestamps is None:
+            return None
+        timestamp = self.block_timestamps.get(block_number)
+        if timestamp is None:
+            estimate = self.block_timestamps.estimate(block_number)
+            if estimate is not None:
+                timestamp, exact = estimate
+                if exact:
+                    self.block_timestamps.store(block_number, timestamp)
+                elif self.block_timestamp_mode != "estimate":
+                    timestamp = None
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, timezone.utc)
+
     def get_block_timestamp(self, block_number: int) -> datetime:
         """
         Get timestamp for a block
         """
+        indexed = self.indexed_block_timestamp(block_number)
+        if indexed is not None:
+            return indexed
+
         block = self.w3.eth.get_block(block_number)
+        if self.block_timestamps is not None:
+            self.block_timestamps.store(block_number, block.timestamp)
         return datetime.fromtimestamp(block.timestamp, timezone.utc)
 
-    def get_asset_info(self, block_number, asset):
-        historical_price_oracle_address = (
-            self.provider_contract.functions.getPriceOracle().call(
-                block_identifier=block_number
+    def get_price_oracle_at_block(self, block_number: int) -> str:
+        """
+        Get the price oracle address at a block, reusing known block ranges
+        """
+        oracle_address = self.price_snapshots.oracle_for_block(block_number)
+        if oracle_address is None:
+            oracle_address = GET_PRICE_ORACLE.call(
+                self.w3.provider, POOL_DATA_PROVIDER, block_number
             )
-        )
-        historical_price_oracle_contract = self.w3.eth.contract(
-            address=self.w3.to_checksum_address(historical_price_oracle_address),
-            abi=[GET_ASSET_PRICE_ABI],
-        )
+            self.price_snapshots.record_oracle(block_number, oracle_address)
+        return oracle_address
 
-        raw_asset_price = historical_price_oracle_contract.functions.getAssetPrice(
-            self.w3.to_checksum_address(asset)
-        ).call(block_identifier=block_number)
+    def get_asset_prices_at_block(self, block_number: int, assets: List[str]) -> Dict:
+        """
+        Get raw oracle prices for assets at a block. The first request for a
+        block fetches every known reserve in one getAssetsPrices call.
+        """
+        prices = self.price_snapshots.get_prices(block_number, assets)
+        if prices is not None:
+            return prices
+
+        with self.price_snapshots.block_lock(block_number):
+            prices = self.price_snapshots.get_prices(block_number, assets)
+            if prices is not None:
+                return prices
+
+            oracle_address = self.get_price_oracle_at_block(block_number)
+            reserve_assets = list(self.reserves_data_cache or {})
+            missing = [asset for asset in assets if asset.lower() not in reserve_assets]
+
+            try:
+                snapshot_assets = reserve_assets + missing
+                raw_prices = GET_ASSETS_PRICES.call(
+                    self.w3.provider,
+                    oracle_address,
+                    block_number,
+                    [asset.lower() for asset in snapshot_assets],
+                )
+            except Exception:
+                # A reserve listed today may have no price source at an older
+                # block, which reverts the whole call; price only what we need
+                snapshot_assets = list(assets)
+                raw_prices = [
+                    GET_ASSET_PRICE.call(
+                        self.w3.provider, oracle_address, block_number, asset
+                    )
+                    for asset in snapshot_assets
+                ]
 
-        info = self.reserves_data_cache.get(asset.lower(), {})
+            self.price_snapshots.store_prices(
+                block_number, dict(zip(snapshot_assets, raw_prices))
+            )
+            return self.price_snapshots.get_prices(block_number, assets)
+
+    def get_asset_info(self, block_number, asset):
+        raw_asset_price = self.get_asset_prices_at_block(block_number, [asset])[
+            asset.lower()
+        ]
+
+        info = self.reserves.get(asset)
         return {
             "decimals": info.get("decimals"),
             "symbol": info.get("symbol"),
@@ -367,21 +826,24 @@ class AaveLiquidationAnalyzer:
             liquidation_event: Event data from find_latest_liquidation_events
             search_blocks_back: How many blocks to search back for first liquidatable block
         """
-        collateral_info = self.get_asset_info(
-            liquidation_event["block_number"], liquidation_event["collateral_asset"]
-        )
-        debt_info = self.get_asset_info(
-            liquidation_event["block_number"], liquidation_event["debt_asset"]
-        )
+        with metrics.stage("prices"):
+            collateral_info = self.get_asset_info(
+                liquidation_event["block_number"], liquidation_event["collateral_asset"]
+            )
+            debt_info = self.get_asset_info(
+                liquidation_event["block_number"], liquidation_event["debt_asset"]
+            )
 
-        first_liquidatable_block = self.binary_search_liquidatable_block(
-            liquidation_event["user_address"],
-            liquidation_event["block_number"],
-            search_blocks_back,
-        )
+        with metrics.stage("search"):
+            first_liquidatable_block = self.find_first_liquidatable_block(
+                liquidation_event["user_address"],
+                liquidation_event["block_number"],
+                search_blocks_back,
+            )
 
         if first_liquidatable_block:
-            first_liquidatable_time = self.get_block_timestamp(first_liquidatable_block)
+            with metrics.stage("timestamp"):
+                first_liquidatable_time = self.get_block_timestamp(first_liquidatable_block)
             time_liquidatable = (
                 liquidation_event["liquidation_time"] - first_liquidatable_time
             )
@@ -433,6 +895,29 @@ class AaveLiquidationAnalyzer:
                 "traceback": traceback.format_exc(),
             }
 
+    def _process_user_liquidations(self, events: List[Dict]) -> List[Dict]:
+        """
+        Process one borrower's events in block order on a single worker, so
+        each search starts from the health factors the previous ones recorded
+        """
+        results = []
+        for event in sorted(events, key=lambda event: event["block_number"]):
+            started = time.monotonic()
+            process_result = self._process_single_liquidation(event)
+            metrics.record_event(process_result["success"], time.monotonic() - started)
+            results.append(process_result)
+        return results
+
+    @staticmethod
+    def group_by_user(events: List[Dict]) -> List[List[Dict]]:
+        """
+        Group events by borrower, keeping the order of each group's first event
+        """
+        groups = defaultdict(list)
+        for event in events:
+            groups[event["user_address"].lower()].append(event)
+        return list(groups.values())
+
     def analyze_latest_liquidations(
         self, num_liquidations: int = 5, max_workers: int = 5
     ) -> List[Dict]:
@@ -459,23 +944,35 @@ class AaveLiquidationAnalyzer:
         results = []
         failed_count = 0
 
-        actual_workers = min(max_workers, len(events))
+        # Repeated liquidations of one borrower share a worker, in block order
+        user_groups = self.group_by_user(events[:num_liquidations])
+        actual_workers = min(max_workers, len(user_groups))
 
         with ThreadPoolExecutor(max_workers=actual_workers) as executor:
-            future_to_event = {
-                executor.submit(self._process_single_liquidation, event): event
-                for event in events[:num_liquidations]
+            future_to_events = {
+                executor.submit(self._process_user_liquidations, group): group
+                for group in user_groups
             }
 
             completed = 0
-            total = len(future_to_event)
-
-            for future in as_completed(future_to_event):
-                completed += 1
-                event = future_to_event[future]
+            total = sum(len(group) for group in user_groups)
 
+            for future in as_completed(future_to_events):
                 try:
-                    process_result = future.result()
+                    process_results = future.result()
+                except Exception as e:
+                    for event in future_to_events[future]:
+                        completed += 1
+                        failed_count += 1
+                        print(
+                            f"[{completed}/{total}] ✗ Exception for tx {event['tx_hash'][:16]}...: {e}"
+                        )
+                    traceback.print_exc()
+                    continue
+
+                for process_result in process_results:
+                    completed += 1
+                    event = process_result["event"]
 
                     if process_result["success"]:
                         results.append(process_result["result"])
@@ -490,16 +987,37 @@ class AaveLiquidationAnalyzer:
                         if "traceback" in process_result:
                             print(f"Traceback: {process_result['traceback'][:200]}...")
 
-                except Exception as e:
-                    failed_count += 1
-                    print(
-                        f"[{completed}/{total}] ✗ Exception for tx {event['tx_hash'][:16]}...: {e}"
-                    )
-                    traceback.print_exc()
+        self.result_writer.flush()
 
         print("\n=== PARALLEL PROCESSING COMPLETE ===")
         print(f"Successfully analyzed: {len(results)}")
         if failed_count > 0:
             print(f"Failed: {failed_count}")
+        print(
+            f"RPC rate limit: {self.rate_limiter.rate:.1f} req/s "
+            f"({self.rate_limiter.throttled} throttled responses so far)"
+        )
+        if self.rpc_pool is not None:
+            print(
+                f"RPC pool: {self.rpc_pool.endpoint_stats()} "
+                f"({self.rpc_pool.hedged} hedged requests so far, "
+                f"{self.rpc_pool.hedges_skipped} hedges skipped for rate)"
+            )
+        if self.rpc_cache is not None:
+            print(
+                f"RPC cache: {self.rpc_cache.hits} hits / {self.rpc_cache.misses} misses"
+            )
+        print(f"Search: {self.search_stats}")
+        if self.block_timestamps is not None:
+            self.block_timestamps.flush()
+            print(
+                f"Block timestamps: {self.block_timestamps.hits} indexed / "
+                f"{self.block_timestamps.estimated} interpolated / "
+                f"{self.block_timestamps.misses} misses"
+            )
+        print(
+            f"Health factor index: {len(self.health_index)} users, "
+            f"{self.health_index.hits} hits / {self.health_index.misses} misses"
+        )
 
         return results
@@ -0,0 +1,118 @@
+"""
+Column-oriented encodings of liquidation rows for the dashboard.
+
+Row-oriented JSON repeats every key on every record and spells each address
+out again wherever it appears. The columnar JSON form sends one array per
+field instead, with address and symbol columns replaced by indexes into
+shared dictionaries:
+
+    {
+        "format": "columnar-v1",
+        "length": 2,
+        "dictionaries": {"address": ["0xabc...", ...], "symbol": ["WETH", ...]},
+        "columns": {"id": [...], "liquidator": [0, 0], "debt_symbol": [1, null], ...}
+    }
+
+Arrow IPC is offered as well when pyarrow is installed.
+"""
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+COLUMNAR_FORMAT = "columnar-v1"
+COLUMNAR_MIMETYPE = "application/vnd.liquidations.columnar+json"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+# Columns encoded as indexes into the shared address / symbol dictionaries
+DICTIONARY_COLUMNS = {
+    "user": "address",
+    "liquidator": "address",
+    "collateral_asset": "address",
+    "debt_asset": "address",
+    "collateral_symbol": "symbol",
+    "debt_symbol": "symbol",
+}
+
+
+def arrow_available() -> bool:
+    return pyarrow is not None
+
+
+def to_columns(rows: Iterable[Dict], fields: Optional[List[str]] = None) -> Dict:
+    """
+    Encode rows into the columnar-v1 layout; `fields` fixes the column order
+    (and the columns of an empty result), defaulting to the first row's keys
+    """
+    rows = list(rows)
+    if fields is None:
+        fields = list(rows[0].keys()) if rows else []
+
+    dictionaries = {name: [] for name in dict.fromkeys(DICTIONARY_COLUMNS.values())}
+    indexes = {name: {} for name in dictionaries}
+    columns = {field: [] for field in fields}
+
+    for row in rows:
+        for field in fields:
+            value = row.get(field)
+            dictionary = DICTIONARY_COLUMNS.get(field)
+            if dictionary is not None and value is not None:
+                index = indexes[dictionary].get(value)
+                if index is None:
+                    index = indexes[dictionary][value] = len(dictionaries[dictionary])
+                    dictionaries[dictionary].append(value)
+                value = index
+            columns[field].append(value)
+
+    return {
+        "format": COLUMNAR_FORMAT,
+        "length": len(rows),
+        "dictionaries": dictionaries,
+        "columns": columns,
+    }
+
+
+def from_columns(payload: Dict) -> List[Dict]:
+    """
+    Decode a columnar-v1 payload back into row dicts
+    """
+    dictionaries = payload["dictionaries"]
+    decoded = {}
+    for field, values in payload["columns"].items():
+        dictionary = DICTIONARY_COLUMNS.get(field)
+        if dictionary is not None:
+            lookup = dictionaries[dictionary]
+            values = [None if value is None else lookup[value] for value in values]
+        decoded[field] = values
+
+    return [
+        {field: values[i] for field, values in decoded.items()}
+        for i in range(payload["length"])
+    ]
+
+
+def to_arrow_ipc(rows: Iterable[Dict], metadata: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Encode rows as an Arrow IPC stream with address and symbol columns
+    dictionary-encoded; raises RuntimeError if pyarrow is not installed
+    """
+    if pyarrow is None:
+        raise RuntimeError("pyarrow is not installed")
+
+    rows = list(rows)
+    fields = list(rows[0].keys()) if rows else []
+    arrays = {}
+    for field in fields:
+        values = pyarrow.array([row.get(field) for row in rows])
+        if field in DICTIONARY_COLUMNS:
+            values = values.dictionary_encode()
+        arrays[field] = values
+
+    table = pyarrow.table(arrays).replace_schema_metadata(metadata or {})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
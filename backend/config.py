@@ -1,9 +1,16 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
 
 RPC_URL_ETHEREUM = os.getenv("RPC_URL_ETHEREUM")
+# Comma-separated list of endpoints; requests go to the fastest healthy one
+RPC_URLS_ETHEREUM = [
+    url.strip()
+    for url in os.getenv("RPC_URLS_ETHEREUM", RPC_URL_ETHEREUM or "").split(",")
+    if url.strip()
+]
 DATABASE_URL = os.getenv("DATABASE_URL")
 DATABASE_SCHEMA = os.getenv("DATABASE_SCHEMA", "ponder")
 
@@ -11,9 +18,89 @@ CHAIN_ID = int(os.getenv("CHAIN_ID", "1"))
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))
 SEARCH_BLOCKS_BACK = int(os.getenv("SEARCH_BLOCKS_BACK", "50000"))
 LOOP_INTERVAL = int(os.getenv("LOOP_INTERVAL", "10"))
+# Channel the LiquidationCall insert trigger notifies; LOOP_INTERVAL becomes
+# the fallback poll period
+NOTIFY_CHANNEL = os.getenv("NOTIFY_CHANNEL", "liquidation_call_inserted")
 MAX_WORKERS = int(os.getenv("MAX_WORKERS", "5"))
+# "threaded" uses a MAX_WORKERS thread pool, "async" runs up to
+# ASYNC_CONCURRENCY events in flight on one event loop, claiming up to
+# BATCH_SIZE more as slots free up
+ANALYSIS_ENGINE = os.getenv("ANALYSIS_ENGINE", "threaded")
+ASYNC_CONCURRENCY = int(os.getenv("ASYNC_CONCURRENCY", "300"))
+# Identity and claim lease of this analyzer process; several processes can
+# share one database, and leases of crashed workers are reclaimed on expiry
+WORKER_ID = os.getenv("WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+LEASE_SECONDS = int(os.getenv("LEASE_SECONDS", "600"))
+# Polls only scan past the stored cursor; a full sweep for gaps, expired
+# leases and FAILED retries runs every SWEEP_INTERVAL seconds
+SWEEP_INTERVAL = int(os.getenv("SWEEP_INTERVAL", "3600"))
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+# Analysis rows are buffered and written in one transaction per flush
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "100"))
+WRITE_FLUSH_SECONDS = float(os.getenv("WRITE_FLUSH_SECONDS", "5"))
+# "binary" probes one block per round trip, "kary" sends SEARCH_PROBES_PER_ROUND
+# probes per JSON-RPC batch and narrows the window by a factor of probes + 1,
+# "galloping" probes back from the liquidation at offsets 1, 2, 4, ... and
+# bisects the first bracket that contains a healthy block
+SEARCH_MODE = os.getenv("SEARCH_MODE", "binary")
+SEARCH_PROBES_PER_ROUND = int(os.getenv("SEARCH_PROBES_PER_ROUND", "7"))
+# Health factors probed per borrower are kept so repeated liquidations of the
+# same user skip the RPC for blocks already read; set HEALTH_INDEX_USERS=0 to disable
+HEALTH_INDEX_USERS = int(os.getenv("HEALTH_INDEX_USERS", "10000"))
+HEALTH_INDEX_SAMPLES_PER_USER = int(os.getenv("HEALTH_INDEX_SAMPLES_PER_USER", "512"))
 
-if not RPC_URL_ETHEREUM:
+# On-disk cache of finalized eth_call / getBlock results; set RPC_CACHE_PATH="" to disable
+RPC_CACHE_PATH = os.getenv(
+    "RPC_CACHE_PATH", os.path.join(os.path.dirname(__file__), "rpc_cache.sqlite")
+)
+RPC_CACHE_MAX_MB = int(os.getenv("RPC_CACHE_MAX_MB", "512"))
+RPC_CACHE_MIN_CONFIRMATIONS = int(os.getenv("RPC_CACHE_MIN_CONFIRMATIONS", "64"))
+
+# Adaptive (AIMD) limit on RPC requests per second shared by all workers
+RPC_RATE_INITIAL = float(os.getenv("RPC_RATE_INITIAL", "25"))
+RPC_RATE_MIN = float(os.getenv("RPC_RATE_MIN", "1"))
+RPC_RATE_MAX = float(os.getenv("RPC_RATE_MAX", "200"))
+RPC_RATE_INCREASE = float(os.getenv("RPC_RATE_INCREASE", "1"))
+
+# Memory-mapped block -> timestamp index consulted before fetching headers;
+# set BLOCK_TIMESTAMP_PATH="" to disable. Blocks before BLOCK_TIMESTAMP_BASE
+# (the Aave v3 pool deployment) are not indexed.
+BLOCK_TIMESTAMP_PATH = os.getenv(
+    "BLOCK_TIMESTAMP_PATH", os.path.join(os.path.dirname(__file__), "block_timestamps.bin")
+)
+BLOCK_TIMESTAMP_BASE = int(os.getenv("BLOCK_TIMESTAMP_BASE", "16291127"))
+# "exact" only skips the RPC when the index proves a timestamp; "estimate"
+# also accepts interpolation between blocks at most BLOCK_TIMESTAMP_MAX_GAP apart
+BLOCK_TIMESTAMP_MODE = os.getenv("BLOCK_TIMESTAMP_MODE", "exact")
+BLOCK_TIMESTAMP_MAX_GAP = int(os.getenv("BLOCK_TIMESTAMP_MAX_GAP", "256"))
+
+# Reserve metadata is loaded from this snapshot at startup and refetched in
+# the background once events are RESERVES_REFRESH_BLOCKS past it
+RESERVES_SNAPSHOT_PATH = os.getenv(
+    "RESERVES_SNAPSHOT_PATH", os.path.join(os.path.dirname(__file__), "reserves_snapshot.json")
+)
+RESERVES_REFRESH_BLOCKS = int(os.getenv("RESERVES_REFRESH_BLOCKS", "7200"))
+
+# Number of distinct blocks whose oracle price snapshot is kept in memory
+PRICE_CACHE_BLOCKS = int(os.getenv("PRICE_CACHE_BLOCKS", "4096"))
+
+# Prometheus /metrics endpoint of the analyzer process; set METRICS_PORT=0 to
+# disable. Give each worker on a host its own port: a worker whose port is
+# taken logs a warning and runs without metrics
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_ADDR = os.getenv("METRICS_ADDR", "127.0.0.1")
+
+# Connections the API keeps per process; warm serverless instances reuse them
+API_DB_POOL_MIN = int(os.getenv("API_DB_POOL_MIN", "1"))
+API_DB_POOL_MAX = int(os.getenv("API_DB_POOL_MAX", "4"))
+# Named PREPARE/EXECUTE for the listing queries; only for a direct or
+# session-mode connection, as a transaction-mode pooler (pgbouncer,
+# Supavisor) may run EXECUTE on a backend that never saw the PREPARE
+API_PREPARED_STATEMENTS = os.getenv("API_PREPARED_STATEMENTS", "false").lower() == "true"
+# Rendered API responses kept per process; set to 0 to disable
+API_CACHE_ENTRIES = int(os.getenv("API_CACHE_ENTRIES", "256"))
+
+if not RPC_URLS_ETHEREUM:
     print("⚠️ WARNING: RPC_URL_ETHEREUM missing")
 
 if not DATABASE_URL:
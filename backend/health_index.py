@@ -0,0 +1,97 @@
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+
+class HealthFactorIndex:
+    """
+    Per-user timeline of health factors already probed, shared by every
+    search in the process.
+
+    A borrower liquidated several times within a few hundred blocks is searched
+    once per event over overlapping windows, so later searches keep probing
+    blocks earlier ones already read. Historical account data never changes,
+    so a probe at a sampled block is answered from the index. Blocks between
+    samples are not inferred: a borrower can fall below 1.0 and recover
+    several times between two probes from different searches. The samples
+    still bound later searches: see healthy_floor().
+    """
+
+    def __init__(self, max_users: int = 10000, max_samples_per_user: int = 512):
+        self.max_users = max_users
+        self.max_samples_per_user = max_samples_per_user
+        self._blocks: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._health_factors: Dict[str, Dict[int, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, user_address: str, block_number: int, health_factor: Optional[float]):
+        """
+        Remember the health factor of user_address at block_number; unreadable
+        (None) probes are not recorded
+        """
+        if health_factor is None or self.max_users <= 0:
+            return
+        user = user_address.lower()
+        with self._lock:
+            blocks = self._blocks.get(user)
+            if blocks is None:
+                blocks = self._blocks[user] = []
+                self._health_factors[user] = {}
+            self._blocks.move_to_end(user)
+
+            health_factors = self._health_factors[user]
+            if block_number not in health_factors:
+                bisect.insort(blocks, block_number)
+            health_factors[block_number] = health_factor
+
+            # Keep the newest blocks; searches look back from recent liquidations
+            while len(blocks) > self.max_samples_per_user:
+                health_factors.pop(blocks.pop(0), None)
+            while len(self._blocks) > self.max_users:
+                evicted, _ = self._blocks.popitem(last=False)
+                self._health_factors.pop(evicted, None)
+
+    def lookup(self, user_address: str, block_numbers: Iterable[int]) -> Dict[int, float]:
+        """
+        Health factors the index can answer for block_numbers; blocks missing
+        from the result need an RPC probe
+        """
+        user = user_address.lower()
+        known = {}
+        with self._lock:
+            health_factors = self._health_factors.get(user, {})
+            for block_number in block_numbers:
+                health_factor = health_factors.get(block_number)
+                if health_factor is not None:
+                    self.hits += 1
+                    known[block_number] = health_factor
+                else:
+                    self.misses += 1
+        return known
+
+    def healthy_floor(self, user_address: str, start_block: int, end_block: int) -> Optional[int]:
+        """
+        Nearest sampled healthy block in [start_block, end_block) with only
+        HF < 1 samples between it and end_block, or None. The episode that
+        ends at end_block starts after it, so a search can start there.
+        """
+        user = user_address.lower()
+        with self._lock:
+            blocks = self._blocks.get(user)
+            if not blocks:
+                return None
+            health_factors = self._health_factors[user]
+            for index in range(bisect.bisect_left(blocks, end_block) - 1, -1, -1):
+                block_number = blocks[index]
+                if block_number < start_block:
+                    return None
+                if health_factors[block_number] >= 1.0:
+                    return block_number
+        return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._blocks)
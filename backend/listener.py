@@ -0,0 +1,85 @@
+import select
+import time
+import traceback
+
+import psycopg2
+from psycopg2 import sql
+
+
+class LiquidationListener:
+    """
+    LISTENs on the channel the LiquidationCall insert trigger (installed by
+    setup_db.py) notifies once per insert statement, so the analyzer wakes as
+    soon as the indexer writes new events instead of sleeping a fixed
+    interval. Notifications carry no ids: the analyzer claims new rows
+    through its cursor either way.
+
+    If the connection cannot be opened or drops, wait() degrades to a plain
+    sleep and the listener reconnects on the next call.
+    """
+
+    def __init__(self, database_url: str, channel: str, debounce: float = 0.2):
+        self.database_url = database_url
+        self.channel = channel
+        self.debounce = debounce
+        self._conn = None
+
+    def _connect(self) -> bool:
+        try:
+            conn = psycopg2.connect(self.database_url)
+            conn.set_session(autocommit=True)
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            self._conn = conn
+            print(f"🔔 Listening for new liquidations on '{self.channel}'")
+            return True
+        except Exception as e:
+            print(f"WARN: could not LISTEN on '{self.channel}', falling back to polling: {e}")
+            self.close()
+            return False
+
+    def _drain(self) -> bool:
+        self._conn.poll()
+        notified = bool(self._conn.notifies)
+        self._conn.notifies.clear()
+        return notified
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until new liquidations are notified or timeout elapses. True if
+        a notification arrived; False on timeout or when polling only.
+        """
+        if self._conn is None and not self._connect():
+            time.sleep(timeout)
+            return False
+
+        try:
+            if not self._drain():
+                ready, _, _ = select.select([self._conn], [], [], timeout)
+                if not ready:
+                    return False
+                self._drain()
+
+            # Ponder writes a backfill as many statements in quick
+            # succession; collect them into one wakeup
+            deadline = time.monotonic() + self.debounce
+            while (remaining := deadline - time.monotonic()) > 0:
+                ready, _, _ = select.select([self._conn], [], [], remaining)
+                if not ready:
+                    break
+                self._drain()
+            return True
+
+        except Exception as e:
+            print(f"WARN: lost LISTEN connection, reconnecting on next wait: {e}")
+            traceback.print_exc()
+            self.close()
+            return False
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
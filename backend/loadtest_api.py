@@ -0,0 +1,116 @@
+"""
+Load test for the /liquidations API.
+
+Without --url, runs the Flask app in-process against DATABASE_URL twice:
+once connecting per request (the old behaviour, API_DB_POOL_MAX=0) and once
+through the connection pool, and prints p50/p99 for both. The response
+cache is off for both runs so they only differ in connection handling.
+With --url, measures a running deployment over HTTP instead.
+
+    python -m backend.loadtest_api --requests 500 --concurrency 8
+    python -m backend.loadtest_api --url https://example.vercel.app/api
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from backend import api, config
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def random_query(limit, max_offset):
+    return {'limit': limit, 'offset': random.randrange(0, max_offset + 1, limit)}
+
+
+def run(send, total_requests, concurrency, limit, max_offset):
+    """
+    Fire total_requests listing calls from `concurrency` threads and return
+    (latencies in ms, failures, wall seconds)
+    """
+    def timed(_):
+        query = random_query(limit, max_offset)
+        started = time.perf_counter()
+        ok = send(query)
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, ok in results if ok]
+    failures = sum(1 for _, ok in results if not ok)
+    return latencies, failures, elapsed
+
+
+def print_report(label, latencies, failures, elapsed):
+    print(f"\n=== {label} ===")
+    if not latencies:
+        print(f"✗ All {failures} requests failed")
+        return
+    print(f"Requests:   {len(latencies)} ok, {failures} failed in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"Latency:    p50 {percentile(latencies, 50):.1f} ms | "
+          f"p99 {percentile(latencies, 99):.1f} ms | "
+          f"mean {statistics.mean(latencies):.1f} ms")
+
+
+def http_sender(base_url):
+    session = requests.Session()
+
+    def send(query):
+        try:
+            return session.get(f"{base_url.rstrip('/')}/liquidations", params=query, timeout=30).ok
+        except requests.RequestException:
+            return False
+    return send
+
+
+def in_process_sender():
+    client = api.app.test_client()
+
+    def send(query):
+        return client.get('/liquidations', query_string=query).status_code == 200
+    return send
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the /liquidations API.')
+    parser.add_argument('--url', help='Base URL of a running API; omit to compare per-request connections with the pool in-process.')
+    parser.add_argument('--requests', type=int, default=300, help='Number of requests per run.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients.')
+    parser.add_argument('--limit', type=int, default=10, help='Page size requested.')
+    parser.add_argument('--max-offset', type=int, default=200, help='Largest offset requested.')
+    args = parser.parse_args()
+
+    run_args = (args.requests, args.concurrency, args.limit, args.max_offset)
+
+    if args.url:
+        print(f"🚀 Load testing {args.url}")
+        print_report(args.url, *run(http_sender(args.url), *run_args))
+        return
+
+    print("🚀 Load testing /liquidations in-process")
+    pool_max = config.API_DB_POOL_MAX
+    # Every request reaches the database, or the second run reads a warm cache
+    api.response_cache.max_entries = 0
+    api.response_cache.clear()
+
+    config.API_DB_POOL_MAX = 0
+    print_report('Connect per request', *run(in_process_sender(), *run_args))
+
+    config.API_DB_POOL_MAX = max(pool_max, 1)
+    print_report(f'Pooled ({config.API_DB_POOL_MAX} connections)', *run(in_process_sender(), *run_args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Prometheus metrics of the analyzer process, served on METRICS_PORT.
+
+Children for fixed label values are resolved once, so hot paths only pay for
+an inc() / observe(). Both engines report into the same metrics.
+"""
+from typing import Any, Awaitable, Dict, List, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+# Per-event stages; "db_write" is queueing the row (and any flush it triggers)
+STAGES = ("search", "prices", "timestamp", "db_write")
+
+EVENT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RPC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+PROBE_BUCKETS = (1, 2, 4, 6, 8, 10, 12, 14, 16, 20, 24, 32, 48, 64)
+
+RPC_REQUESTS = Counter(
+    "liquidation_analyzer_rpc_requests",
+    "JSON-RPC calls sent past the result cache, by method; batch entries count one each",
+    ["method"],
+)
+RPC_SECONDS = Histogram(
+    "liquidation_analyzer_rpc_seconds",
+    "Round trip of one RPC request or batch, including throttled attempts",
+    buckets=RPC_BUCKETS,
+)
+RPC_THROTTLED = Counter(
+    "liquidation_analyzer_rpc_throttled",
+    "RPC attempts that were throttled or timed out",
+)
+EVENTS = Counter(
+    "liquidation_analyzer_events",
+    "Liquidation events processed, by outcome",
+    ["status"],
+)
+EVENT_SECONDS = Histogram(
+    "liquidation_analyzer_event_seconds",
+    "Time to analyze one event and queue its result",
+    buckets=EVENT_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "liquidation_analyzer_event_stage_seconds",
+    "Per-event time spent in each analysis stage",
+    ["stage"],
+    buckets=EVENT_BUCKETS,
+)
+SEARCH_PROBES = Histogram(
+    "liquidation_analyzer_search_probes",
+    "Health factor probes per first-liquidatable-block search "
+    "(binary search iterations in binary mode)",
+    ["mode"],
+    buckets=PROBE_BUCKETS,
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "liquidation_analyzer_db_pool_wait_seconds",
+    "Time to get a connection from the database pool",
+    buckets=DB_BUCKETS,
+)
+DB_FLUSH_SECONDS = Histogram(
+    "liquidation_analyzer_db_flush_seconds",
+    "Time to write one batch of LiquidationAnalysis rows",
+    buckets=DB_BUCKETS,
+)
+DB_ROWS_WRITTEN = Counter(
+    "liquidation_analyzer_db_rows_written",
+    "LiquidationAnalysis rows written by flushes",
+)
+BACKLOG = Gauge(
+    "liquidation_analyzer_backlog_events",
+    "LiquidationCall events past the claim cursor that no worker has claimed",
+)
+
+_EVENTS_ANALYZED = EVENTS.labels("analyzed")
+_EVENTS_FAILED = EVENTS.labels("failed")
+_STAGES = {stage: STAGE_SECONDS.labels(stage) for stage in STAGES}
+_RPC_METHODS: Dict[str, Any] = {}
+_SEARCH_MODES: Dict[str, Any] = {}
+
+
+def _child(children: Dict[str, Any], metric, label: str):
+    child = children.get(label)
+    if child is None:
+        child = children.setdefault(label, metric.labels(label))
+    return child
+
+
+def count_rpc(method: str):
+    _child(_RPC_METHODS, RPC_REQUESTS, method).inc()
+
+
+def count_rpc_batch(requests: List[Tuple[str, Any]]):
+    counts: Dict[str, int] = {}
+    for method, _ in requests:
+        counts[method] = counts.get(method, 0) + 1
+    for method, count in counts.items():
+        _child(_RPC_METHODS, RPC_REQUESTS, method).inc(count)
+
+
+def record_search(mode: str, probes: int):
+    _child(_SEARCH_MODES, SEARCH_PROBES, mode).observe(probes)
+
+
+def record_event(success: bool, seconds: float):
+    (_EVENTS_ANALYZED if success else _EVENTS_FAILED).inc()
+    EVENT_SECONDS.observe(seconds)
+
+
+def stage(name: str):
+    """
+    Context manager timing one stage of an event
+    """
+    return _STAGES[name].time()
+
+
+async def timed(name: str, awaitable: Awaitable) -> Any:
+    """
+    Await `awaitable` as one stage of an event
+    """
+    with _STAGES[name].time():
+        return await awaitable
+
+
+def start_server(port: int, addr: str = "127.0.0.1") -> bool:
+    """
+    Serve /metrics in a background thread. A port already taken (e.g. by
+    another worker on the host) is reported and the process runs without
+    metrics; False in that case.
+    """
+    try:
+        start_http_server(port, addr=addr)
+    except OSError as e:
+        print(f"⚠️ Not serving metrics on {addr}:{port}: {e}")
+        return False
+    print(f"📈 Serving metrics on http://{addr}:{port}/metrics")
+    return True
@@ -0,0 +1,116 @@
+import bisect
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class PriceSnapshotCache:
+    """
+    Block-scoped table of raw oracle prices keyed by (block_number, asset),
+    plus a memo of which price oracle was active over which block range.
+
+    Shared by every worker thread so cascading liquidations in the same block
+    reuse one snapshot instead of re-querying the oracle per event.
+    """
+
+    def __init__(self, max_blocks: int = 4096, max_oracle_blocks: int = 1024):
+        self.max_blocks = max_blocks
+        self.max_oracle_blocks = max_oracle_blocks
+        self._prices: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # block -> [lock, threads holding or waiting for it]
+        self._block_locks: Dict[int, list] = {}
+        self._oracle_blocks: List[int] = []
+        self._oracle_addresses: List[str] = []
+
+    @contextmanager
+    def block_lock(self, block_number: int) -> Iterator[None]:
+        """
+        Hold the block's lock while its snapshot is fetched, so concurrent
+        events in the same block wait for one fetch instead of issuing their
+        own. The lock is dropped once no thread holds or waits for it, whether
+        or not the fetch stored anything.
+        """
+        with self._lock:
+            entry = self._block_locks.setdefault(block_number, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._block_locks.pop(block_number, None)
+
+    def get_prices(
+        self, block_number: int, assets: Iterable[str]
+    ) -> Optional[Dict[str, int]]:
+        """
+        Return raw prices for all of assets at block_number, or None if any is missing
+        """
+        with self._lock:
+            snapshot = self._prices.get(block_number)
+            if snapshot is None:
+                return None
+            self._prices.move_to_end(block_number)
+            prices = {}
+            for asset in assets:
+                price = snapshot.get(asset.lower())
+                if price is None:
+                    return None
+                prices[asset.lower()] = price
+            return prices
+
+    def store_prices(self, block_number: int, prices: Dict[str, int]):
+        with self._lock:
+            snapshot = self._prices.setdefault(block_number, {})
+            snapshot.update({asset.lower(): price for asset, price in prices.items()})
+            self._prices.move_to_end(block_number)
+            while len(self._prices) > self.max_blocks:
+                self._prices.popitem(last=False)
+
+    def oracle_for_block(self, block_number: int) -> Optional[str]:
+        """
+        Return the oracle address if block_number falls between two observed
+        blocks that reported the same oracle (or equals an observed block)
+        """
+        with self._lock:
+            index = bisect.bisect_left(self._oracle_blocks, block_number)
+            if (
+                index < len(self._oracle_blocks)
+                and self._oracle_blocks[index] == block_number
+            ):
+                return self._oracle_addresses[index]
+            if 0 < index < len(self._oracle_blocks):
+                below = self._oracle_addresses[index - 1]
+                above = self._oracle_addresses[index]
+                if below.lower() == above.lower():
+                    return below
+            return None
+
+    def record_oracle(self, block_number: int, oracle_address: str):
+        with self._lock:
+            index = bisect.bisect_left(self._oracle_blocks, block_number)
+            if (
+                index < len(self._oracle_blocks)
+                and self._oracle_blocks[index] == block_number
+            ):
+                return
+            self._oracle_blocks.insert(index, block_number)
+            self._oracle_addresses.insert(index, oracle_address)
+
+            # Only the ends of a run of one oracle matter to oracle_for_block;
+            # drop samples the insert made interior
+            for inner in (index + 1, index, index - 1):
+                if 0 < inner < len(self._oracle_blocks) - 1 and (
+                    self._oracle_addresses[inner - 1].lower()
+                    == self._oracle_addresses[inner].lower()
+                    == self._oracle_addresses[inner + 1].lower()
+                ):
+                    del self._oracle_blocks[inner]
+                    del self._oracle_addresses[inner]
+            while len(self._oracle_blocks) > self.max_oracle_blocks:
+                del self._oracle_blocks[0]
+                del self._oracle_addresses[0]
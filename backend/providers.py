@@ -0,0 +1,606 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import metrics
+import requests
+from rate_limiter import AdaptiveRateLimiter
+from rpc_cache import RpcResultCache
+from web3.providers import AsyncHTTPProvider, HTTPProvider, JSONBaseProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+# HTTP statuses and JSON-RPC error codes providers use to signal throttling
+THROTTLE_HTTP_STATUSES = {429, 503}
+THROTTLE_RPC_ERROR_CODES = {429, -32005}
+
+# Error messages from nodes that lack the requested historical state (pruned
+# or lagging archive nodes); another endpoint may still answer the call
+MISSING_STATE_MARKERS = (
+    "missing trie node",
+    "header not found",
+    "state not available",
+    "unknown block",
+    "historical state",
+)
+
+
+def is_throttle_error(error: Exception) -> bool:
+    if isinstance(error, (requests.Timeout, asyncio.TimeoutError)):
+        return True
+    # requests.HTTPError carries response.status_code, aiohttp errors .status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status", None)
+    return status in THROTTLE_HTTP_STATUSES
+
+
+def is_throttle_response(response: Any) -> bool:
+    responses = response if isinstance(response, list) else [response]
+    return any(
+        isinstance(item.get("error"), dict)
+        and item["error"].get("code") in THROTTLE_RPC_ERROR_CODES
+        for item in responses
+    )
+
+
+class ProviderWrapper(JSONBaseProvider):
+    """
+    Provider that delegates to another provider. Subclasses override
+    make_request / make_batch_request to add behaviour in front of self.w3
+    """
+
+    def __init__(self, provider: JSONBaseProvider, **kwargs):
+        super().__init__(**kwargs)
+        self.provider = provider
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return self.provider.make_request(method, params)
+
+    def make_batch_request(self, requests: List[Tuple[RPCEndpoint, Any]]):
+        return self.provider.make_batch_request(requests)
+
+
+class CachingProvider(ProviderWrapper):
+    """
+    Serves historical eth_call / eth_getBlockByNumber results from an
+    RpcResultCache. Only blocks at least min_confirmations behind the chain
+    head are stored, so results near the tip can still be reorged away.
+    """
+
+    HEAD_REFRESH_SECONDS = 12
+
+    def __init__(
+        self,
+        provider: JSONBaseProvider,
+        cache: RpcResultCache,
+        min_confirmations: int = 64,
+        **kwargs,
+    ):
+        super().__init__(provider, **kwargs)
+        self.cache = cache
+        self.min_confirmations = min_confirmations
+        self._head_block = 0
+        self._head_checked_at = 0.0
+        self._head_lock = threading.Lock()
+
+    @staticmethod
+    def _block_number(block_identifier: Any) -> Optional[int]:
+        if isinstance(block_identifier, int):
+            return block_identifier
+        if isinstance(block_identifier, str) and block_identifier.startswith("0x"):
+            return int(block_identifier, 16)
+        return None
+
+    @staticmethod
+    def _cache_key(method: RPCEndpoint, params: Any) -> Optional[Tuple[str, int]]:
+        if method == "eth_call" and len(params) == 2:
+            transaction, block_identifier = params
+            if not set(transaction) <= {"to", "data", "from"}:
+                return None
+            block_number = CachingProvider._block_number(block_identifier)
+            if block_number is None:
+                return None
+            key = RpcResultCache.make_key(
+                method,
+                block_number,
+                transaction.get("to", "").lower(),
+                transaction.get("data", "").lower(),
+            )
+            return key, block_number
+
+        if method == "eth_getBlockByNumber" and len(params) == 2:
+            block_number = CachingProvider._block_number(params[0])
+            if block_number is None:
+                return None
+            return RpcResultCache.make_key(method, block_number, bool(params[1])), block_number
+
+        return None
+
+    def _is_final(self, block_number: int) -> bool:
+        if block_number <= self._head_block - self.min_confirmations:
+            return True
+
+        with self._head_lock:
+            if time.time() - self._head_checked_at >= self.HEAD_REFRESH_SECONDS:
+                response = self.provider.make_request(RPCEndpoint("eth_blockNumber"), [])
+                if "result" in response:
+                    self._head_block = int(response["result"], 16)
+                self._head_checked_at = time.time()
+
+        return block_number <= self._head_block - self.min_confirmations
+
+    def _store(self, cache_key: Optional[Tuple[str, int]], response: RPCResponse):
+        if cache_key is None or "error" in response or response.get("result") is None:
+            return
+        key, block_number = cache_key
+        if self._is_final(block_number):
+            self.cache.set(key, response["result"])
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        cache_key = self._cache_key(method, params)
+        if cache_key is not None:
+            result = self.cache.get(cache_key[0])
+            if result is not None:
+                return {"jsonrpc": "2.0", "id": 0, "result": result}
+
+        response = self.provider.make_request(method, params)
+        self._store(cache_key, response)
+        return response
+
+    def make_batch_request(self, requests: List[Tuple[RPCEndpoint, Any]]):
+        responses: List[Optional[RPCResponse]] = [None] * len(requests)
+        cache_keys = []
+        misses = []
+
+        for index, (method, params) in enumerate(requests):
+            cache_key = self._cache_key(method, params)
+            cache_keys.append(cache_key)
+            if cache_key is not None:
+                result = self.cache.get(cache_key[0])
+                if result is not None:
+                    responses[index] = {"jsonrpc": "2.0", "id": index, "result": result}
+                    continue
+            misses.append(index)
+
+        if misses:
+            fetched = self.provider.make_batch_request([requests[i] for i in misses])
+            if not isinstance(fetched, list):
+                # RPC errors return only one response with the error object
+                return fetched
+            for index, response in zip(misses, fetched):
+                responses[index] = response
+                self._store(cache_keys[index], response)
+
+        return responses
+
+
+class AsyncCachingProvider(AsyncJSONBaseProvider):
+    """
+    Async counterpart of CachingProvider over the same RpcResultCache; cache
+    lookups are short SQLite reads and run inline on the event loop
+    """
+
+    HEAD_REFRESH_SECONDS = CachingProvider.HEAD_REFRESH_SECONDS
+
+    def __init__(
+        self,
+        provider: AsyncJSONBaseProvider,
+        cache: RpcResultCache,
+        min_confirmations: int = 64,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.cache = cache
+        self.min_confirmations = min_confirmations
+        self._head_block = 0
+        self._head_checked_at = 0.0
+        self._head_lock = asyncio.Lock()
+
+    async def _is_final(self, block_number: int) -> bool:
+        if block_number <= self._head_block - self.min_confirmations:
+            return True
+
+        async with self._head_lock:
+            if time.time() - self._head_checked_at >= self.HEAD_REFRESH_SECONDS:
+                response = await self.provider.make_request(
+                    RPCEndpoint("eth_blockNumber"), []
+                )
+                if "result" in response:
+                    self._head_block = int(response["result"], 16)
+                self._head_checked_at = time.time()
+
+        return block_number <= self._head_block - self.min_confirmations
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        cache_key = CachingProvider._cache_key(method, params)
+        if cache_key is not None:
+            result = self.cache.get(cache_key[0])
+            if result is not None:
+                return {"jsonrpc": "2.0", "id": 0, "result": result}
+
+        response = await self.provider.make_request(method, params)
+        if (
+            cache_key is not None
+            and "error" not in response
+            and response.get("result") is not None
+            and await self._is_final(cache_key[1])
+        ):
+            self.cache.set(cache_key[0], response["result"])
+        return response
+
+
+class EndpointError(Exception):
+    """
+    Raised when an endpoint answers with an error another node could avoid
+    """
+
+
+class _Endpoint:
+    def __init__(self, url: str, alpha: float, provider: Any = None):
+        self.url = url
+        # Retries are handled by failing over to another endpoint
+        self.provider = provider or HTTPProvider(url, exception_retry_configuration=None)
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = deque(maxlen=200)
+        self.lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self.lock:
+            self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+            if ok:
+                self.samples.append(latency)
+                self.latency = (
+                    latency
+                    if self.latency is None
+                    else self.latency + self.alpha * (latency - self.latency)
+                )
+
+    def score(self) -> float:
+        # Unmeasured endpoints sort first so every node gets sampled
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1.0 + 10.0 * self.error_rate)
+
+    def p95(self) -> Optional[float]:
+        with self.lock:
+            if len(self.samples) < 20:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[int(len(ordered) * 0.95)]
+
+
+class _EndpointPool:
+    """
+    Endpoint ranking and hedging policy shared by the sync and async pools
+    """
+
+    HEDGE_METHODS = {"eth_call", "eth_getBlockByNumber", "eth_blockNumber"}
+
+    def __init__(
+        self,
+        endpoints: List[_Endpoint],
+        min_hedge_delay: float = 0.05,
+        max_hedge_delay: float = 2.0,
+        explore_ratio: float = 0.05,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.endpoints = endpoints
+        self.limiter = limiter
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.explore_ratio = explore_ratio
+        self.hedged = 0
+        self.hedges_skipped = 0
+
+    def _ranked(self) -> List[_Endpoint]:
+        ranked = sorted(
+            self.endpoints, key=lambda e: (e.error_rate > 0.5, e.score())
+        )
+        # Occasionally promote another healthy node so recovered or
+        # previously slow endpoints keep getting fresh latency samples
+        if len(ranked) > 1 and random.random() < self.explore_ratio:
+            healthy = [e for e in ranked[1:] if e.error_rate <= 0.5]
+            if healthy:
+                chosen = random.choice(healthy)
+                ranked.remove(chosen)
+                ranked.insert(0, chosen)
+        return ranked
+
+    def _hedge_delay(self, endpoint: _Endpoint) -> float:
+        p95 = endpoint.p95()
+        if p95 is None:
+            return self.max_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, p95))
+
+    def _take_hedge_token(self) -> bool:
+        if self.limiter is None or self.limiter.try_acquire():
+            return True
+        self.hedges_skipped += 1
+        return False
+
+    @staticmethod
+    def _raise_for_missing_state(response: Any):
+        responses = response if isinstance(response, list) else [response]
+        for item in responses:
+            error = item.get("error")
+            if isinstance(error, dict):
+                message = str(error.get("message", "")).lower()
+                if any(marker in message for marker in MISSING_STATE_MARKERS):
+                    raise EndpointError(error.get("message"))
+
+    def endpoint_stats(self) -> List[Dict]:
+        return [
+            {
+                "url": endpoint.url,
+                "latency_ms": None
+                if endpoint.latency is None
+                else round(endpoint.latency * 1000, 1),
+                "error_rate": round(endpoint.error_rate, 3),
+            }
+            for endpoint in self.endpoints
+        ]
+
+
+class PooledHTTPProvider(_EndpointPool, JSONBaseProvider):
+    """
+    Routes each request to the healthiest, fastest of several RPC endpoints.
+
+    Per-endpoint latency and error rate are tracked as EWMAs. Calls that fail
+    fail over to the next endpoint; read-only calls in hedge_methods also get
+    a duplicate request on the next endpoint once the primary has taken longer
+    than its recent p95, and whichever answers first wins. A hedge is an
+    extra upstream request, so it is only sent when `limiter` (the one the
+    RateLimitedProvider above the pool uses) has a token to spare.
+    """
+
+    def __init__(self, urls: List[str], alpha: float = 0.2, **kwargs):
+        super().__init__([_Endpoint(url, alpha) for url in urls], **kwargs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=8 * len(self.endpoints), thread_name_prefix="rpc-hedge"
+        )
+
+    def _call(self, endpoint: _Endpoint, send: Callable[[JSONBaseProvider], Any]):
+        started = time.monotonic()
+        try:
+            response = send(endpoint.provider)
+            self._raise_for_missing_state(response)
+        except Exception:
+            endpoint.record(time.monotonic() - started, ok=False)
+            raise
+        endpoint.record(time.monotonic() - started, ok=True)
+        return response
+
+    def _dispatch(self, send: Callable[[JSONBaseProvider], Any], hedge: bool):
+        ranked = self._ranked()
+        last_error: Optional[Exception] = None
+
+        if not hedge or len(ranked) == 1:
+            for endpoint in ranked:
+                try:
+                    return self._call(endpoint, send)
+                except Exception as e:
+                    last_error = e
+            raise last_error
+
+        backups = iter(ranked[1:])
+        pending = {self._executor.submit(self._call, ranked[0], send)}
+        deadline: Optional[float] = self._hedge_delay(ranked[0])
+
+        while pending:
+            done, pending = wait(pending, timeout=deadline, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+
+            # Either the deadline passed (hedge) or a call failed (fail over)
+            if not done and not self._take_hedge_token():
+                # No rate budget for a duplicate; check again after another delay
+                continue
+            backup = next(backups, None)
+            if backup is None:
+                deadline = None
+                continue
+            if not done:
+                self.hedged += 1
+            pending.add(self._executor.submit(self._call, backup, send))
+            deadline = self._hedge_delay(backup)
+
+        raise last_error
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return self._dispatch(
+            lambda provider: provider.make_request(method, params),
+            hedge=method in self.HEDGE_METHODS,
+        )
+
+    def make_batch_request(self, requests: List[Tuple[RPCEndpoint, Any]]):
+        return self._dispatch(
+            lambda provider: provider.make_batch_request(requests),
+            hedge=all(method in self.HEDGE_METHODS for method, _ in requests),
+        )
+
+
+class AsyncPooledHTTPProvider(_EndpointPool, AsyncJSONBaseProvider):
+    """
+    Async counterpart of PooledHTTPProvider: the same EWMA routing, failover
+    and rate-budgeted hedging, with hedges run as tasks on the event loop
+    """
+
+    def __init__(self, urls: List[str], alpha: float = 0.2, **kwargs):
+        super().__init__(
+            [
+                _Endpoint(
+                    url,
+                    alpha,
+                    AsyncHTTPProvider(url, exception_retry_configuration=None),
+                )
+                for url in urls
+            ],
+            **kwargs,
+        )
+
+    async def cache_async_session(self, session):
+        for endpoint in self.endpoints:
+            await endpoint.provider.cache_async_session(session)
+
+    async def _call(self, endpoint: _Endpoint, method: RPCEndpoint, params: Any):
+        started = time.monotonic()
+        try:
+            response = await endpoint.provider.make_request(method, params)
+            self._raise_for_missing_state(response)
+        except Exception:
+            endpoint.record(time.monotonic() - started, ok=False)
+            raise
+        endpoint.record(time.monotonic() - started, ok=True)
+        return response
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        ranked = self._ranked()
+        last_error: Optional[Exception] = None
+
+        if method not in self.HEDGE_METHODS or len(ranked) == 1:
+            for endpoint in ranked:
+                try:
+                    return await self._call(endpoint, method, params)
+                except Exception as e:
+                    last_error = e
+            raise last_error
+
+        backups = iter(ranked[1:])
+        pending = {asyncio.ensure_future(self._call(ranked[0], method, params))}
+        deadline: Optional[float] = self._hedge_delay(ranked[0])
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=deadline, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+
+                # Either the deadline passed (hedge) or a call failed (fail over)
+                if not done and not self._take_hedge_token():
+                    continue
+                backup = next(backups, None)
+                if backup is None:
+                    deadline = None
+                    continue
+                if not done:
+                    self.hedged += 1
+                pending.add(asyncio.ensure_future(self._call(backup, method, params)))
+                deadline = self._hedge_delay(backup)
+        finally:
+            # The losing requests of a hedge are no longer needed
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+
+class RateLimitedProvider(ProviderWrapper):
+    """
+    Paces requests through an AdaptiveRateLimiter and feeds it the outcome.
+    Throttled or timed-out requests are retried after the limiter backs off.
+    """
+
+    def __init__(
+        self,
+        provider: JSONBaseProvider,
+        limiter: AdaptiveRateLimiter,
+        max_retries: int = 3,
+        **kwargs,
+    ):
+        super().__init__(provider, **kwargs)
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    def _send(self, send: Callable[[], Any], request_count: int):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(request_count)
+            try:
+                with metrics.RPC_SECONDS.time():
+                    response = send()
+            except Exception as e:
+                if not is_throttle_error(e):
+                    raise
+                self.limiter.on_throttle()
+                metrics.RPC_THROTTLED.inc()
+                if attempt == self.max_retries:
+                    raise
+                continue
+
+            if is_throttle_response(response):
+                self.limiter.on_throttle()
+                metrics.RPC_THROTTLED.inc()
+                if attempt < self.max_retries:
+                    continue
+            else:
+                self.limiter.on_success(request_count)
+            return response
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        metrics.count_rpc(method)
+        return self._send(lambda: self.provider.make_request(method, params), 1)
+
+    def make_batch_request(self, requests: List[Tuple[RPCEndpoint, Any]]):
+        metrics.count_rpc_batch(requests)
+        return self._send(
+            lambda: self.provider.make_batch_request(requests), len(requests)
+        )
+
+
+class AsyncRateLimitedProvider(AsyncJSONBaseProvider):
+    """
+    Async counterpart of RateLimitedProvider, sharing the same limiter
+    """
+
+    def __init__(
+        self,
+        provider: AsyncJSONBaseProvider,
+        limiter: AdaptiveRateLimiter,
+        max_retries: int = 3,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.limiter = limiter
+        self.max_retries = max_retries
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        metrics.count_rpc(method)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire_async()
+            try:
+                with metrics.RPC_SECONDS.time():
+                    response = await self.provider.make_request(method, params)
+            except Exception as e:
+                if not is_throttle_error(e):
+                    raise
+                self.limiter.on_throttle()
+                metrics.RPC_THROTTLED.inc()
+                if attempt == self.max_retries:
+                    raise
+                continue
+
+            if is_throttle_response(response):
+                self.limiter.on_throttle()
+                metrics.RPC_THROTTLED.inc()
+                if attempt < self.max_retries:
+                    continue
+            else:
+                self.limiter.on_success()
+            return response
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate is tuned by AIMD: every successful request
+    nudges the rate up (about `increase` req/s per second of traffic), every
+    throttle or timeout multiplies it by `decrease`.
+
+    One instance is shared by all threads and coroutines issuing RPC calls,
+    so the aggregate request rate follows whatever the provider allows.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 25.0,
+        min_rate: float = 1.0,
+        max_rate: float = 200.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+        self._rate = min(max(initial_rate, min_rate), max_rate)
+        self._tokens = self._rate
+        self._updated_at = time.monotonic()
+        self._last_decrease_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        Current allowed requests per second
+        """
+        return self._rate
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Take tokens from the bucket, going into debt if needed, and return how
+        long the caller must wait for that debt to be repaid
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._rate, self._tokens + (now - self._updated_at) * self._rate
+            )
+            self._updated_at = now
+            self._tokens -= tokens
+            return -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """
+        Take tokens only if the bucket holds them now; never waits or goes
+        into debt. For optional extra requests such as hedges.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._rate, self._tokens + (now - self._updated_at) * self._rate
+            )
+            self._updated_at = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def acquire(self, tokens: int = 1):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 1):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self, requests: int = 1):
+        with self._lock:
+            self._rate = min(
+                self.max_rate, self._rate + self.increase * requests / self._rate
+            )
+
+    def on_throttle(self):
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            # Requests already in flight when the provider pushed back report
+            # the same event; only back off once per second
+            if now - self._last_decrease_at < 1.0:
+                return
+            self._last_decrease_at = now
+            self._rate = max(self.min_rate, self._rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Optional, Tuple
+
+# Bump when the stored reserve fields change; older files are refetched
+SNAPSHOT_VERSION = 2
+
+
+class ReservesSnapshot:
+    """
+    Reserve metadata (symbol, decimals, token addresses, risk config, price
+    source) kept in a versioned local JSON file, with the AaveOracle the
+    PoolAddressesProvider reported at the snapshot block.
+
+    The analyzer starts from the file instead of the large getReservesData
+    call. A refresh runs on a background thread once events are
+    refresh_blocks past the snapshot, or when an event names an asset the
+    snapshot lacks, and atomically swaps in the new reserves.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fetch: Callable[[], Tuple[int, Dict[str, Dict], str]],
+        chain_id: int,
+        pool_address: str,
+        refresh_blocks: int = 7200,
+        miss_cooldown: float = 60,
+    ):
+        self.path = path
+        self.chain_id = chain_id
+        self.pool_address = pool_address.lower()
+        self.refresh_blocks = refresh_blocks
+        self.miss_cooldown = miss_cooldown
+        self.reserves: Dict[str, Dict] = {}
+        self.block = None
+        self.price_oracle: Optional[str] = None
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._last_miss_refresh = float("-inf")
+
+    def load(self) -> bool:
+        """
+        Load the snapshot file; False if it is missing, unreadable, or for
+        another snapshot version, chain or pool
+        """
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable reserves snapshot {self.path}: {e}")
+            return False
+
+        if (
+            snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("chainId") != self.chain_id
+            or snapshot.get("pool", "").lower() != self.pool_address
+            or not snapshot.get("reserves")
+            or not snapshot.get("priceOracle")
+        ):
+            return False
+
+        self.reserves = snapshot["reserves"]
+        self.block = snapshot["block"]
+        self.price_oracle = snapshot["priceOracle"]
+        return True
+
+    def refresh(self):
+        """
+        Fetch the reserves now and persist them; raises if the fetch fails
+        """
+        block, reserves, price_oracle = self._fetch()
+        if not reserves:
+            raise RuntimeError("getReservesData returned no reserves")
+
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "chainId": self.chain_id,
+            "pool": self.pool_address,
+            "block": block,
+            "priceOracle": price_oracle,
+            "updatedAt": int(time.time()),
+            "reserves": reserves,
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.tmp", "w") as f:
+            json.dump(snapshot, f, indent=2, sort_keys=True)
+        os.replace(f"{self.path}.tmp", self.path)
+
+        # Readers keep whichever dict they already hold
+        self.reserves = reserves
+        self.block = block
+        self.price_oracle = price_oracle
+        print(f"✓ Reserves snapshot refreshed at block {block} ({len(reserves)} reserves)")
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"✗ Error refreshing reserves snapshot: {e}")
+            traceback.print_exc()
+
+    def refresh_async(self) -> threading.Thread:
+        """
+        Start a background refresh unless one is already running; returns it
+        """
+        with self._lock:
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_in_background,
+                    name="reserves-refresh",
+                    daemon=True,
+                )
+                self._refresh_thread.start()
+            return self._refresh_thread
+
+    def note_block(self, block_number: int):
+        """
+        Refresh in the background once events reach refresh_blocks past the snapshot
+        """
+        if self.block is None or block_number - self.block >= self.refresh_blocks:
+            self.refresh_async()
+
+    def get(self, asset: str, wait_seconds: float = 10) -> Dict:
+        """
+        Reserve info for asset. An unknown asset triggers a refresh (at most
+        one per miss_cooldown) and waits up to wait_seconds for it; {} if
+        the asset is still unknown.
+        """
+        info = self.reserves.get(asset.lower())
+        if info is not None:
+            return info
+
+        with self._lock:
+            refresh_due = time.monotonic() - self._last_miss_refresh >= self.miss_cooldown
+            if refresh_due:
+                self._last_miss_refresh = time.monotonic()
+        if refresh_due:
+            print(f"🔌 Unknown reserve {asset}, refreshing reserves snapshot")
+            self.refresh_async().join(wait_seconds)
+        return self.reserves.get(asset.lower(), {})
@@ -0,0 +1,141 @@
+import threading
+import time
+import traceback
+from typing import Callable, ContextManager, Dict, Tuple
+
+import metrics
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+ANALYZED_UPSERT = """
+    INSERT INTO {}.{} (
+        id,
+        analysis_status,
+        first_liquidatable_block,
+        first_liquidatable_time,
+        latency_seconds,
+        blocks_liquidatable,
+        collateral_symbol,
+        collateral_decimals,
+        collateral_price_usd,
+        debt_symbol,
+        debt_decimals,
+        debt_price_usd
+    ) VALUES %s
+    ON CONFLICT (id) DO UPDATE SET
+        analysis_status = EXCLUDED.analysis_status,
+        first_liquidatable_block = EXCLUDED.first_liquidatable_block,
+        first_liquidatable_time = EXCLUDED.first_liquidatable_time,
+        latency_seconds = EXCLUDED.latency_seconds,
+        blocks_liquidatable = EXCLUDED.blocks_liquidatable,
+        collateral_symbol = EXCLUDED.collateral_symbol,
+        collateral_decimals = EXCLUDED.collateral_decimals,
+        collateral_price_usd = EXCLUDED.collateral_price_usd,
+        debt_symbol = EXCLUDED.debt_symbol,
+        debt_decimals = EXCLUDED.debt_decimals,
+        debt_price_usd = EXCLUDED.debt_price_usd,
+        lease_expires_at = NULL
+"""
+
+FAILED_UPSERT = """
+    INSERT INTO {}.{} (id, analysis_status, error_message)
+    VALUES %s
+    ON CONFLICT (id) DO UPDATE SET
+        analysis_status = EXCLUDED.analysis_status,
+        error_message = EXCLUDED.error_message,
+        lease_expires_at = NULL
+"""
+
+
+class AnalysisResultWriter:
+    """
+    Buffers LiquidationAnalysis upserts and writes them set-based, one
+    transaction per flush. A flush happens once `batch_size` rows are queued,
+    once `flush_interval` seconds have passed since the last one, or when
+    flush() is called at the end of a batch.
+    """
+
+    def __init__(
+        self,
+        get_db_cursor: Callable[[], ContextManager],
+        schema: str,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+    ):
+        self.get_db_cursor = get_db_cursor
+        self.schema = schema
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Tuple[str, tuple]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _statement(self, template: str) -> sql.Composed:
+        return sql.SQL(template).format(
+            sql.Identifier(self.schema), sql.Identifier("LiquidationAnalysis")
+        )
+
+    def _enqueue(self, liquidation_id: str, status: str, values: tuple):
+        with self._lock:
+            # The latest result for an id wins, as with sequential upserts;
+            # it also keeps one statement from touching a row twice
+            self._pending.pop(liquidation_id, None)
+            self._pending[liquidation_id] = (status, values)
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def add_analyzed(self, liquidation_id: str, values: tuple):
+        self._enqueue(liquidation_id, "ANALYZED", values)
+
+    def add_failed(self, liquidation_id: str, error_message: str):
+        self._enqueue(liquidation_id, "FAILED", (liquidation_id, "FAILED", error_message))
+
+    def _write(self, cur, rows):
+        analyzed = [values for status, values in rows if status == "ANALYZED"]
+        failed = [values for status, values in rows if status == "FAILED"]
+        if analyzed:
+            execute_values(
+                cur, self._statement(ANALYZED_UPSERT), analyzed, page_size=len(analyzed)
+            )
+        if failed:
+            execute_values(
+                cur, self._statement(FAILED_UPSERT), failed, page_size=len(failed)
+            )
+
+    def flush(self) -> int:
+        """
+        Write all queued rows in one transaction; returns the number written
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending.values())
+                self._pending.clear()
+                self._last_flush = time.monotonic()
+            if not rows:
+                return 0
+
+            try:
+                with metrics.DB_FLUSH_SECONDS.time(), self.get_db_cursor() as cur:
+                    self._write(cur, rows)
+                metrics.DB_ROWS_WRITTEN.inc(len(rows))
+                print(f"✓ Flushed {len(rows)} analysis rows in one commit")
+                return len(rows)
+            except Exception as e:
+                print(f"Error flushing {len(rows)} analysis rows, writing one by one: {e}")
+                traceback.print_exc()
+
+            written = 0
+            for row in rows:
+                try:
+                    with self.get_db_cursor() as cur:
+                        self._write(cur, [row])
+                    written += 1
+                    metrics.DB_ROWS_WRITTEN.inc()
+                except Exception as e:
+                    print(f"Error writing analysis row {row[1][0]}: {e}")
+            return written
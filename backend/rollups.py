@@ -0,0 +1,268 @@
+"""
+Daily rollups of liquidations that back the /analytics API endpoints.
+
+Rows are grouped by (day, liquidator, collateral, debt, profitable, latency
+bucket), so summaries, leaderboards, per-asset volume, time series and
+latency histograms are sums over a few rows per day instead of over every
+liquidation. Statement-level triggers log the days touched by indexer and
+analyzer writes, and refresh_rollups() recomputes only those days.
+"""
+from typing import List, Optional
+
+from psycopg2 import sql
+
+ROLLUP_TABLE = "LiquidationDailyRollup"
+DIRTY_TABLE = "LiquidationRollupDirtyDay"
+
+# Lower edges, in seconds, of the latency histogram buckets; the last bucket
+# is open-ended
+LATENCY_BUCKET_EDGES = [0, 12, 24, 36, 60, 120, 300, 600, 1800, 3600, 21600, 86400]
+
+# Only one process refreshes at a time; others skip and leave the days logged
+REFRESH_LOCK_KEY = 7_204_113
+
+
+def _identifiers(schema: str) -> dict:
+    return {
+        "schema": sql.Identifier(schema),
+        "calls": sql.Identifier("LiquidationCall"),
+        "analysis": sql.Identifier("LiquidationAnalysis"),
+        "rollup": sql.Identifier(ROLLUP_TABLE),
+        "dirty": sql.Identifier(DIRTY_TABLE),
+        "stats": sql.Identifier("LiquidationStats"),
+    }
+
+
+def aggregated_rows(schema: str, where: sql.Composable) -> sql.Composed:
+    """
+    Rollup-shaped aggregate over LiquidationCall rows matching `where`, which
+    may filter on day, liquidator, latency_seconds, collateral_usd and
+    debt_usd. USD values follow the frontend: amount / 10^decimals * price,
+    0 while the analysis is missing.
+    """
+    return sql.SQL("""
+        SELECT
+            day,
+            liquidator,
+            collateral_symbol,
+            debt_symbol,
+            collateral_usd - debt_usd >= 0 AS profitable,
+            COALESCE(width_bucket(latency_seconds, {edges}) - 1, -1) AS latency_bucket,
+            COUNT(*) AS count,
+            COUNT(latency_seconds) AS latency_count,
+            COALESCE(SUM(latency_seconds), 0)::double precision AS latency_sum,
+            SUM(collateral_usd) AS collateral_usd,
+            SUM(debt_usd) AS debt_usd,
+            SUM(collateral_usd - debt_usd) AS bonus_usd
+        FROM (
+            SELECT
+                (to_timestamp(lc.block_timestamp) AT TIME ZONE 'UTC')::date AS day,
+                lc.liquidator,
+                COALESCE(la.collateral_symbol, '') AS collateral_symbol,
+                COALESCE(la.debt_symbol, '') AS debt_symbol,
+                CASE WHEN la.latency_seconds >= 0 THEN la.latency_seconds END AS latency_seconds,
+                COALESCE(
+                    lc.liquidated_collateral_amount::numeric
+                        / power(10::numeric, la.collateral_decimals)
+                        * la.collateral_price_usd::numeric,
+                    0
+                )::double precision AS collateral_usd,
+                COALESCE(
+                    lc.debt_to_cover::numeric
+                        / power(10::numeric, la.debt_decimals)
+                        * la.debt_price_usd::numeric,
+                    0
+                )::double precision AS debt_usd
+            FROM {schema}.{calls} lc
+            LEFT JOIN {schema}.{analysis} la ON lc.id = la.id
+        ) r
+        WHERE {where}
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """).format(edges=sql.Literal(LATENCY_BUCKET_EDGES), where=where, **_identifiers(schema))
+
+
+def create_rollup_tables(cur, schema: str):
+    """
+    Create the rollup and dirty-day tables and the triggers that log which
+    days need recomputing
+    """
+    ids = _identifiers(schema)
+    cur.execute(
+        sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {schema}.{rollup} (
+                day DATE NOT NULL,
+                liquidator TEXT NOT NULL,
+                collateral_symbol TEXT NOT NULL,
+                debt_symbol TEXT NOT NULL,
+                profitable BOOLEAN NOT NULL,
+                latency_bucket INTEGER NOT NULL,
+                count BIGINT NOT NULL,
+                latency_count BIGINT NOT NULL,
+                latency_sum DOUBLE PRECISION NOT NULL,
+                collateral_usd DOUBLE PRECISION NOT NULL,
+                debt_usd DOUBLE PRECISION NOT NULL,
+                bonus_usd DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (day, liquidator, collateral_symbol, debt_symbol, profitable, latency_bucket)
+            )
+        """).format(**ids)
+    )
+    # Append-only on purpose: a day logged by a transaction becomes visible
+    # together with its data, so a refresh never drops a day it cannot see yet
+    cur.execute(
+        sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {schema}.{dirty} (
+                id BIGSERIAL PRIMARY KEY,
+                day DATE NOT NULL
+            )
+        """).format(**ids)
+    )
+
+    cur.execute(
+        sql.SQL("""
+            CREATE OR REPLACE FUNCTION {schema}.{function}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    DELETE FROM {schema}.{rollup};
+                    DELETE FROM {schema}.{dirty};
+                ELSE
+                    INSERT INTO {schema}.{dirty} (day)
+                    SELECT DISTINCT (to_timestamp(block_timestamp) AT TIME ZONE 'UTC')::date
+                    FROM changed_rows;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """).format(function=sql.Identifier("mark_rollup_days_from_calls"), **ids)
+    )
+    cur.execute(
+        sql.SQL("""
+            CREATE OR REPLACE FUNCTION {schema}.{function}() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO {schema}.{dirty} (day)
+                SELECT DISTINCT (to_timestamp(lc.block_timestamp) AT TIME ZONE 'UTC')::date
+                FROM changed_rows la
+                JOIN {schema}.{calls} lc ON lc.id = la.id
+                WHERE la.analysis_status <> 'PENDING';
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """).format(function=sql.Identifier("mark_rollup_days_from_analysis"), **ids)
+    )
+
+    for table, trigger_name, event, referencing, function in (
+        ("LiquidationCall", "LiquidationCall_rollup_insert", "INSERT",
+         "REFERENCING NEW TABLE AS changed_rows", "mark_rollup_days_from_calls"),
+        ("LiquidationCall", "LiquidationCall_rollup_delete", "DELETE",
+         "REFERENCING OLD TABLE AS changed_rows", "mark_rollup_days_from_calls"),
+        ("LiquidationCall", "LiquidationCall_rollup_truncate", "TRUNCATE",
+         "", "mark_rollup_days_from_calls"),
+        ("LiquidationAnalysis", "LiquidationAnalysis_rollup_insert", "INSERT",
+         "REFERENCING NEW TABLE AS changed_rows", "mark_rollup_days_from_analysis"),
+        ("LiquidationAnalysis", "LiquidationAnalysis_rollup_update", "UPDATE",
+         "REFERENCING NEW TABLE AS changed_rows", "mark_rollup_days_from_analysis"),
+    ):
+        cur.execute(
+            sql.SQL("DROP TRIGGER IF EXISTS {} ON {}.{}").format(
+                sql.Identifier(trigger_name), ids["schema"], sql.Identifier(table)
+            )
+        )
+        cur.execute(
+            sql.SQL("""
+                CREATE TRIGGER {} AFTER {} ON {}.{}
+                {} FOR EACH STATEMENT EXECUTE FUNCTION {}.{}()
+            """).format(
+                sql.Identifier(trigger_name),
+                sql.SQL(event),
+                ids["schema"],
+                sql.Identifier(table),
+                sql.SQL(referencing),
+                ids["schema"],
+                sql.Identifier(function),
+            )
+        )
+
+
+def _bump_version(cur, schema: str):
+    cur.execute(
+        sql.SQL("UPDATE {schema}.{stats} SET rollup_version = rollup_version + 1").format(
+            **_identifiers(schema)
+        )
+    )
+
+
+def rebuild_rollups(cur, schema: str):
+    """
+    Recompute every day from scratch
+    """
+    ids = _identifiers(schema)
+    cur.execute(sql.SQL("SELECT pg_advisory_xact_lock(%s)"), (REFRESH_LOCK_KEY,))
+    cur.execute(sql.SQL("DELETE FROM {schema}.{dirty}").format(**ids))
+    cur.execute(sql.SQL("DELETE FROM {schema}.{rollup}").format(**ids))
+    cur.execute(
+        sql.SQL("INSERT INTO {schema}.{rollup} {rows}").format(
+            rows=aggregated_rows(schema, sql.SQL("TRUE")), **ids
+        )
+    )
+    _bump_version(cur, schema)
+
+
+def refresh_rollups(cur, schema: str) -> int:
+    """
+    Recompute the rollup rows of every day logged since the last refresh.
+    Returns the number of days refreshed (0 if another process holds the
+    refresh lock).
+    """
+    ids = _identifiers(schema)
+    cur.execute(sql.SQL("SELECT pg_try_advisory_xact_lock(%s) AS locked"), (REFRESH_LOCK_KEY,))
+    if not _first_value(cur.fetchone()):
+        return 0
+
+    cur.execute(
+        sql.SQL("""
+            WITH logged AS (DELETE FROM {schema}.{dirty} RETURNING day)
+            SELECT array_agg(DISTINCT day) AS days FROM logged
+        """).format(**ids)
+    )
+    days = _first_value(cur.fetchone())
+    if not days:
+        return 0
+
+    cur.execute(
+        sql.SQL("DELETE FROM {schema}.{rollup} WHERE day = ANY(%s)").format(**ids), (days,)
+    )
+    cur.execute(
+        sql.SQL("INSERT INTO {schema}.{rollup} {rows}").format(
+            rows=aggregated_rows(schema, sql.SQL("day = ANY(%s)")), **ids
+        ),
+        (days,),
+    )
+    _bump_version(cur, schema)
+    return len(days)
+
+
+def _first_value(row):
+    if row is None:
+        return None
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+def histogram_percentile(counts: List[int], percentile: float) -> Optional[float]:
+    """
+    Estimate a latency percentile from bucket counts, interpolating linearly
+    inside the bucket it falls in; the open last bucket reports its edge
+    """
+    total = sum(counts)
+    if total == 0:
+        return None
+
+    target = percentile / 100 * total
+    seen = 0
+    for index, count in enumerate(counts):
+        if count and seen + count >= target:
+            low = LATENCY_BUCKET_EDGES[index]
+            if index + 1 == len(LATENCY_BUCKET_EDGES):
+                return float(low)
+            high = LATENCY_BUCKET_EDGES[index + 1]
+            return low + (high - low) * (target - seen) / count
+        seen += count
+    return float(LATENCY_BUCKET_EDGES[-1])
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class RpcResultCache:
+    """
+    Content-addressed on-disk store of historical JSON-RPC results.
+
+    Entries are keyed by a hash of (method, block, contract, calldata) and
+    evicted least-recently-used first once the store grows past max_bytes.
+    Hits only note their access time in memory; the last_access updates are
+    written in one transaction every TOUCH_BATCH hits or TOUCH_SECONDS, and
+    before any eviction.
+    """
+
+    TOUCH_BATCH = 512
+    TOUCH_SECONDS = 30
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._touched_since = time.monotonic()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rpc_results (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS rpc_results_last_access ON rpc_results (last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM rpc_results"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(method: str, block_number: int, *parts: Any) -> str:
+        payload = json.dumps([method, block_number, *parts], separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM rpc_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._touched[key] = time.time()
+            if (
+                len(self._touched) >= self.TOUCH_BATCH
+                or time.monotonic() - self._touched_since >= self.TOUCH_SECONDS
+            ):
+                self._write_touched()
+                self._conn.commit()
+        return json.loads(row[0])
+
+    def _write_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE rpc_results SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touched_since = time.monotonic()
+
+    def set(self, key: str, result: Any):
+        encoded = json.dumps(result, separators=(",", ":"))
+        size = len(encoded)
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM rpc_results WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rpc_results (key, result, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, encoded, size, time.time()),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._write_touched()
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Trim to 90% of the cap so eviction doesn't run on every insert
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, size FROM rpc_results ORDER BY last_access ASC LIMIT 500"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            freed = 0
+            keys = []
+            for key, size in rows:
+                keys.append((key,))
+                freed += size
+                if self._total_bytes - freed <= target:
+                    break
+            self._conn.executemany("DELETE FROM rpc_results WHERE key = ?", keys)
+            self._total_bytes -= freed
+
+    def close(self):
+        with self._lock:
+            self._write_touched()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,398 @@
+"""
+Local JSON-RPC stand-in for benchmarking the analyzer without an archive node.
+
+SyntheticMarket generates a reproducible Aave market from a seed: borrowers
+with unhealthy episodes that end in one or more liquidations, oracle prices
+and 12 second blocks. StandInServer answers the calls the analyzer makes
+(getUserAccountData, getPriceOracle, getAssetPrice(s), eth_getBlockByNumber,
+eth_blockNumber) from it, or replays responses recorded from a real node,
+and adds configurable latency and error injection.
+
+    python rpc_standin.py --events 500 --latency-ms 20 --error-rate 0.01
+    python rpc_standin.py --record-from https://archive.example --record-to calls.jsonl
+    python rpc_standin.py --replay calls.jsonl
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from abi_calls import GET_ASSET_PRICE, GET_ASSETS_PRICES, GET_PRICE_ORACLE, GET_USER_ACCOUNT_DATA
+from eth_abi import decode, encode
+
+# Timestamps follow post-merge mainnet: one block per 12 second slot
+MERGE_BLOCK = 15537394
+MERGE_TIMESTAMP = 1663224179
+SLOT_SECONDS = 12
+
+ORACLE_ADDRESS = "0x54586be62e3c3580375ae3723c145253060ca0c2"
+
+# (symbol, decimals, price in 8-decimal USD) of the synthetic reserves
+SYNTHETIC_RESERVES = [
+    ("WETH", 18, 3_000_00000000),
+    ("WBTC", 8, 60_000_00000000),
+    ("USDC", 6, 1_00000000),
+    ("USDT", 6, 1_00000000),
+    ("DAI", 18, 1_00000000),
+    ("wstETH", 18, 3_500_00000000),
+]
+
+
+def _address(*parts) -> str:
+    return "0x" + hashlib.sha256(json.dumps(parts).encode()).hexdigest()[:40]
+
+
+class SyntheticMarket:
+    """
+    A seeded set of liquidations with a known first liquidatable block each.
+
+    Every borrower has non-overlapping unhealthy episodes; an episode ends
+    with a liquidation that restores the position, and may contain earlier
+    partial liquidations. The health factor is 0.9 inside an episode and 1.2
+    elsewhere.
+    """
+
+    def __init__(
+        self,
+        seed: int = 1,
+        num_events: int = 500,
+        num_users: Optional[int] = None,
+        mean_lead_blocks: int = 40,
+        max_lead_blocks: int = 5000,
+        first_block: int = 19_000_000,
+    ):
+        rng = random.Random(seed)
+        self.seed = seed
+        self.reserves = {
+            _address("reserve", symbol): {
+                "symbol": symbol,
+                "decimals": decimals,
+                "price": price,
+                "price_source": _address("price source", symbol),
+            }
+            for symbol, decimals, price in SYNTHETIC_RESERVES
+        }
+        assets = list(self.reserves)
+        num_users = num_users or max(1, num_events // 3)
+        users = [_address("user", seed, i) for i in range(num_users)]
+        liquidators = [_address("liquidator", seed, i) for i in range(max(1, num_users // 10))]
+
+        self.episodes: Dict[str, List[Tuple[int, int]]] = {user: [] for user in users}
+        self.events: List[Dict] = []
+        cursor = {user: first_block + rng.randrange(0, 20_000) for user in users}
+
+        while len(self.events) < num_events:
+            user = rng.choice(users)
+            lead = min(max_lead_blocks, 1 + int(rng.expovariate(1 / mean_lead_blocks)))
+            start = cursor[user] + rng.randrange(100, 5_000)
+            end = start + lead
+            cursor[user] = end + max_lead_blocks
+            self.episodes[user].append((start, end))
+
+            # Partial liquidations inside the episode, then the final one at its end
+            partials = min(rng.choice([0, 0, 0, 1, 1, 2]), lead - 1)
+            blocks = sorted(rng.sample(range(start + 1, end), partials)) + [end]
+            collateral, debt = rng.sample(assets, 2)
+            for block in blocks:
+                if len(self.events) == num_events:
+                    break
+                self.events.append({
+                    "id": f"{seed}-{len(self.events)}",
+                    "user_address": user,
+                    "liquidator": rng.choice(liquidators),
+                    "collateral_asset": collateral,
+                    "debt_asset": debt,
+                    "debt_to_cover": str(rng.randrange(1, 10**6) * 10 ** (self.reserves[debt]["decimals"] - 2)),
+                    "liquidated_collateral_amount": str(
+                        rng.randrange(1, 10**6) * 10 ** (self.reserves[collateral]["decimals"] - 2)
+                    ),
+                    "block_number": block,
+                    "block_timestamp": self.block_timestamp(block),
+                    "tx_hash": "0x" + hashlib.sha256(f"{seed}-{len(self.events)}".encode()).hexdigest(),
+                    "first_liquidatable_block": start,
+                })
+
+        self.events.sort(key=lambda event: (event["block_number"], event["id"]))
+        self.head_block = max(event["block_number"] for event in self.events) + 100
+
+    @staticmethod
+    def block_timestamp(block_number: int) -> int:
+        return MERGE_TIMESTAMP + (block_number - MERGE_BLOCK) * SLOT_SECONDS
+
+    def health_factor(self, user: str, block_number: int) -> float:
+        # The liquidation block itself shows the restored position
+        for start, end in self.episodes.get(user.lower(), ()):
+            if start <= block_number < end:
+                return 0.9
+        return 1.2
+
+    def account_data(self, user: str, block_number: int) -> tuple:
+        health_factor = self.health_factor(user, block_number)
+        debt = 10_000 * 10**8
+        return (
+            int(debt * health_factor / 0.8),
+            debt,
+            0,
+            8000,
+            7500,
+            int(health_factor * 10**18),
+        )
+
+    def price(self, asset: str) -> int:
+        reserve = self.reserves.get(asset.lower())
+        return reserve["price"] if reserve else 1_00000000
+
+    def reserves_snapshot(self) -> Dict[str, Dict]:
+        """
+        Reserves in the analyzer's snapshot format (see reserves_snapshot.py)
+        """
+        return {
+            asset: {
+                "symbol": reserve["symbol"],
+                "decimals": reserve["decimals"],
+                "price_source": reserve["price_source"],
+            }
+            for asset, reserve in self.reserves.items()
+        }
+
+    def block(self, block_number: int) -> Dict:
+        return {
+            "number": hex(block_number),
+            "hash": "0x" + hashlib.sha256(f"block-{block_number}".encode()).hexdigest(),
+            "parentHash": "0x" + hashlib.sha256(f"block-{block_number - 1}".encode()).hexdigest(),
+            "timestamp": hex(self.block_timestamp(block_number)),
+            "miner": "0x" + "00" * 20,
+            "extraData": "0x",
+            "gasLimit": hex(30_000_000),
+            "gasUsed": "0x0",
+            "baseFeePerGas": hex(10**9),
+            "difficulty": "0x0",
+            "size": "0x0",
+            "transactions": [],
+            "uncles": [],
+        }
+
+    def call(self, transaction: Dict, block_number: int) -> str:
+        data = transaction.get("data") or transaction.get("input") or "0x"
+        selector = data[:10].lower()
+        arguments = bytes.fromhex(data[10:])
+
+        if selector == GET_USER_ACCOUNT_DATA.selector:
+            (user,) = decode(GET_USER_ACCOUNT_DATA.input_types, arguments)
+            values = self.account_data(user, block_number)
+            return "0x" + encode(GET_USER_ACCOUNT_DATA.output_types, values).hex()
+        if selector == GET_PRICE_ORACLE.selector:
+            return "0x" + encode(GET_PRICE_ORACLE.output_types, [ORACLE_ADDRESS]).hex()
+        if selector == GET_ASSET_PRICE.selector:
+            (asset,) = decode(GET_ASSET_PRICE.input_types, arguments)
+            return "0x" + encode(GET_ASSET_PRICE.output_types, [self.price(asset)]).hex()
+        if selector == GET_ASSETS_PRICES.selector:
+            (assets,) = decode(GET_ASSETS_PRICES.input_types, arguments)
+            return "0x" + encode(
+                GET_ASSETS_PRICES.output_types, [[self.price(asset) for asset in assets]]
+            ).hex()
+        raise ValueError(f"unsupported call {selector}")
+
+
+def _request_key(method: str, params) -> str:
+    return json.dumps([method, params], sort_keys=True, separators=(",", ":")).lower()
+
+
+class StandInServer:
+    """
+    Threaded HTTP JSON-RPC server in front of a SyntheticMarket and/or a
+    recorded response file, counting requests and calls per method.
+
+    latency_ms (+/- jitter_ms) is added to every HTTP request; error_rate of
+    them fail with error_kind: "429" (HTTP throttle), "500" (server error)
+    or "rpc" (a -32005 limit-exceeded JSON-RPC error).
+    """
+
+    def __init__(
+        self,
+        market: Optional[SyntheticMarket] = None,
+        replay_path: Optional[str] = None,
+        record_from: Optional[str] = None,
+        record_to: Optional[str] = None,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        error_kind: str = "429",
+        seed: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.market = market
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self.record_from = record_from
+        self.http_requests = 0
+        self.injected_errors = 0
+        self.calls = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._record_file = open(record_to, "a") if record_to else None
+        self._recorded = {}
+        if replay_path:
+            with open(replay_path) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._recorded[_request_key(entry["method"], entry["params"])] = entry["result"]
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="rpc-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._record_file:
+            self._record_file.close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.http_requests = 0
+            self.injected_errors = 0
+            self.calls = Counter()
+
+    def _answer(self, request: Dict) -> Dict:
+        method, params = request.get("method"), request.get("params") or []
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        with self._lock:
+            self.calls[method] += 1
+
+        key = _request_key(method, params)
+        if key in self._recorded:
+            response["result"] = self._recorded[key]
+            return response
+
+        try:
+            if self.record_from:
+                result = self._forward(method, params)
+            elif method == "eth_call" and self.market is not None:
+                result = self.market.call(params[0], int(params[1], 16))
+            elif method == "eth_getBlockByNumber" and self.market is not None:
+                result = self.market.block(int(params[0], 16))
+            elif method == "eth_blockNumber" and self.market is not None:
+                result = hex(self.market.head_block)
+            elif method == "eth_chainId":
+                result = "0x1"
+            else:
+                response["error"] = {"code": -32601, "message": f"method {method} not available"}
+                return response
+        except Exception as e:
+            response["error"] = {"code": -32000, "message": f"execution reverted: {e}"}
+            return response
+
+        response["result"] = result
+        return response
+
+    def _forward(self, method: str, params):
+        upstream = requests.post(
+            self.record_from,
+            json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params},
+            timeout=60,
+        ).json()
+        if "error" in upstream:
+            raise ValueError(upstream["error"].get("message"))
+        with self._lock:
+            self._record_file.write(json.dumps({"method": method, "params": params, "result": upstream["result"]}) + "\n")
+        return upstream["result"]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up, e.g. the losing side of a hedge
+                    pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with server._lock:
+                    server.http_requests += 1
+                    fail = server.error_rate > 0 and server._rng.random() < server.error_rate
+                    delay = server.latency_ms + server._rng.uniform(-server.jitter_ms, server.jitter_ms)
+                    if fail:
+                        server.injected_errors += 1
+                if delay > 0:
+                    time.sleep(delay / 1000)
+
+                if fail and server.error_kind in ("429", "500"):
+                    self._reply(int(server.error_kind), b'{"error": "injected"}')
+                    return
+
+                requests_in = payload if isinstance(payload, list) else [payload]
+                if fail:
+                    responses = [
+                        {"jsonrpc": "2.0", "id": request.get("id"),
+                         "error": {"code": -32005, "message": "limit exceeded (injected)"}}
+                        for request in requests_in
+                    ]
+                else:
+                    responses = [server._answer(request) for request in requests_in]
+                body = responses if isinstance(payload, list) else responses[0]
+                self._reply(200, json.dumps(body).encode())
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve a synthetic or recorded JSON-RPC stand-in for benchmarks.')
+    parser.add_argument('--port', type=int, default=8545, help='Port to listen on.')
+    parser.add_argument('--seed', type=int, default=1, help='Seed of the synthetic market.')
+    parser.add_argument('--events', type=int, default=500, help='Liquidations in the synthetic market.')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latency added to every HTTP request.')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- jitter on the latency.')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of HTTP requests that fail.')
+    parser.add_argument('--error-kind', choices=['429', '500', 'rpc'], default='429', help='How injected failures look.')
+    parser.add_argument('--replay', help='JSONL file of recorded responses to serve first.')
+    parser.add_argument('--record-from', help='Forward unrecorded calls to this node and record them.')
+    parser.add_argument('--record-to', default='recorded_rpc.jsonl', help='Where --record-from appends responses.')
+    args = parser.parse_args()
+
+    server = StandInServer(
+        market=SyntheticMarket(seed=args.seed, num_events=args.events),
+        replay_path=args.replay,
+        record_from=args.record_from,
+        record_to=args.record_to if args.record_from else None,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_kind=args.error_kind,
+        seed=args.seed,
+        port=args.port,
+    )
+    print(f"🔌 RPC stand-in listening on {server.url}")
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -1,7 +1,29 @@
 """
-Script to export 500 rows from the liquidation analysis table to a JSON file.
+Script to export the analyzed liquidations to static JSON files.
 This data will be used by the frontend instead of making API calls.
+
+Rows are streamed from a server-side cursor and written as they arrive, so
+memory stays flat however long the history is. Output goes to monthly
+shards under frontend/public/liquidations/ described by a manifest.json,
+plus the legacy single-file liquidations-data.json; every file is written
+compact and with precompressed .gz (and .br, if brotli is installed) copies.
+
+With --incremental only rows past the manifest's (block_timestamp, id)
+watermark are queried and written as a new delta shard; deltas are merged
+into their monthly shards once there are MAX_DELTA_SHARDS of them, or on
+--compact. Rows analyzed late with an older timestamp than the watermark
+are only picked up by a full export, which also rewrites the legacy file.
+
+--columnar also writes each shard in the columnar-v1 layout (see
+columnar.py) next to the row-oriented one; those are built from the shard's
+rows in memory, so memory is bounded by the largest month.
+
+A full export also stores summary statistics of the exported rows in the
+manifest (fullExportStats), folded into running aggregates by analytics.py as
+rows stream past.
 """
+import argparse
+import gzip
 import json
 import os
 import psycopg2
@@ -9,106 +31,358 @@ from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import config
-from datetime import datetime, date
+import analytics
+import columnar
+import rollups
+from datetime import datetime, date, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 load_dotenv()
 
+# Rows fetched from the server-side cursor per round trip
+ITERSIZE = 2000
+SHARD_DIR_NAME = 'liquidations'
+MANIFEST_NAME = 'manifest.json'
+LEGACY_FILE_NAME = 'liquidations-data.json'
+# Delta shards kept before --incremental folds them into monthly shards
+MAX_DELTA_SHARDS = 24
+
 def json_serial(obj):
     """JSON serializer for objects not serializable by default json code"""
     if isinstance(obj, (datetime, date)):
         return obj.isoformat()
     raise TypeError(f"Type {type(obj)} not serializable")
 
-def export_liquidations():
-    """Export 500 liquidation records to JSON file"""
+def to_json(value):
+    return json.dumps(value, default=json_serial, separators=(',', ':'))
+
+class CompressedFileWriter:
+    """
+    Streams one file to disk together with its .gz and .br variants. Output
+    goes to temporary files that replace the old ones only on close(), so
+    the site never serves a half-written export.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self._targets = [(path, open(f"{path}.tmp", 'wb'))]
+        self._gzip = gzip.open(f"{path}.gz.tmp", 'wb', compresslevel=9)
+        self._targets.append((f"{path}.gz", self._gzip))
+        self._brotli = None
+        if brotli is not None:
+            self._brotli = brotli.Compressor(quality=11)
+            self._brotli_file = open(f"{path}.br.tmp", 'wb')
+            self._targets.append((f"{path}.br", self._brotli_file))
+
+    def write(self, text):
+        data = text.encode()
+        self.size += len(data)
+        self._targets[0][1].write(data)
+        self._gzip.write(data)
+        if self._brotli is not None:
+            self._brotli_file.write(self._brotli.process(data))
+
+    def close(self):
+        """
+        Finish all variants and move them into place; returns their sizes
+        """
+        if self._brotli is not None:
+            self._brotli_file.write(self._brotli.finish())
+
+        sizes = {}
+        for final_path, handle in self._targets:
+            handle.close()
+            os.replace(f"{final_path}.tmp", final_path)
+            sizes[os.path.splitext(final_path)[1].lstrip('.')] = os.path.getsize(final_path)
+        return {
+            'bytes': self.size,
+            'gzipBytes': sizes.get('gz'),
+            'brotliBytes': sizes.get('br'),
+        }
+
+class ShardWriter:
+    """
+    Writes one shard as {"shard": name, "data": [...]}, rows newest first
+    """
+
+    def __init__(self, shard_dir, name, kind, columnar_copy=False):
+        self.shard_dir = shard_dir
+        self.name = name
+        self.kind = kind
+        self.file_name = f"{name}.json"
+        self._columnar_rows = [] if columnar_copy else None
+        self.rows = 0
+        self.newest = None
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self._writer = CompressedFileWriter(os.path.join(shard_dir, self.file_name))
+        self._writer.write(f'{{"shard":{to_json(name)},"data":[')
+
+    def add(self, row, encoded=None):
+        encoded = encoded or to_json(dict(row))
+        self._writer.write(encoded if self.rows == 0 else f",{encoded}")
+        self.rows += 1
+        if self._columnar_rows is not None:
+            self._columnar_rows.append(dict(row))
+        timestamp = row['block_timestamp']
+        if self.newest is None:
+            self.newest = {'blockTimestamp': timestamp, 'id': row['id']}
+        self.first_timestamp = timestamp if self.first_timestamp is None else min(self.first_timestamp, timestamp)
+        self.last_timestamp = timestamp if self.last_timestamp is None else max(self.last_timestamp, timestamp)
+
+    def close(self):
+        self._writer.write(']}')
+        shard = {
+            'kind': self.kind,
+            'name': self.name,
+            'file': self.file_name,
+            'rows': self.rows,
+            'firstTimestamp': self.first_timestamp,
+            'lastTimestamp': self.last_timestamp,
+            **self._writer.close(),
+        }
+        if self._columnar_rows is not None:
+            columnar_file = f"{self.name}.columnar.json"
+            writer = CompressedFileWriter(os.path.join(self.shard_dir, columnar_file))
+            writer.write(to_json(columnar.to_columns(self._columnar_rows)))
+            sizes = writer.close()
+            shard['columnarFile'] = columnar_file
+            shard['columnarBytes'] = sizes['bytes']
+            shard['columnarGzipBytes'] = sizes['gzipBytes']
+        return shard
+
+def month_of(block_timestamp):
+    return datetime.fromtimestamp(block_timestamp, timezone.utc).strftime('%Y-%m')
+
+def get_output_dirs():
+    # Go up one level from backend, then into frontend/public
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(backend_dir)
+    frontend_public_dir = os.path.join(project_root, 'frontend', 'public')
+    shard_dir = os.path.join(frontend_public_dir, SHARD_DIR_NAME)
+    os.makedirs(shard_dir, exist_ok=True)
+    return frontend_public_dir, shard_dir
+
+def stream_rows(conn, after=None):
+    """
+    Yield analyzed liquidations newest first, only those newer than the
+    (block_timestamp, id) in `after` if given
+    """
+    # A named cursor keeps the result set on the server and hands it over
+    # ITERSIZE rows at a time
+    with conn.cursor(name='liquidation_export', cursor_factory=RealDictCursor) as cur:
+        cur.itersize = ITERSIZE
+        cur.execute(
+            sql.SQL("""
+                SELECT
+                    lc.id,
+                    lc."user_address" as "user",
+                    lc.liquidator,
+                    lc.collateral_asset,
+                    lc.debt_asset,
+                    lc.debt_to_cover,
+                    lc.liquidated_collateral_amount,
+                    lc.block_timestamp,
+                    la.latency_seconds,
+                    la.collateral_symbol,
+                    la.collateral_decimals,
+                    la.collateral_price_usd,
+                    la.debt_symbol,
+                    la.debt_decimals,
+                    la.debt_price_usd
+                FROM {}.{} lc
+                INNER JOIN {}.{} la ON lc.id = la.id
+                WHERE la.latency_seconds IS NOT NULL
+                {}
+                ORDER BY lc.block_timestamp DESC, lc.id DESC
+            """).format(
+                sql.Identifier(config.DATABASE_SCHEMA),
+                sql.Identifier('LiquidationCall'),
+                sql.Identifier(config.DATABASE_SCHEMA),
+                sql.Identifier('LiquidationAnalysis'),
+                sql.SQL('AND (lc.block_timestamp, lc.id) > (%s, %s)' if after else '')
+            ),
+            after
+        )
+        for count, row in enumerate(cur, start=1):
+            yield row
+            if count % (ITERSIZE * 10) == 0:
+                print(f"  ... {count} rows written")
+
+def read_manifest(shard_dir):
+    path = os.path.join(shard_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def write_manifest(shard_dir, manifest):
+    writer = CompressedFileWriter(os.path.join(shard_dir, MANIFEST_NAME))
+    writer.write(to_json(manifest))
+    writer.close()
+    remove_stale_shards(shard_dir, manifest['shards'])
+
+def read_shard_rows(shard_dir, shard):
+    with open(os.path.join(shard_dir, shard['file'])) as f:
+        return json.load(f)['data']
+
+def remove_stale_shards(shard_dir, shards):
+    """Delete shard files (and their compressed copies) no longer in the manifest"""
+    keep = {shard['file'] for shard in shards} | {MANIFEST_NAME}
+    keep |= {shard['columnarFile'] for shard in shards if 'columnarFile' in shard}
+    for name in os.listdir(shard_dir):
+        base = name[:-3] if name.endswith(('.gz', '.br')) else name
+        if base.endswith('.json') and base not in keep:
+            os.remove(os.path.join(shard_dir, name))
+
+def print_sizes(label, shards):
+    shard_bytes = sum(s['bytes'] for s in shards)
+    shard_gzip = sum(s['gzipBytes'] for s in shards)
+    print(f"📦 {label}: {shard_bytes / 1024:.2f} KB, {shard_gzip / 1024:.2f} KB gzipped")
+
+def export_full(conn, columnar_copy=False):
+    """Stream every analyzed liquidation into monthly shards and the legacy file"""
+    frontend_public_dir, shard_dir = get_output_dirs()
+
+    print("📥 Streaming liquidation records with analysis data...")
+    legacy = CompressedFileWriter(os.path.join(frontend_public_dir, LEGACY_FILE_NAME))
+    legacy.write('{"data":[')
+
+    shards = []
+    shard = None
+    watermark = None
+    total_count = 0
+    stats = analytics.StatsAccumulator(rollups.LATENCY_BUCKET_EDGES, ITERSIZE)
+    for row in stream_rows(conn):
+        encoded = to_json(dict(row))
+        legacy.write(encoded if total_count == 0 else f",{encoded}")
+        total_count += 1
+
+        # Rows arrive newest first, so each month is contiguous
+        month = month_of(row['block_timestamp'])
+        if shard is None or shard.name != month:
+            if shard is not None:
+                shards.append(shard.close())
+            shard = ShardWriter(shard_dir, month, 'month', columnar_copy)
+        shard.add(row, encoded)
+        watermark = watermark or shard.newest
+        stats.add(row)
+
+    if shard is not None:
+        shards.append(shard.close())
+
+    exported_at = datetime.now().isoformat()
+    legacy.write(
+        f'],"totalCount":{total_count},"limit":{total_count},"offset":0,'
+        f'"exportedAt":{to_json(exported_at)}}}'
+    )
+    legacy_sizes = legacy.close()
+
+    write_manifest(shard_dir, {
+        'totalCount': total_count,
+        'exportedAt': exported_at,
+        'order': 'block_timestamp_desc',
+        'watermark': watermark,
+        'fullExportStats': stats.summary(),
+        'shards': shards,
+    })
+
+    print(f"✅ Successfully exported {total_count} liquidation records into {len(shards)} monthly shards")
+    print_sizes('Shards', shards)
+    print_sizes(LEGACY_FILE_NAME, [legacy_sizes])
+
+def export_incremental(conn, columnar_copy=False):
+    """
+    Write only rows past the manifest watermark as a new delta shard
+    """
+    _, shard_dir = get_output_dirs()
+    manifest = read_manifest(shard_dir)
+    if not manifest or 'watermark' not in manifest:
+        print("⚠️ No incremental manifest yet, running a full export")
+        export_full(conn, columnar_copy)
+        return
+
+    watermark = manifest['watermark']
+    after = (watermark['blockTimestamp'], watermark['id']) if watermark else None
+    print(f"📥 Streaming liquidation records newer than {after}...")
+
+    name = f"delta-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}"
+    shard = None
+    for row in stream_rows(conn, after):
+        if shard is None:
+            shard = ShardWriter(shard_dir, name, 'delta', columnar_copy)
+        shard.add(row)
+
+    if shard is None:
+        print("✓ No new liquidation records since the last export")
+        return
+
+    delta = shard.close()
+    manifest['shards'].insert(0, delta)
+    manifest['watermark'] = shard.newest
+    manifest['totalCount'] += delta['rows']
+    manifest['exportedAt'] = datetime.now().isoformat()
+    write_manifest(shard_dir, manifest)
+
+    print(f"✅ Wrote {delta['rows']} new liquidation records to {delta['file']}")
+    print_sizes('Delta', [delta])
+
+    if sum(1 for s in manifest['shards'] if s['kind'] == 'delta') >= MAX_DELTA_SHARDS:
+        compact_shards(columnar_copy)
+
+def compact_shards(columnar_copy=False):
+    """
+    Merge delta shards into their monthly shards, rewriting only the months
+    the deltas touch
+    """
+    _, shard_dir = get_output_dirs()
+    manifest = read_manifest(shard_dir)
+    deltas = [s for s in manifest['shards'] if s['kind'] == 'delta'] if manifest else []
+    if not deltas:
+        print("✓ No delta shards to compact")
+        return
+
+    print(f"🗜️  Compacting {len(deltas)} delta shards...")
+    months = {s['name']: s for s in manifest['shards'] if s['kind'] == 'month'}
+    rows_by_month = {}
+    for delta in deltas:
+        for row in read_shard_rows(shard_dir, delta):
+            rows_by_month.setdefault(month_of(row['block_timestamp']), []).append(row)
+
+    for month, rows in rows_by_month.items():
+        if month in months:
+            rows.extend(read_shard_rows(shard_dir, months[month]))
+        rows.sort(key=lambda row: (row['block_timestamp'], row['id']), reverse=True)
+        shard = ShardWriter(shard_dir, month, 'month', columnar_copy)
+        for row in rows:
+            shard.add(row)
+        months[month] = shard.close()
+
+    manifest['shards'] = sorted(months.values(), key=lambda s: s['name'], reverse=True)
+    write_manifest(shard_dir, manifest)
+    print(f"✅ Compacted deltas into {len(rows_by_month)} monthly shards")
+    print_sizes('Rewritten', [months[month] for month in rows_by_month])
+
+def export_liquidations(incremental=False, compact=False, columnar_copy=False):
     conn = None
     try:
+        if compact:
+            compact_shards(columnar_copy)
+            return
+
         print("🔌 Connecting to database...")
         conn = psycopg2.connect(config.DATABASE_URL)
-
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Get total count of records with analysis data
-            print("📊 Getting count of records with analysis data...")
-            cur.execute(
-                sql.SQL("""
-                    SELECT COUNT(*) as count
-                    FROM {}.{} lc
-                    INNER JOIN {}.{} la ON lc.id = la.id
-                    WHERE la.latency_seconds IS NOT NULL
-                """).format(
-                    sql.Identifier(config.DATABASE_SCHEMA),
-                    sql.Identifier('LiquidationCall'),
-                    sql.Identifier(config.DATABASE_SCHEMA),
-                    sql.Identifier('LiquidationAnalysis')
-                )
-            )
-            total_count = cur.fetchone()['count']
-            print(f"✓ Total liquidations with analysis data: {total_count}")
-
-            # Fetch all records with completed analysis (no limit)
-            print("📥 Fetching all liquidation records with analysis data...")
-            cur.execute(
-                sql.SQL("""
-                    SELECT
-                        lc.id,
-                        lc."user_address" as "user",
-                        lc.liquidator,
-                        lc.collateral_asset,
-                        lc.debt_asset,
-                        lc.debt_to_cover,
-                        lc.liquidated_collateral_amount,
-                        lc.block_timestamp,
-                        la.latency_seconds,
-                        la.collateral_symbol,
-                        la.collateral_decimals,
-                        la.collateral_price_usd,
-                        la.debt_symbol,
-                        la.debt_decimals,
-                        la.debt_price_usd
-                    FROM {}.{} lc
-                    INNER JOIN {}.{} la ON lc.id = la.id
-                    WHERE la.latency_seconds IS NOT NULL
-                    ORDER BY lc.block_timestamp DESC
-                """).format(
-                    sql.Identifier(config.DATABASE_SCHEMA),
-                    sql.Identifier('LiquidationCall'),
-                    sql.Identifier(config.DATABASE_SCHEMA),
-                    sql.Identifier('LiquidationAnalysis')
-                )
-            )
-
-            records = cur.fetchall()
-            liquidations = [dict(record) for record in records]
-
-            print(f"✓ Fetched {len(liquidations)} records")
-
-            # Create output data structure
-            output_data = {
-                'data': liquidations,
-                'totalCount': total_count,
-                'limit': len(liquidations),
-                'offset': 0,
-                'exportedAt': datetime.now().isoformat()
-            }
-
-            # Determine output path
-            # Go up one level from backend, then into frontend/public
-            backend_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(backend_dir)
-            frontend_public_dir = os.path.join(project_root, 'frontend', 'public')
-
-            # Create public directory if it doesn't exist
-            os.makedirs(frontend_public_dir, exist_ok=True)
-
-            output_file = os.path.join(frontend_public_dir, 'liquidations-data.json')
-
-            # Write to JSON file
-            print(f"💾 Writing data to {output_file}...")
-            with open(output_file, 'w') as f:
-                json.dump(output_data, f, indent=2, default=json_serial)
-
-            print(f"✅ Successfully exported {len(liquidations)} liquidation records to {output_file}")
-            print(f"📦 File size: {os.path.getsize(output_file) / 1024:.2f} KB")
+        if incremental:
+            export_incremental(conn, columnar_copy)
+        else:
+            export_full(conn, columnar_copy)
+        if brotli is None:
+            print("⚠️ brotli not installed, skipped .br variants")
 
     except Exception as e:
         print(f"❌ Error exporting liquidations: {e}")
@@ -120,6 +394,12 @@ def export_liquidations():
             print("🔌 Connection closed.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export analyzed liquidations to static JSON files.')
+    parser.add_argument('--incremental', action='store_true', help='Only export rows newer than the last export, as a delta shard.')
+    parser.add_argument('--compact', action='store_true', help='Merge delta shards into their monthly shards without querying the database.')
+    parser.add_argument('--columnar', action='store_true', help='Also write every shard in the columnar-v1 layout.')
+    args = parser.parse_args()
+
     print("=== Starting Liquidation Data Export ===")
-    export_liquidations()
+    export_liquidations(incremental=args.incremental, compact=args.compact, columnar_copy=args.columnar)
     print("\n✅ Export complete!")
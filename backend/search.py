@@ -0,0 +1,151 @@
+import threading
+from typing import Dict, Generator, List, Optional
+
+# A search yields the blocks it wants probed and is sent back
+# {block: health_factor or None}; its return value is the first block with
+# health factor < 1.0, or None. Engines drive it with their own RPC layer.
+SearchGenerator = Generator[List[int], Dict[int, Optional[float]], Optional[int]]
+
+
+def kary_search(start_block: int, end_block: int, probes: int) -> SearchGenerator:
+    """
+    Search [start_block, end_block] with `probes` evenly spaced probes per round,
+    narrowing the window by a factor of probes + 1 each round.
+
+    Each round keeps the gap between the last healthy probe and the probe
+    after it, so an earlier HF < 1 episode inside the window is not picked
+    over the one that reaches end_block; with monotonic health this is the
+    same answer as scanning from the left. end_block should be the last block
+    before the liquidation, which already shows the liquidated position.
+    """
+    first_liquidatable_block = None
+
+    while start_block <= end_block:
+        window = end_block - start_block + 1
+        if window <= probes:
+            probe_blocks = list(range(start_block, end_block + 1))
+        else:
+            step = window / (probes + 1)
+            probe_blocks = sorted(
+                {start_block + int(step * i) for i in range(1, probes + 1)}
+            )
+
+        health_factors = yield probe_blocks
+
+        # Unreadable probes are treated as healthy, as in the binary search
+        next_start = start_block
+        next_end = end_block
+        for probe_block in reversed(probe_blocks):
+            health_factor = health_factors.get(probe_block)
+            if health_factor is None or health_factor >= 1.0:
+                next_start = probe_block + 1
+                break
+            first_liquidatable_block = probe_block
+            next_end = probe_block - 1
+
+        start_block, end_block = next_start, next_end
+
+    return first_liquidatable_block
+
+
+def galloping_search(start_block: int, end_block: int) -> SearchGenerator:
+    """
+    Probe back from end_block at offsets 1, 2, 4, ... until a healthy block
+    (or start_block) is reached, then bisect the bracket between it and the
+    nearest liquidatable probe. Positions usually become liquidatable a few
+    blocks before they are liquidated, so this costs about 2 * log2(distance)
+    probes instead of log2(window). If the block just before end_block is
+    already healthy, the answer is end_block: bisecting the rest of the
+    window could only land in an earlier episode.
+    """
+    if start_block > end_block:
+        return None
+
+    liquidatable_block = None
+    healthy_block = None
+    offset = 1
+    while True:
+        probe_block = max(start_block, end_block - offset)
+        health_factors = yield [probe_block]
+        health_factor = health_factors.get(probe_block)
+        if health_factor is not None and health_factor < 1.0:
+            liquidatable_block = probe_block
+        else:
+            healthy_block = probe_block
+            break
+        if probe_block == start_block:
+            # Liquidatable across the whole window
+            return start_block
+        offset *= 2
+
+    if liquidatable_block is None:
+        return end_block
+
+    first_liquidatable_block = yield from kary_search(
+        healthy_block + 1, liquidatable_block - 1, 1
+    )
+    return first_liquidatable_block or liquidatable_block
+
+
+def binary_search_probes(
+    start_block: int, end_block: int, first_liquidatable_block: Optional[int]
+) -> int:
+    """
+    Probes a plain binary search of [start_block, end_block] takes to reach
+    first_liquidatable_block (None if no block is liquidatable), replaying
+    its midpoints as if health were monotonic
+    """
+    probes = 0
+    while start_block <= end_block:
+        mid_block = (start_block + end_block) // 2
+        probes += 1
+        if first_liquidatable_block is not None and mid_block >= first_liquidatable_block:
+            end_block = mid_block - 1
+        else:
+            start_block = mid_block + 1
+    return probes
+
+
+class SearchStats:
+    """
+    Probes taken by searches, against what a plain binary search over the
+    same windows would have taken to reach the same answers
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.probes = 0
+        self.binary_probes = 0
+        self.narrowed = 0
+
+    def record(
+        self,
+        probes: int,
+        start_block: int,
+        end_block: int,
+        first_liquidatable_block: Optional[int],
+        narrowed: bool = False,
+    ):
+        """
+        Count a search over [start_block, end_block]; narrowed searches are
+        still compared against binary search over the full window
+        """
+        binary_probes = binary_search_probes(start_block, end_block, first_liquidatable_block)
+        with self._lock:
+            self.searches += 1
+            self.probes += probes
+            self.binary_probes += binary_probes
+            self.narrowed += narrowed
+
+    @property
+    def saved(self) -> int:
+        return self.binary_probes - self.probes
+
+    def __str__(self) -> str:
+        saved_per_search = self.saved / self.searches if self.searches else 0
+        return (
+            f"{self.probes} probes over {self.searches} searches "
+            f"({self.saved} saved vs. binary search, {saved_per_search:.1f} per search; "
+            f"{self.narrowed} narrowed by the health factor index)"
+        )
@@ -1,6 +1,7 @@
 import psycopg2
 from psycopg2 import sql
 import config
+import rollups
 import traceback
 import argparse
 import sys
@@ -28,6 +29,13 @@ def init_db(reset_table=False):
                     )
                 )
                 print("✓ Table dropped.")
+                # The cursor only makes sense against the dropped analysis rows
+                cur.execute(
+                    sql.SQL("DROP TABLE IF EXISTS {}.{}").format(
+                        sql.Identifier(config.DATABASE_SCHEMA),
+                        sql.Identifier("AnalyzerCursor"),
+                    )
+                )
 
             print("Checking table 'LiquidationAnalysis'...")
             cur.execute(
@@ -45,14 +53,279 @@ def init_db(reset_table=False):
                         debt_decimals INTEGER,
                         debt_price_usd REAL,
                         analysis_status TEXT DEFAULT 'PENDING',
-                        error_message TEXT 
+                        error_message TEXT,
+                        worker_id TEXT,
+                        lease_expires_at TIMESTAMPTZ,
+                        attempts INTEGER DEFAULT 0
                     )
                 """).format(
                     sql.Identifier(config.DATABASE_SCHEMA),
                     sql.Identifier("LiquidationAnalysis"),
                 )
             )
-            
+
+            print("Checking work-queue lease columns...")
+            cur.execute(
+                sql.SQL("""
+                    ALTER TABLE {}.{}
+                        ADD COLUMN IF NOT EXISTS worker_id TEXT,
+                        ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ,
+                        ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0
+                """).format(
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationAnalysis"),
+                )
+            )
+            cur.execute(
+                sql.SQL("""
+                    CREATE INDEX IF NOT EXISTS {} ON {}.{} (lease_expires_at)
+                    WHERE analysis_status = 'PENDING'
+                """).format(
+                    sql.Identifier("LiquidationAnalysis_pending_lease_idx"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationAnalysis"),
+                )
+            )
+            cur.execute(
+                sql.SQL("""
+                    CREATE INDEX IF NOT EXISTS {} ON {}.{} (attempts)
+                    WHERE analysis_status = 'FAILED'
+                """).format(
+                    sql.Identifier("LiquidationAnalysis_failed_attempts_idx"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationAnalysis"),
+                )
+            )
+
+            print("Checking table 'AnalyzerCursor'...")
+            cur.execute(
+                sql.SQL("""
+                    CREATE TABLE IF NOT EXISTS {}.{} (
+                        name TEXT PRIMARY KEY,
+                        block_number NUMERIC NOT NULL,
+                        last_id TEXT NOT NULL,
+                        updated_at TIMESTAMPTZ DEFAULT NOW()
+                    )
+                """).format(
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("AnalyzerCursor"),
+                )
+            )
+
+            print("Checking pending-work index on 'LiquidationCall'...")
+            cur.execute(
+                sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {}.{} (block_number, id)").format(
+                    sql.Identifier("LiquidationCall_block_number_id_idx"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationCall"),
+                )
+            )
+
+            print(f"Installing NOTIFY trigger on 'LiquidationCall' (channel '{config.NOTIFY_CHANNEL}')...")
+            cur.execute(
+                sql.SQL("""
+                    CREATE OR REPLACE FUNCTION {}.{}() RETURNS trigger AS $$
+                    BEGIN
+                        -- One wakeup per insert statement; the analyzer
+                        -- claims the new rows through its cursor
+                        PERFORM pg_notify({}, '');
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                """).format(
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("notify_liquidation_call"),
+                    sql.Literal(config.NOTIFY_CHANNEL),
+                )
+            )
+            cur.execute(
+                sql.SQL("DROP TRIGGER IF EXISTS {} ON {}.{}").format(
+                    sql.Identifier("LiquidationCall_notify"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationCall"),
+                )
+            )
+            cur.execute(
+                sql.SQL("""
+                    CREATE TRIGGER {} AFTER INSERT ON {}.{}
+                    FOR EACH STATEMENT EXECUTE FUNCTION {}.{}()
+                """).format(
+                    sql.Identifier("LiquidationCall_notify"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationCall"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("notify_liquidation_call"),
+                )
+            )
+
+            print("Checking listing index and row counter for the API...")
+            cur.execute(
+                sql.SQL("""
+                    CREATE INDEX IF NOT EXISTS {} ON {}.{} (block_timestamp DESC, id DESC)
+                    INCLUDE (
+                        user_address,
+                        liquidator,
+                        collateral_asset,
+                        debt_asset,
+                        debt_to_cover,
+                        liquidated_collateral_amount
+                    )
+                """).format(
+                    sql.Identifier("LiquidationCall_listing_idx"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationCall"),
+                )
+            )
+            cur.execute(
+                sql.SQL("""
+                    CREATE TABLE IF NOT EXISTS {}.{} (
+                        id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+                        total_count BIGINT NOT NULL DEFAULT 0
+                    )
+                """).format(
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationStats"),
+                )
+            )
+            # Versions the API tags cached responses with
+            cur.execute(
+                sql.SQL("""
+                    ALTER TABLE {}.{}
+                    ADD COLUMN IF NOT EXISTS max_block_number NUMERIC,
+                    ADD COLUMN IF NOT EXISTS call_version BIGINT NOT NULL DEFAULT 0,
+                    ADD COLUMN IF NOT EXISTS analysis_version BIGINT NOT NULL DEFAULT 0,
+                    ADD COLUMN IF NOT EXISTS rollup_version BIGINT NOT NULL DEFAULT 0
+                """).format(
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationStats"),
+                )
+            )
+            cur.execute(
+                sql.SQL("""
+                    CREATE OR REPLACE FUNCTION {schema}.{function}() RETURNS trigger AS $$
+                    BEGIN
+                        IF TG_OP = 'INSERT' THEN
+                            UPDATE {schema}.{stats}
+                            SET total_count = total_count + (SELECT COUNT(*) FROM changed_rows),
+                                max_block_number = GREATEST(
+                                    max_block_number,
+                                    (SELECT MAX(block_number) FROM changed_rows)
+                                ),
+                                call_version = call_version + 1;
+                        ELSIF TG_OP = 'DELETE' THEN
+                            UPDATE {schema}.{stats}
+                            SET total_count = total_count - (SELECT COUNT(*) FROM changed_rows),
+                                max_block_number = (SELECT MAX(block_number) FROM {schema}.{calls}),
+                                call_version = call_version + 1;
+                        ELSE
+                            UPDATE {schema}.{stats}
+                            SET total_count = 0,
+                                max_block_number = NULL,
+                                call_version = call_version + 1;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                """).format(
+                    schema=sql.Identifier(config.DATABASE_SCHEMA),
+                    function=sql.Identifier("count_liquidation_calls"),
+                    stats=sql.Identifier("LiquidationStats"),
+                    calls=sql.Identifier("LiquidationCall"),
+                )
+            )
+            cur.execute(
+                sql.SQL("""
+                    CREATE OR REPLACE FUNCTION {schema}.{function}() RETURNS trigger AS $$
+                    BEGIN
+                        -- Claims only write PENDING rows, which the API renders
+                        -- the same as no analysis; don't invalidate for them
+                        IF EXISTS (SELECT 1 FROM changed_rows WHERE analysis_status <> 'PENDING') THEN
+                            UPDATE {schema}.{stats} SET analysis_version = analysis_version + 1;
+                        END IF;
+                        RETURN NULL;
+                    END;
+                    $$ LANGUAGE plpgsql
+                """).format(
+                    schema=sql.Identifier(config.DATABASE_SCHEMA),
+                    function=sql.Identifier("bump_analysis_version"),
+                    stats=sql.Identifier("LiquidationStats"),
+                )
+            )
+            for trigger_name, event in (
+                ("LiquidationAnalysis_version_insert", "INSERT"),
+                ("LiquidationAnalysis_version_update", "UPDATE"),
+            ):
+                cur.execute(
+                    sql.SQL("DROP TRIGGER IF EXISTS {} ON {}.{}").format(
+                        sql.Identifier(trigger_name),
+                        sql.Identifier(config.DATABASE_SCHEMA),
+                        sql.Identifier("LiquidationAnalysis"),
+                    )
+                )
+                cur.execute(
+                    sql.SQL("""
+                        CREATE TRIGGER {} AFTER {} ON {}.{}
+                        REFERENCING NEW TABLE AS changed_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION {}.{}()
+                    """).format(
+                        sql.Identifier(trigger_name),
+                        sql.SQL(event),
+                        sql.Identifier(config.DATABASE_SCHEMA),
+                        sql.Identifier("LiquidationAnalysis"),
+                        sql.Identifier(config.DATABASE_SCHEMA),
+                        sql.Identifier("bump_analysis_version"),
+                    )
+                )
+            # Statement-level triggers bump the counter once per indexer write
+            for trigger_name, event, referencing in (
+                ("LiquidationCall_count_insert", "INSERT", "REFERENCING NEW TABLE AS changed_rows"),
+                ("LiquidationCall_count_delete", "DELETE", "REFERENCING OLD TABLE AS changed_rows"),
+                ("LiquidationCall_count_truncate", "TRUNCATE", ""),
+            ):
+                cur.execute(
+                    sql.SQL("DROP TRIGGER IF EXISTS {} ON {}.{}").format(
+                        sql.Identifier(trigger_name),
+                        sql.Identifier(config.DATABASE_SCHEMA),
+                        sql.Identifier("LiquidationCall"),
+                    )
+                )
+                cur.execute(
+                    sql.SQL("""
+                        CREATE TRIGGER {} AFTER {} ON {}.{}
+                        {} FOR EACH STATEMENT EXECUTE FUNCTION {}.{}()
+                    """).format(
+                        sql.Identifier(trigger_name),
+                        sql.SQL(event),
+                        sql.Identifier(config.DATABASE_SCHEMA),
+                        sql.Identifier("LiquidationCall"),
+                        sql.SQL(referencing),
+                        sql.Identifier(config.DATABASE_SCHEMA),
+                        sql.Identifier("count_liquidation_calls"),
+                    )
+                )
+            # Seed after the triggers exist; inserts wait on our lock until commit
+            cur.execute(
+                sql.SQL("""
+                    INSERT INTO {}.{} (id, total_count, max_block_number)
+                    SELECT 1, COUNT(*), MAX(block_number) FROM {}.{}
+                    ON CONFLICT (id) DO UPDATE SET
+                        total_count = EXCLUDED.total_count,
+                        max_block_number = EXCLUDED.max_block_number,
+                        call_version = {}.{}.call_version + 1
+                """).format(
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationStats"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationCall"),
+                    sql.Identifier(config.DATABASE_SCHEMA),
+                    sql.Identifier("LiquidationStats"),
+                )
+            )
+
+            print("Rebuilding analytics rollups...")
+            rollups.create_rollup_tables(cur, config.DATABASE_SCHEMA)
+            rollups.rebuild_rollups(cur, config.DATABASE_SCHEMA)
+
             conn.commit()
             print("✓ LiquidationAnalysis table ready (Schema matched)")
 
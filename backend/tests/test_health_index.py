@@ -0,0 +1,27 @@
+from backend.health_index import HealthFactorIndex
+
+USER = "0x" + "ab" * 20
+
+
+def index_with(samples):
+    index = HealthFactorIndex()
+    for block_number, health_factor in samples.items():
+        index.record(USER, block_number, health_factor)
+    return index
+
+
+def test_healthy_floor_skips_liquidatable_samples():
+    index = index_with({100: 1.2, 150: 0.9, 180: 0.95, 300: 1.1})
+    assert index.healthy_floor(USER, 1, 200) == 100
+
+
+def test_healthy_floor_ignores_samples_at_or_after_the_end():
+    index = index_with({100: 1.2, 200: 1.2})
+    assert index.healthy_floor(USER, 1, 200) == 100
+
+
+def test_healthy_floor_needs_a_healthy_sample_inside_the_window():
+    index = index_with({50: 1.2, 150: 0.9})
+    assert index.healthy_floor(USER, 100, 200) is None
+    assert index.healthy_floor(USER.upper(), 1, 200) == 50
+    assert index.healthy_floor("0x" + "cd" * 20, 1, 200) is None
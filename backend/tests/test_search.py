@@ -0,0 +1,73 @@
+from backend.search import binary_search_probes, galloping_search, kary_search
+
+
+def run(search, health_factor):
+    """
+    Drive a search generator with health_factor(block) answering its probes
+    """
+    probes = 0
+    try:
+        probe_blocks = next(search)
+        while True:
+            probes += len(probe_blocks)
+            probe_blocks = search.send({block: health_factor(block) for block in probe_blocks})
+    except StopIteration as stop:
+        return stop.value, probes
+
+
+def episodes(*ranges):
+    """
+    Health factor 0.9 inside the [start, end) ranges and 1.2 elsewhere
+    """
+    def health_factor(block):
+        return 0.9 if any(start <= block < end for start, end in ranges) else 1.2
+    return health_factor
+
+
+def test_kary_search_finds_the_episode_ending_at_the_liquidation():
+    # An earlier unhealthy episode sits inside the window
+    health_factor = episodes((8_000, 21_000), (49_960, 50_000))
+    for probes in (1, 2, 4, 8, 16):
+        first, _ = run(kary_search(1, 49_999, probes), health_factor)
+        assert first == 49_960
+
+
+def test_kary_search_matches_binary_search_with_monotonic_health():
+    for first_liquidatable in (1, 2, 777, 31_337, 49_999, 50_000):
+        health_factor = episodes((first_liquidatable, 50_001))
+        for probes in (1, 3, 8):
+            first, _ = run(kary_search(1, 50_000, probes), health_factor)
+            assert first == first_liquidatable
+
+
+def test_kary_search_without_liquidatable_blocks():
+    first, _ = run(kary_search(1, 1_000, 4), episodes())
+    assert first is None
+
+
+def test_unreadable_probes_count_as_healthy():
+    health_factor = episodes((900, 1_001))
+    first, _ = run(
+        kary_search(1, 1_000, 4),
+        lambda block: None if block == 899 else health_factor(block),
+    )
+    assert first == 900
+
+
+def test_galloping_search_stops_when_the_block_before_is_healthy():
+    first, probes = run(galloping_search(1, 50_000), episodes((8_000, 21_000)))
+    assert (first, probes) == (50_000, 1)
+
+
+def test_galloping_search_finds_the_episode_ending_at_the_liquidation():
+    health_factor = episodes((8_000, 21_000), (49_960, 50_000))
+    first, _ = run(galloping_search(1, 50_000), health_factor)
+    assert first == 49_960
+
+
+def test_binary_search_probes_follows_the_answer():
+    # Midpoints 4, 6, 7, 8 when nothing is liquidatable; 4, 2, 1 for block 1
+    assert binary_search_probes(1, 8, None) == 4
+    assert binary_search_probes(1, 8, 1) == 3
+    assert binary_search_probes(5, 5, 5) == 1
+    assert binary_search_probes(6, 5, None) == 0
@@ -1,5 +1,14 @@
 import { API_TIMEOUT_MS, API_MAX_LIMIT } from '../constants';
-import type { LiquidationData, LiquidationsResponse } from '../types';
+import type {
+  AnalyticsData,
+  AnalyticsSummary,
+  ColumnarLiquidationsResponse,
+  LiquidationData,
+  LiquidationsResponse,
+  LiquidatorStats,
+  TimeFilter,
+  TimeSeriesData,
+} from '../types';
 
 const API_BASE_URL =
   import.meta.env.VITE_PUBLIC_API_URL ||
@@ -81,35 +90,156 @@ async function loadStaticData(): Promise<LiquidationsResponse> {
   return data;
 }
 
+// Sharded export written by sample_liquidations.py; shards are listed newest
+// first, so a page only needs the shards its rows fall into
+interface ExportShard {
+  file: string;
+  rows: number;
+}
+
+interface ExportManifest {
+  totalCount: number;
+  shards: ExportShard[];
+}
+
+let manifestRequest: Promise<ExportManifest> | null = null;
+const shardRequests = new Map<string, Promise<LiquidationData[]>>();
+
+async function fetchJson<T>(url: string): Promise<T> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`Failed to load static data: ${response.status}`);
+  }
+  return response.json();
+}
+
+function loadManifest(): Promise<ExportManifest> {
+  if (!manifestRequest) {
+    manifestRequest = fetchJson<ExportManifest>('/liquidations/manifest.json').catch(error => {
+      manifestRequest = null;
+      throw error;
+    });
+  }
+  return manifestRequest;
+}
+
+function loadShard(file: string): Promise<LiquidationData[]> {
+  let request = shardRequests.get(file);
+  if (!request) {
+    request = fetchJson<{ data: LiquidationData[] }>(`/liquidations/${file}`).then(
+      shard => shard.data
+    );
+    shardRequests.set(file, request);
+  }
+  return request;
+}
+
+async function loadStaticPage(limit: number, offset: number): Promise<LiquidationsResponse> {
+  try {
+    const manifest = await loadManifest();
+    const pages: Promise<LiquidationData[]>[] = [];
+    let shardStart = 0;
+    for (const shard of manifest.shards) {
+      const shardEnd = shardStart + shard.rows;
+      if (shardEnd > offset && shardStart < offset + limit) {
+        const from = Math.max(offset - shardStart, 0);
+        const to = Math.min(offset + limit - shardStart, shard.rows);
+        pages.push(loadShard(shard.file).then(rows => rows.slice(from, to)));
+      }
+      shardStart = shardEnd;
+    }
+    return {
+      data: (await Promise.all(pages)).flat(),
+      totalCount: manifest.totalCount,
+      limit,
+      offset,
+    };
+  } catch (error) {
+    console.warn('Sharded export unavailable, loading the full static file:', error);
+    const staticData = await loadStaticData();
+    return {
+      data: staticData.data.slice(offset, offset + limit),
+      totalCount: staticData.totalCount,
+      limit,
+      offset,
+    };
+  }
+}
+
+const DICTIONARY_COLUMNS: Partial<Record<keyof LiquidationData, 'address' | 'symbol'>> = {
+  user: 'address',
+  liquidator: 'address',
+  collateral_asset: 'address',
+  debt_asset: 'address',
+  collateral_symbol: 'symbol',
+  debt_symbol: 'symbol',
+};
+
+function decodeColumnar(payload: ColumnarLiquidationsResponse): LiquidationData[] {
+  const fields = Object.keys(payload.columns) as (keyof LiquidationData)[];
+  const columns = fields.map(field => {
+    const values = payload.columns[field];
+    const dictionary = DICTIONARY_COLUMNS[field];
+    if (!dictionary) return values;
+    const lookup = payload.dictionaries[dictionary];
+    return values.map(index => (index == null ? null : lookup[index as number]));
+  });
+
+  const rows: LiquidationData[] = new Array(payload.length);
+  for (let i = 0; i < payload.length; i++) {
+    const row: Record<string, unknown> = {};
+    fields.forEach((field, column) => {
+      row[field] = columns[column][i];
+    });
+    rows[i] = row as unknown as LiquidationData;
+  }
+  return rows;
+}
+
+// Keyset cursors that start each page, learned from the previous page's
+// nextCursor so stepping through pages never makes the server skip rows
+const pageCursors = new Map<string, string>();
+
 export const api = {
   async getLiquidations(limit: number, offset: number): Promise<LiquidationsResponse> {
     try {
-      return await fetchWithErrorHandling<LiquidationsResponse>(
-        `${API_BASE_URL}/liquidations?limit=${limit}&offset=${offset}`
+      const cursor = pageCursors.get(`${limit}:${offset}`);
+      const page = cursor ? `cursor=${encodeURIComponent(cursor)}` : `offset=${offset}`;
+      const result = await fetchWithErrorHandling<LiquidationsResponse>(
+        `${API_BASE_URL}/liquidations?limit=${limit}&${page}`
       );
+      if (result.nextCursor) {
+        pageCursors.set(`${limit}:${offset + limit}`, result.nextCursor);
+      }
+      return { ...result, offset };
     } catch (error) {
       console.warn('API failed, falling back to static data:', error);
-      const staticData = await loadStaticData();
-      const paginatedData = staticData.data.slice(offset, offset + limit);
-      return {
-        data: paginatedData,
-        totalCount: staticData.totalCount,
-        limit: limit,
-        offset: offset,
-      };
+      return loadStaticPage(limit, offset);
     }
   },
 
   async getAllLiquidations(): Promise<LiquidationData[]> {
     try {
-      const result = await fetchWithErrorHandling<LiquidationsResponse>(
-        `${API_BASE_URL}/liquidations?limit=${API_MAX_LIMIT}&offset=0`
+      const result = await fetchWithErrorHandling<ColumnarLiquidationsResponse>(
+        `${API_BASE_URL}/liquidations?limit=${API_MAX_LIMIT}&offset=0&format=columnar`
       );
-      return result.data || [];
+      return decodeColumnar(result);
     } catch (error) {
       console.warn('API failed, falling back to static data:', error);
-      const staticData = await loadStaticData();
+      const staticData = await loadStaticPage(Number.MAX_SAFE_INTEGER, 0);
       return staticData.data || [];
     }
   },
+
+  async getAnalytics(timeFilter: TimeFilter, minBonus: number): Promise<AnalyticsData> {
+    const query = `range=${timeFilter}&minBonus=${minBonus}`;
+    const [summary, timeSeriesData, liquidatorStats] = await Promise.all([
+      fetchWithErrorHandling<AnalyticsSummary>(`${API_BASE_URL}/analytics/summary?${query}`),
+      fetchWithErrorHandling<TimeSeriesData[]>(`${API_BASE_URL}/analytics/timeseries?${query}`),
+      fetchWithErrorHandling<LiquidatorStats[]>(
+        `${API_BASE_URL}/analytics/liquidators?${query}&limit=${API_MAX_LIMIT}`
+      ),
+    ]);
+    return { summary, timeSeriesData, liquidatorStats };
+  },
 };
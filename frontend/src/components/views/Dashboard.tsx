@@ -27,7 +27,7 @@ function Dashboard({ minBonusThreshold, onViewLiquidators }: DashboardProps) {
     useAnalytics(timeFilter, minBonusThreshold);
 
   const handleRetry = useCallback(() => {
-    queryClient.invalidateQueries({ queryKey: ['liquidations', 'all'] });
+    queryClient.invalidateQueries({ queryKey: ['analytics'] });
   }, [queryClient]);
 
   if (isLoading) {
@@ -23,7 +23,7 @@ function LiquidatorsView({ minBonusThreshold, onGoBack }: LiquidatorsViewProps)
   const { summary, liquidatorStats, isLoading, error } = useAnalytics(timeFilter, minBonusThreshold);
 
   const handleRetry = useCallback(() => {
-    queryClient.invalidateQueries({ queryKey: ['liquidations', 'all'] });
+    queryClient.invalidateQueries({ queryKey: ['analytics'] });
   }, [queryClient]);
 
   if (isLoading) {
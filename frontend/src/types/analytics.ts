@@ -23,4 +23,10 @@ export interface LiquidatorStats {
   count: number;
 }
 
+export interface AnalyticsData {
+  summary: AnalyticsSummary;
+  timeSeriesData: TimeSeriesData[];
+  liquidatorStats: LiquidatorStats[];
+}
+
 export type TimeFilter = '1w' | '1m' | '1y' | 'max';
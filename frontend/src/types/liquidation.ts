@@ -21,4 +21,18 @@ export interface LiquidationsResponse {
   totalCount: number;
   limit: number;
   offset: number;
+  nextCursor?: string | null;
+}
+
+// columnar-v1 payload (see backend/columnar.py): one array per field, with
+// address and symbol columns holding indexes into the shared dictionaries
+export interface ColumnarLiquidationsResponse {
+  format: 'columnar-v1';
+  length: number;
+  dictionaries: { address: string[]; symbol: string[] };
+  columns: Record<keyof LiquidationData, (string | number | null)[]>;
+  totalCount: number;
+  limit: number;
+  offset: number;
+  nextCursor?: string | null;
 }